@@ -3,14 +3,30 @@
 import os
 import sys
 import json
-from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
 
 # Add the project root to Python path
 sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
 
 from dotenv import load_dotenv
 from src.database.db_manager import DatabaseManager
+from src.analyzers.failure_clusters import FailureClusterer
+from src.analyzers.fingerprint import ANALYSIS_FIELDS, group_by_fingerprint
 from src.analyzers.gpt_analyzer import GPTAnalyzer
+from src.analyzers.llm_cache import get_default_cache
+from src.analyzers.llm_executor import LLMExecutor
+
+# A failure signature analyzed within this window is not sent to GPT again
+ANALYSIS_WINDOW = timedelta(hours=24)
+
+def create_executor() -> LLMExecutor:
+    """Build the LLM executor from the LLM_* environment variables."""
+    return LLMExecutor(
+        max_workers=int(os.getenv('LLM_MAX_WORKERS', '8')),
+        requests_per_minute=int(os.getenv('LLM_REQUESTS_PER_MINUTE', '500')),
+        tokens_per_minute=int(os.getenv('LLM_TOKENS_PER_MINUTE', '90000'))
+    )
 
 def analyze_with_gpt():
     # Load environment variables
@@ -18,52 +34,100 @@ def analyze_with_gpt():
     
     # Initialize database and analyzer
     db = DatabaseManager()
-    analyzer = GPTAnalyzer()
+    executor = create_executor()
+    analyzer = GPTAnalyzer(cache=get_default_cache(), executor=executor)
+    
+    # Bring the failure clusters up to date so pattern analysis runs once per cluster
+    FailureClusterer(db).update()
+    
+    analyze_recent_failures(db, analyzer)
+    print_llm_stats(analyzer)
+
+def analyze_recent_failures(db: DatabaseManager, analyzer: GPTAnalyzer):
+    """Analyze the most recent failures and their patterns, storing the results."""
+    # Above 1, failures are packed several to a request
+    batch_size = int(os.getenv('LLM_BATCH_SIZE', '1'))
     
-    # Get recent failures
-    with db.get_connection() as conn:
-        conn.row_factory = db.dict_factory
-        c = conn.cursor()
-        c.execute('''
-            SELECT * FROM pipeline_runs
-            WHERE conclusion = 'failure'
-            ORDER BY started_at DESC
-            LIMIT 10
-        ''')
-        failures = c.fetchall()
+    # Get recent failures with the cluster each belongs to
+    failures = db.get_recent_failures_with_clusters(limit=10)
     
-    print(f"\nAnalyzing {len(failures)} recent failures with GPT")
+    # Scoped to the workflow, since each analysis is written from its first run
+    signatures = group_by_fingerprint(failures, *ANALYSIS_FIELDS)
+    window_start = (datetime.now() - ANALYSIS_WINDOW).isoformat()
+    
+    print(f"\nAnalyzing {len(failures)} recent failures ({len(signatures)} distinct) with GPT")
     print("=" * 50)
     
-    # Analyze each failure
-    for failure in failures:
-        print(f"\nAnalyzing failure in {failure['workflow_name']}")
+    # Reuse recent analyses of the same signature, analyze the rest concurrently
+    previous = {
+        signature: db.get_recent_analysis_by_fingerprint(signature, 'gpt_analysis', window_start)
+        for signature in signatures
+    }
+    pending = [group[0] for signature, group in signatures.items() if not previous[signature]]
+    
+    # Pattern analysis runs alongside the per-failure analyses
+    with ThreadPoolExecutor(max_workers=1) as background:
+        pattern_future = background.submit(analyzer.analyze_failure_patterns, failures)
+        if batch_size > 1:
+            fresh = iter(analyzer.analyze_failures_batched(pending, batch_size))
+        else:
+            fresh = iter(analyzer.analyze_failures(pending))
+        pattern_analysis = pattern_future.result()
+    
+    # Share each signature's analysis across its runs
+    analyses = []
+    for signature, group in signatures.items():
+        failure = group[0]
+        print(f"\nAnalyzing failure in {failure['workflow_name']} ({len(group)} runs)")
         print(f"Failure Reason: {failure['failure_reason']}")
         
-        analysis = analyzer.analyze_failure(failure)
-        print("\nGPT Analysis:")
+        if previous[signature]:
+            analysis = previous[signature]['analysis_data']
+            print("\nGPT Analysis (reused from an earlier run with the same signature):")
+        else:
+            analysis = next(fresh)
+            print("\nGPT Analysis:")
         print(analysis['analysis'])
         print("-" * 50)
         
-        # Store the analysis
-        db.store_analysis_result('gpt_analysis', analysis)
+        for run in group:
+            analyses.append({
+                **analysis,
+                'failure_id': run['run_id'],
+                'workflow_name': run['workflow_name'],
+                'failure_reason': run['failure_reason'],
+                # Fallback text is kept for the record but never reused by signature
+                'fingerprint': None if analysis.get('fallback') else signature
+            })
     
-    # Analyze patterns across all failures
-    print("\nAnalyzing failure patterns with GPT...")
-    pattern_analysis = analyzer.analyze_failure_patterns(failures)
+    # Store the analyses in one batch
+    db.store_analysis_results('gpt_analysis', analyses)
     
     print("\nPattern Analysis:")
+    pattern_results = []
     for failure_type, analysis in pattern_analysis.items():
         print(f"\n{failure_type}:")
         print(analysis)
         print("-" * 50)
         
-        # Store the pattern analysis
-        db.store_analysis_result('gpt_pattern_analysis', {
+        pattern_results.append({
             'failure_type': failure_type,
             'analysis': analysis,
             'timestamp': datetime.now().isoformat()
         })
+    
+    # Store the pattern analyses
+    db.store_analysis_results('gpt_pattern_analysis', pattern_results)
+
+def print_llm_stats(analyzer: GPTAnalyzer):
+    if analyzer.executor:
+        stats = analyzer.executor.get_stats()
+        print(f"\nLLM API: {stats['requests']} requests, {stats['tokens']} tokens, "
+              f"{stats['retries']} retries, {stats['rate_limit']['waited_seconds']:.1f}s waiting for rate limits")
+    if analyzer.cache:
+        stats = analyzer.cache.get_stats()
+        print(f"\nLLM cache: {stats['hits']} hits, {stats['misses']} misses "
+              f"({stats['hit_rate']:.0%} hit rate), {stats['bytes']} bytes")
 
 if __name__ == "__main__":
     analyze_with_gpt()
\ No newline at end of file
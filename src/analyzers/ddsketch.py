@@ -0,0 +1,101 @@
+# src/analyzers/ddsketch.py
+
+import json
+import math
+from typing import Dict, Iterable, Optional
+
+class DDSketch:
+    """Mergeable quantile sketch with a relative-error guarantee (DDSketch).
+
+    Positive values are counted in logarithmic buckets whose width is set
+    by relative_accuracy, so any quantile is returned within that relative
+    error of the true value. Values at or below zero share one bucket. Two
+    sketches with the same accuracy merge exactly by adding bucket counts,
+    and a value can be removed again by subtracting its count, which lets
+    rollups correct a run whose outcome changed.
+    """
+
+    def __init__(self, relative_accuracy: float = 0.01, max_bins: int = 2048):
+        self.relative_accuracy = relative_accuracy
+        self.max_bins = max_bins
+        self.gamma = (1 + relative_accuracy) / (1 - relative_accuracy)
+        self._log_gamma = math.log(self.gamma)
+        self.bins: Dict[int, int] = {}
+        self.zero_count = 0
+        self.count = 0
+
+    def add(self, value: float, count: int = 1):
+        """Count a value; a negative count removes previously added occurrences."""
+        if value <= 0:
+            self.zero_count += count
+        else:
+            index = math.ceil(math.log(value) / self._log_gamma)
+            new_count = self.bins.get(index, 0) + count
+            if new_count > 0:
+                self.bins[index] = new_count
+            else:
+                self.bins.pop(index, None)
+            if len(self.bins) > self.max_bins:
+                self._collapse()
+        self.count += count
+
+    def remove(self, value: float):
+        self.add(value, -1)
+
+    def merge(self, other: 'DDSketch'):
+        """Add every count of another sketch with the same accuracy into this one."""
+        if other.relative_accuracy != self.relative_accuracy:
+            raise ValueError("Cannot merge sketches with different relative accuracy")
+        for index, count in other.bins.items():
+            self.bins[index] = self.bins.get(index, 0) + count
+        self.zero_count += other.zero_count
+        self.count += other.count
+        if len(self.bins) > self.max_bins:
+            self._collapse()
+
+    def quantile(self, q: float) -> Optional[float]:
+        """Estimate the q-quantile (0 <= q <= 1), or None if the sketch is empty."""
+        if self.count <= 0:
+            return None
+        rank = q * (self.count - 1)
+        seen = self.zero_count
+        if rank < seen:
+            return 0.0
+        for index in sorted(self.bins):
+            seen += self.bins[index]
+            if rank < seen:
+                # Midpoint of the bucket (gamma^(i-1), gamma^i], within the relative error
+                return 2 * self.gamma ** index / (self.gamma + 1)
+        return 2 * self.gamma ** max(self.bins) / (self.gamma + 1) if self.bins else 0.0
+
+    def to_json(self) -> str:
+        return json.dumps({
+            'a': self.relative_accuracy,
+            'z': self.zero_count,
+            'b': {str(index): count for index, count in self.bins.items()}
+        }, separators=(',', ':'))
+
+    @classmethod
+    def from_json(cls, text: str) -> 'DDSketch':
+        data = json.loads(text)
+        sketch = cls(data['a'])
+        sketch.zero_count = data['z']
+        sketch.bins = {int(index): count for index, count in data['b'].items()}
+        sketch.count = sketch.zero_count + sum(sketch.bins.values())
+        return sketch
+
+    @classmethod
+    def merged(cls, sketches: Iterable['DDSketch'], relative_accuracy: float = 0.01) -> 'DDSketch':
+        """Merge several sketches into a new one."""
+        result = cls(relative_accuracy)
+        for sketch in sketches:
+            result.merge(sketch)
+        return result
+
+    def _collapse(self):
+        """Fold the lowest buckets together so at most max_bins remain."""
+        indexes = sorted(self.bins)
+        excess = indexes[:len(indexes) - self.max_bins]
+        folded = sum(self.bins.pop(index) for index in excess)
+        target = indexes[len(excess)]
+        self.bins[target] = self.bins.get(target, 0) + folded
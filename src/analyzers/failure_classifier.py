@@ -0,0 +1,163 @@
+# src/analyzers/failure_classifier.py
+
+import re
+import threading
+from collections import Counter
+from datetime import datetime
+from typing import Dict, Iterator, List, Optional
+
+class FailureClassifier:
+    """Classifies log text and failure reasons against many patterns in one pass.
+
+    All patterns are compiled into a single regex shaped as a trie, so
+    patterns sharing a prefix share the work and adding patterns does not add
+    passes over the text. Patterns match case-sensitively, like the substring
+    checks they replace, unless their entry sets 'ignore_case'. When several
+    patterns match, the one with the lowest priority wins, then the earliest
+    offset.
+    """
+
+    # Known log signatures, in the order the collector has always checked them
+    LOG_PATTERNS = [
+        {'pattern': 'AssertionError', 'category': 'Test assertion failed'},
+        {'pattern': 'ModuleNotFoundError', 'category': 'Missing dependency'},
+        {'pattern': 'Timeout', 'category': 'Job timed out'},
+        {'pattern': 'Permission denied', 'category': 'Permission error'},
+        {'pattern': 'Connection refused', 'category': 'Network connection failed'}
+    ]
+
+    # Keywords used to bucket failure reasons for pattern analysis; these
+    # were always checked against the lowercased reason
+    CATEGORY_PATTERNS = [
+        {'pattern': 'test', 'category': 'Test Failures', 'ignore_case': True},
+        {'pattern': 'build', 'category': 'Build Failures', 'ignore_case': True},
+        {'pattern': 'timeout', 'category': 'Timeout Issues', 'ignore_case': True},
+        {'pattern': 'dependency', 'category': 'Dependency Problems', 'ignore_case': True},
+        {'pattern': 'permission', 'category': 'Permission Issues', 'ignore_case': True},
+        {'pattern': 'network', 'category': 'Network Problems', 'ignore_case': True},
+        {'pattern': 'connection', 'category': 'Network Problems', 'ignore_case': True}
+    ]
+
+    def __init__(self, patterns: List[Dict]):
+        """
+        Args:
+            patterns: Dicts with 'pattern' and 'category', and optionally
+                'priority' (defaults to list position) and 'ignore_case'
+        """
+        # Keyed by (ignore_case, pattern); case-insensitive patterns are lowercased
+        self._patterns = {}
+        for position, entry in enumerate(patterns):
+            ignore_case = bool(entry.get('ignore_case'))
+            key = (ignore_case, entry['pattern'].lower() if ignore_case else entry['pattern'])
+            if not key[1] or key in self._patterns:
+                continue
+            self._patterns[key] = {
+                'pattern': entry['pattern'],
+                'category': entry['category'],
+                'priority': entry.get('priority', position)
+            }
+
+        # For each pattern, the other patterns that are prefixes of it. The
+        # regex reports the longest match at each offset, so these are checked
+        # explicitly to keep shorter overlapping patterns visible.
+        self._prefixes = {
+            key: [other for other in self._patterns
+                  if other != key and other[0] == key[0] and key[1].startswith(other[1])]
+            for key in self._patterns
+        }
+        self._regex = self._compile(
+            [text for ignore_case, text in self._patterns if not ignore_case],
+            [text for ignore_case, text in self._patterns if ignore_case]
+        ) if self._patterns else None
+
+        self._lock = threading.Lock()
+        self._hits = Counter()
+
+    @classmethod
+    def from_database(cls, db, defaults: List[Dict] = None) -> 'FailureClassifier':
+        """Build a classifier from the error_patterns table.
+
+        Default patterns keep their priority ahead of the stored ones, and
+        stored patterns use their error_type as the category.
+        """
+        patterns = list(defaults or [])
+        for row in db.get_error_patterns():
+            patterns.append({'pattern': row['pattern'], 'category': row['error_type']})
+        return cls(patterns)
+
+    def matches(self, text: str) -> Iterator[Dict]:
+        """Yield every pattern occurrence in text with its category and offset."""
+        if self._regex is None or not text:
+            return
+        for match in self._regex.finditer(text):
+            sensitive, insensitive = match.group(1), match.group(2) or match.group(3)
+            keys = []
+            if sensitive is not None:
+                keys.append((False, sensitive))
+            if insensitive is not None:
+                keys.append((True, insensitive.lower()))
+            for found in [k for key in keys for k in [key] + self._prefixes[key]]:
+                entry = self._patterns[found]
+                yield {
+                    'category': entry['category'],
+                    'pattern': entry['pattern'],
+                    'priority': entry['priority'],
+                    'offset': match.start()
+                }
+
+    def classify(self, text: str, record: bool = True) -> Optional[Dict]:
+        """Classify text, returning the best match's category, pattern and offset."""
+        best = self.best_match(self.matches(text))
+        if best and record:
+            self.record_hit(best['pattern'])
+        return best
+
+    def best_match(self, candidates) -> Optional[Dict]:
+        """Pick the winning match: lowest priority, then earliest offset."""
+        return min(candidates, key=lambda m: (m['priority'], m['offset']), default=None)
+
+    def record_hit(self, pattern: str):
+        """Count a hit to be written to error_patterns on the next flush."""
+        with self._lock:
+            self._hits[pattern] += 1
+
+    def flush(self, db):
+        """Write the pending hit counts to error_patterns in one batch."""
+        with self._lock:
+            hits, self._hits = dict(self._hits), Counter()
+        if hits:
+            db.record_pattern_hits(hits, datetime.now().isoformat())
+        return hits
+
+    @staticmethod
+    def _compile(sensitive: List[str], insensitive: List[str]):
+        """Compile patterns into trie-shaped regexes joined into one.
+
+        Group 1 holds a case-sensitive match and group 2 or 3 a
+        case-insensitive one; insensitive patterns are wrapped in (?i:...)
+        so they never loosen the others. The lookaheads let matches start
+        inside an earlier match, so overlapping patterns are all reported.
+        """
+        def build(keys: List[str]) -> Dict:
+            trie = {}
+            for key in keys:
+                node = trie
+                for char in key:
+                    node = node.setdefault(char, {})
+                node[''] = True
+            return trie
+
+        def render(node) -> str:
+            branches = [re.escape(char) + render(child) for char, child in sorted(node.items()) if char]
+            if not branches:
+                return ''
+            body = branches[0] if len(branches) == 1 else '(?:' + '|'.join(branches) + ')'
+            if '' in node:
+                # A pattern ends here, longer continuations are optional
+                return '(?:' + body + ')?'
+            return body
+
+        # An empty side compiles to (?!), which never matches
+        cased = render(build(sensitive)) if sensitive else '(?!)'
+        folded = '(?i:' + render(build(insensitive)) + ')' if insensitive else '(?!)'
+        return re.compile('(?=(' + cased + '))(?=(' + folded + '))?|(?=(' + folded + '))')
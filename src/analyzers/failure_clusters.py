@@ -0,0 +1,193 @@
+# src/analyzers/failure_clusters.py
+
+import hashlib
+import re
+import threading
+import zlib
+from typing import Dict, List, Tuple
+
+import numpy as np
+
+from src.analyzers.fingerprint import normalize_failure_text
+
+# Word n-grams per shingle, and how much of a long stack trace is shingled
+SHINGLE_SIZE = 3
+MAX_TOKENS = 2000
+
+# Smallest prime above 2**32; with a, b and shingle hashes below 2**32,
+# a * x + b stays inside uint64 so the permutations need no big integers
+_PRIME = np.uint64((1 << 32) + 15)
+
+_TOKEN = re.compile(r'<\w+>|\w+')
+
+def shingle_hashes(text: str, size: int = SHINGLE_SIZE) -> np.ndarray:
+    """Hashes of the distinct word n-grams of normalized failure text."""
+    tokens = _TOKEN.findall(normalize_failure_text(text))[:MAX_TOKENS]
+    if len(tokens) < size:
+        grams = {' '.join(tokens)} if tokens else set()
+    else:
+        grams = {' '.join(tokens[i:i + size]) for i in range(len(tokens) - size + 1)}
+    return np.fromiter((zlib.crc32(gram.encode('utf-8')) for gram in grams), dtype=np.uint64, count=len(grams))
+
+class MinHasher:
+    """MinHash signatures split into LSH bands.
+
+    Two texts agree on each signature position with probability equal to
+    the Jaccard similarity of their shingle sets, so texts that agree on
+    every row of at least one band are likely near-duplicates. With the
+    defaults (32 bands of 4 rows) texts about 0.5 similar or more share a
+    band with high probability, while dissimilar ones rarely do.
+    """
+
+    def __init__(self, bands: int = 32, rows: int = 4, seed: int = 1):
+        self.bands = bands
+        self.rows = rows
+        self.num_perm = bands * rows
+        rng = np.random.RandomState(seed)
+        self._a = rng.randint(1, 1 << 32, size=self.num_perm, dtype=np.uint64)
+        self._b = rng.randint(0, 1 << 32, size=self.num_perm, dtype=np.uint64)
+
+    def signature(self, text: str) -> np.ndarray:
+        """MinHash signature of a text as uint32, one value per permutation."""
+        hashes = shingle_hashes(text)
+        if not len(hashes):
+            return np.zeros(self.num_perm, dtype=np.uint32)
+        permuted = (np.outer(hashes, self._a) + self._b) % _PRIME
+        return permuted.min(axis=0).astype(np.uint32)
+
+    def band_keys(self, signature: np.ndarray) -> List[Tuple[int, int]]:
+        """(band, bucket) pairs; the bucket is a signed 64-bit hash of the band's rows."""
+        return [
+            (band, int.from_bytes(hashlib.blake2b(row.tobytes(), digest_size=8).digest(), 'big', signed=True))
+            for band, row in enumerate(signature.reshape(self.bands, self.rows))
+        ]
+
+def similarity(signature: np.ndarray, others: np.ndarray) -> np.ndarray:
+    """Estimated Jaccard similarity of one signature to each row of others."""
+    return (others == signature).mean(axis=-1)
+
+def signature_from_bytes(data: bytes) -> np.ndarray:
+    return np.frombuffer(data, dtype=np.uint32)
+
+def _best_match(signature: np.ndarray, candidates: List[Tuple[int, np.ndarray]], threshold: float):
+    """Cluster of the most similar (cluster, signature) candidate at or above threshold, or None."""
+    if not candidates:
+        return None
+    scores = similarity(signature, np.array([other for _, other in candidates]))
+    best = int(scores.argmax())
+    return candidates[best][0] if scores[best] >= threshold else None
+
+def cluster_texts(texts: List[str], hasher: MinHasher = None, threshold: float = 0.5) -> List[int]:
+    """Cluster near-duplicate texts in memory.
+
+    Returns a cluster number per text. Each text joins the cluster of its
+    most similar earlier text when they are at least threshold similar.
+    Only texts sharing an LSH bucket are compared, so this stays far below
+    quadratic time.
+    """
+    hasher = hasher or MinHasher()
+    assigned: List[int] = []
+    buckets: Dict[Tuple[int, int], Dict[int, np.ndarray]] = {}
+    clusters = 0
+
+    for text in texts:
+        signature = hasher.signature(text or '')
+        keys = hasher.band_keys(signature)
+        candidates = [item for key in keys for item in buckets.get(key, {}).items()]
+        cluster = _best_match(signature, candidates, threshold)
+        if cluster is None:
+            cluster, clusters = clusters, clusters + 1
+        assigned.append(cluster)
+        for key in keys:
+            buckets.setdefault(key, {}).setdefault(cluster, signature)
+    return assigned
+
+class FailureClusterer:
+    """Keeps persisted near-duplicate clusters of failure signatures up to date.
+
+    Clustering works on distinct fingerprints: each new one gets a MinHash
+    signature of its text (a run's failure_reason, or a test's failure
+    message and stack trace), its LSH buckets are looked up in
+    cluster_lsh_buckets, and it joins the cluster of the most similar
+    candidate if their estimated similarity reaches threshold, otherwise
+    it starts a new cluster. A fingerprint never changes cluster, so
+    cluster ids are stable across updates. Each update reads only rows added
+    since the last one (watermarks in engine_state), so the cost follows
+    the number of new failures, not the size of the history.
+    """
+
+    SOURCES = {
+        'run': 'clusters_last_run_id',
+        'test': 'clusters_last_result_id'
+    }
+
+    def __init__(self, db, hasher: MinHasher = None, threshold: float = 0.5, chunk_size: int = 5000):
+        self.db = db
+        self.hasher = hasher or MinHasher()
+        self.threshold = threshold
+        self.chunk_size = chunk_size
+        self._lock = threading.Lock()
+
+    def update(self) -> int:
+        """Cluster every failure stored since the last update. Returns new fingerprints clustered."""
+        with self._lock:
+            clustered = 0
+            for source, state_key in self.SOURCES.items():
+                last_id = int(self.db.get_state(state_key, '0'))
+                while True:
+                    rows = self.db.get_failure_texts_after(source, last_id, self.chunk_size)
+                    if not rows:
+                        break
+                    last_id = rows[-1]['id']
+                    clustered += self._cluster_chunk(rows, state_key, last_id)
+            return clustered
+
+    def _cluster_chunk(self, rows: List[Dict], state_key: str, last_id: int) -> int:
+        # First text of each fingerprint not clustered yet
+        texts: Dict[str, str] = {}
+        for row in rows:
+            texts.setdefault(row['fingerprint'], row['text'])
+        known = self.db.get_fingerprint_clusters(list(texts))
+        texts = {fingerprint: text for fingerprint, text in texts.items() if fingerprint not in known}
+
+        pending = []
+        for fingerprint, text in texts.items():
+            signature = self.hasher.signature(text)
+            pending.append((fingerprint, text, signature, self.hasher.band_keys(signature)))
+
+        # Stored candidates: one member per cluster and bucket
+        stored = self.db.get_lsh_candidates([key for *_, keys in pending for key in keys])
+        stored_signatures = {
+            fingerprint: signature_from_bytes(data)
+            for fingerprint, data in self.db.get_cluster_signatures(
+                list({fingerprint for members in stored.values() for _, fingerprint in members})
+            ).items()
+        }
+
+        # Clusters created in this chunk get negative references until stored
+        local: Dict[Tuple[int, int], Dict[int, np.ndarray]] = {}
+        new_clusters: Dict[int, str] = {}
+        members = []
+        for fingerprint, text, signature, keys in pending:
+            candidates = []
+            for key in keys:
+                candidates.extend((cluster_id, stored_signatures[member])
+                                  for cluster_id, member in stored.get(key, ()) if member in stored_signatures)
+                candidates.extend(local.get(key, {}).items())
+
+            cluster = _best_match(signature, candidates, self.threshold)
+            if cluster is None:
+                cluster = -(len(new_clusters) + 1)
+                new_clusters[cluster] = text[:300]
+            for key in keys:
+                local.setdefault(key, {}).setdefault(cluster, signature)
+            members.append((fingerprint, cluster, signature, keys))
+
+        self.db.store_failure_clusters(
+            members=[(fingerprint, cluster, signature.tobytes()) for fingerprint, cluster, signature, _ in members],
+            buckets=[(band, bucket, cluster, fingerprint)
+                     for fingerprint, cluster, _, keys in members for band, bucket in keys],
+            new_clusters=new_clusters,
+            state=(state_key, last_id)
+        )
+        return len(members)
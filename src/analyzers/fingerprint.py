@@ -0,0 +1,77 @@
+# src/analyzers/fingerprint.py
+
+import hashlib
+import re
+from typing import Dict, List, Optional
+
+# Extensions whose "file.ext:12" suffix is a line number
+_SOURCE_EXTENSIONS = (
+    r'py|pyx|js|jsx|mjs|cjs|ts|tsx|java|kt|kts|scala|groovy|go|rs|rb|php|cs|fs|swift|m|mm|'
+    r'c|cc|cpp|cxx|h|hh|hpp|sh|bash|ps1|pl|lua|dart|ex|exs|erl|vue|svelte|yml|yaml|json|toml'
+)
+
+# Applied in order; earlier rules must not leave text a later rule would mangle.
+# Any other number (exit codes, ports, versions) tells failures apart, so it stays.
+_NORMALIZERS = [
+    # ISO timestamps and plain dates / times
+    (re.compile(r'\d{4}-\d{2}-\d{2}[t ]\d{2}:\d{2}:\d{2}(?:[.,]\d+)?(?:z|[+-]\d{2}:?\d{2})?'), '<ts>'),
+    (re.compile(r'\d{4}-\d{2}-\d{2}'), '<date>'),
+    (re.compile(r'\b\d{1,2}:\d{2}:\d{2}(?:[.,]\d+)?\b'), '<time>'),
+    # UUIDs, hex addresses and long hex ids such as commit shas
+    (re.compile(r'\b[0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12}\b'), '<uuid>'),
+    (re.compile(r'0x[0-9a-f]+'), '<addr>'),
+    (re.compile(r'\b(?=[0-9a-f]*\d)(?=[0-9a-f]*[a-f])[0-9a-f]{7,}\b'), '<hex>'),
+    # Temporary and per-runner paths
+    (re.compile(r'(?:/tmp|/var/folders|/private/var/folders|/home/runner/work/_temp|[a-z]:\\users\\[^\\\s]+\\appdata\\local\\temp)[^\s\'":,)]*'), '<tmp>'),
+    # Line and column numbers; only after a source file name, so host:port
+    # and dotted versions are kept
+    (re.compile(r'\bline \d+'), 'line <n>'),
+    (re.compile(r'(\.(?:' + _SOURCE_EXTENSIONS + r'))[:(]\d+(?:[:,]\d+)?\)?'), r'\1:<n>'),
+    # Run and job ids
+    (re.compile(r'\b(run|job|build|attempt)([ _#/-]?(?:id)?[ :#=_/-]?)\d+'), r'\1\2<id>'),
+    (re.compile(r'#\d+'), '#<id>'),
+    (re.compile(r'\s+'), ' ')
+]
+
+def normalize_failure_text(text: str) -> str:
+    """Strip the parts of a failure message that change from run to run."""
+    if not text:
+        return ''
+    normalized = text.lower()
+    for pattern, replacement in _NORMALIZERS:
+        normalized = pattern.sub(replacement, normalized)
+    return normalized.strip()
+
+def failure_fingerprint(*parts: str) -> Optional[str]:
+    """Get a stable signature hash for failure text, or None if there is no text.
+
+    Pass the fields that describe the failure, e.g. failure_message and
+    stack_trace; runs that differ only in timestamps, addresses, temp paths,
+    line numbers or ids share a fingerprint.
+    """
+    normalized = [normalize_failure_text(part) for part in parts]
+    if not any(normalized):
+        return None
+    return hashlib.sha1('\x1f'.join(normalized).encode('utf-8')).hexdigest()[:16]
+
+# Fields that scope a shared analysis: one workflow failing the same way
+ANALYSIS_FIELDS = ('workflow_name', 'failure_reason')
+
+def group_by_fingerprint(failures: List[Dict], *fields: str) -> Dict[str, List[Dict]]:
+    """Group failures by signature, keeping first-seen order.
+
+    With fields given, hashes those fields. Without, uses a stored
+    'fingerprint' when present and otherwise hashes failure_reason.
+    Failures without any text fall back to their own run id so they are
+    never merged.
+    """
+    groups = {}
+    for failure in failures:
+        if fields:
+            signature = failure_fingerprint(*(failure.get(f) for f in fields))
+        else:
+            signature = failure.get('fingerprint') or failure_fingerprint(failure.get('failure_reason'))
+        if signature is None:
+            signature = f"run:{failure.get('run_id')}"
+        groups.setdefault(signature, []).append(failure)
+    return groups
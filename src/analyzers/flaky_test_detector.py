@@ -0,0 +1,91 @@
+# src/analyzers/flaky_test_detector.py
+
+import threading
+from typing import Dict, List
+
+class FlakyTestDetector:
+    """Keeps per-test flakiness counters up to date from new test results.
+
+    Each update folds only the test_results rows added since the last one
+    (tracked by row id in engine_state) into the test_flakiness summary
+    table. A test earns flake signal when its status flips between
+    consecutive results, doubly so when the flip happens on the same commit,
+    and when it passes only after retries. The signal feeds an exponentially
+    decayed score, so old flakiness fades as a test stays stable.
+    """
+
+    STATE_KEY = 'flakiness_last_result_id'
+
+    def __init__(self, db, decay: float = 0.9, chunk_size: int = 10000):
+        self.db = db
+        self.decay = decay
+        self.chunk_size = chunk_size
+        self._lock = threading.Lock()
+
+    def update(self) -> int:
+        """Fold every unprocessed test result into the counters. Returns rows processed."""
+        with self._lock:
+            processed = 0
+            last_id = int(self.db.get_state(self.STATE_KEY, '0'))
+            while True:
+                results = self.db.get_test_results_after(last_id, self.chunk_size)
+                if not results:
+                    return processed
+
+                test_names = list({result['test_name'] for result in results})
+                summaries = self.db.get_test_flakiness(test_names)
+                for result in results:
+                    summary = summaries.get(result['test_name'])
+                    if summary is None:
+                        summary = summaries[result['test_name']] = self._empty_summary(result['test_name'])
+                    self._apply(summary, result)
+
+                last_id = results[-1]['id']
+                self.db.store_test_flakiness(summaries.values(), last_id)
+                processed += len(results)
+
+    def get_top_flaky_tests(self, limit: int = 50) -> List[Dict]:
+        """Get the most flaky tests, served from the summary table."""
+        return self.db.get_top_flaky_tests(limit)
+
+    def _apply(self, summary: Dict, result: Dict):
+        """Update one test's counters with its next result."""
+        status = result['status']
+        if status not in ('passed', 'failed'):
+            return
+
+        signal = 0.0
+        summary['runs'] += 1
+        if status == 'failed':
+            summary['failures'] += 1
+
+        if summary['last_status'] and summary['last_status'] != status:
+            summary['flips'] += 1
+            signal += 1.0
+            if result['commit_sha'] and result['commit_sha'] == summary['last_commit']:
+                # Same code, different outcome
+                summary['same_commit_flips'] += 1
+                signal += 1.0
+
+        if status == 'passed' and (result['retry_count'] or 0) > 0:
+            summary['retry_passes'] += 1
+            signal += 1.0
+
+        summary['flake_score'] = summary['flake_score'] * self.decay + signal
+        summary['last_status'] = status
+        summary['last_commit'] = result['commit_sha']
+        summary['last_seen'] = result['started_at'] or result['created_at']
+
+    def _empty_summary(self, test_name: str) -> Dict:
+        return {
+            'test_name': test_name,
+            'runs': 0,
+            'failures': 0,
+            'flips': 0,
+            'same_commit_flips': 0,
+            'retry_passes': 0,
+            'flake_score': 0.0,
+            'last_status': None,
+            'last_commit': None,
+            'last_seen': None
+        }
@@ -2,13 +2,49 @@
 
 import openai
 from typing import Dict, List
+import json
 import os
 from datetime import datetime
 
+from src.analyzers.failure_classifier import FailureClassifier
+from src.analyzers.failure_clusters import cluster_texts
+from src.analyzers.fingerprint import group_by_fingerprint
+from src.analyzers.llm_cache import LLMResponseCache
+from src.analyzers.llm_executor import LLMExecutor
+
 class GPTAnalyzer:
-    def __init__(self):
-        self.client = openai.OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
+    # Context window of self.model, and the answer budget reserved per failure in batched mode
+    CONTEXT_TOKENS = 16385
+    BATCH_ANSWER_TOKENS = 350
+
+    def __init__(self, classifier: FailureClassifier = None, client=None, cache: LLMResponseCache = None,
+                 executor: LLMExecutor = None):
+        """
+        Args:
+            cache: Answers repeated prompts; None means no caching, pass
+                get_default_cache() for the shared on-disk cache
+        """
+        if executor:
+            # The executor owns retries, so the OpenAI client should not retry on its own
+            self.client = executor.wrap(client or openai.OpenAI(api_key=os.getenv("OPENAI_API_KEY"), max_retries=0))
+        else:
+            self.client = client or openai.OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
+        self.executor = executor
         self.model = "gpt-3.5-turbo-16k"
+        self.classifier = classifier or FailureClassifier(FailureClassifier.CATEGORY_PATTERNS)
+        self.cache = cache
+
+    def _chat(self, **request) -> str:
+        """Run a chat completion, answering repeated prompts from the cache."""
+        if self.cache:
+            return self.cache.complete(self.client, **request)
+        return self.client.chat.completions.create(**request).choices[0].message.content
+
+    def _map(self, fn, items: List) -> List:
+        """Apply fn to items, concurrently when an executor is configured, keeping order."""
+        if self.executor:
+            return self.executor.map(fn, items)
+        return [fn(item) for item in items]
 
     def _generate_fallback_analysis(self, failure_data: Dict) -> str:
         """Generate a basic analysis when GPT API is unavailable."""
@@ -29,7 +65,11 @@ class GPTAnalyzer:
         """
 
     def analyze_failure(self, failure_data: Dict) -> Dict:
-        """Analyze a single failure using GPT."""
+        """Analyze a single failure using GPT.
+
+        When the API call fails the result holds the basic fallback analysis
+        and is marked 'fallback': True, so it is never reused as an answer.
+        """
         
         prompt = f"""
         As a CI/CD expert, analyze this pipeline failure and provide specific, actionable insights:
@@ -50,7 +90,7 @@ class GPTAnalyzer:
         """
         
         try:
-            response = self.client.chat.completions.create(
+            analysis = self._chat(
                 model=self.model,
                 messages=[
                     {"role": "system", "content": "You are an expert CI/CD engineer with deep knowledge of pipeline failures, testing, and best practices."},
@@ -60,11 +100,16 @@ class GPTAnalyzer:
                 max_tokens=1000
             )
             
-            analysis = response.choices[0].message.content
-            
         except Exception as e:
             print(f"Error in GPT analysis: {str(e)}")
-            analysis = self._generate_fallback_analysis(failure_data)
+            return {
+                'failure_id': failure_data['run_id'],
+                'analysis': self._generate_fallback_analysis(failure_data),
+                'timestamp': datetime.now().isoformat(),
+                'workflow_name': failure_data['workflow_name'],
+                'failure_reason': failure_data['failure_reason'],
+                'fallback': True
+            }
         
         return {
             'failure_id': failure_data['run_id'],
@@ -74,20 +119,154 @@ class GPTAnalyzer:
             'failure_reason': failure_data['failure_reason']
         }
 
+    def analyze_failures(self, failures: List[Dict]) -> List[Dict]:
+        """Analyze several failures, returning analyses in the same order."""
+        return self._map(self.analyze_failure, failures)
+
+    def analyze_failures_batched(self, failures: List[Dict], max_batch_size: int = 20) -> List[Dict]:
+        """Analyze failures several per request, returning analyses in the same order.
+        
+        Failures are packed into batches that fit the model's context window,
+        each answered as a JSON array keyed by failure_id. Failures missing
+        from an answer that cannot be parsed are analyzed one by one instead.
+        """
+        batches = self._pack_batches(failures, max_batch_size)
+        results = self._map(self._analyze_batch, batches)
+        return [analysis for batch in results for analysis in batch]
+
+    def _pack_batches(self, failures: List[Dict], max_batch_size: int) -> List[List[Dict]]:
+        """Split failures into batches whose prompt and answers fit the context window."""
+        overhead = self._estimate_tokens(self._batch_prompt([]))
+        batches = []
+        batch, batch_tokens = [], overhead
+        for failure in failures:
+            tokens = self._estimate_tokens(json.dumps(self._compact_failure(failure))) + self.BATCH_ANSWER_TOKENS
+            if batch and (len(batch) >= max_batch_size or batch_tokens + tokens > self.CONTEXT_TOKENS):
+                batches.append(batch)
+                batch, batch_tokens = [], overhead
+            batch.append(failure)
+            batch_tokens += tokens
+        if batch:
+            batches.append(batch)
+        return batches
+
+    def _analyze_batch(self, batch: List[Dict]) -> List[Dict]:
+        """Analyze one batch, falling back to per-failure requests for anything not answered."""
+        if len(batch) == 1:
+            return [self.analyze_failure(batch[0])]
+        
+        try:
+            content = self._chat(
+                model=self.model,
+                messages=[
+                    {"role": "system", "content": "You are an expert CI/CD engineer with deep knowledge of pipeline failures, testing, and best practices."},
+                    {"role": "user", "content": self._batch_prompt([self._compact_failure(f) for f in batch])}
+                ],
+                temperature=0.7,
+                max_tokens=self.BATCH_ANSWER_TOKENS * len(batch)
+            )
+        except Exception as e:
+            print(f"Error in batched GPT analysis: {str(e)}")
+            content = None
+        
+        answers = self._parse_batch_answer(content)
+        truncated = bool(content) and '[' in content and not content.rstrip().rstrip('`').rstrip().endswith(']')
+        if answers is None and truncated and len(batch) > 2:
+            # Most likely cut off at max_tokens, so ask again in halves
+            middle = len(batch) // 2
+            return self._analyze_batch(batch[:middle]) + self._analyze_batch(batch[middle:])
+        
+        answers = answers or {}
+        results = []
+        for failure in batch:
+            analysis = answers.get(str(failure['run_id']))
+            if not analysis:
+                results.append(self.analyze_failure(failure))
+                continue
+            results.append({
+                'failure_id': failure['run_id'],
+                'analysis': analysis,
+                'timestamp': datetime.now().isoformat(),
+                'workflow_name': failure['workflow_name'],
+                'failure_reason': failure['failure_reason']
+            })
+        return results
+
+    def _compact_failure(self, failure: Dict) -> Dict:
+        """The fields of a failure that go into a batched prompt."""
+        return {
+            'failure_id': str(failure['run_id']),
+            'workflow': failure['workflow_name'],
+            'reason': failure['failure_reason'],
+            'duration': failure['duration'],
+            'branch': failure['branch']
+        }
+
+    def _batch_prompt(self, records: List[Dict]) -> str:
+        """Build the prompt asking for one analysis per failure record."""
+        return f"""
+        As a CI/CD expert, analyze each of these pipeline failures and provide specific, actionable insights.
+
+        Failures (JSON, one object per failure):
+        {json.dumps(records, separators=(',', ':'))}
+
+        For each failure cover:
+        1. Root Cause: What likely caused this failure?
+        2. Immediate Fix: What specific steps should be taken to fix this?
+        3. Prevention: How can similar failures be prevented in the future?
+        4. Best Practices: What CI/CD best practices should be implemented?
+
+        Respond with only a JSON array containing one object per failure, in any order:
+        [{{"failure_id": "<failure_id from the input>", "analysis": "<the analysis as bullet points>"}}]
+        """
+
+    def _parse_batch_answer(self, content: str) -> Dict[str, str]:
+        """Map failure_id to analysis from a batched answer, or None if it is not a JSON array."""
+        if not content:
+            return None
+        start, end = content.find('['), content.rfind(']')
+        if start == -1 or end < start:
+            return None
+        try:
+            items = json.loads(content[start:end + 1])
+        except ValueError:
+            return None
+        if not isinstance(items, list):
+            return None
+        
+        answers = {}
+        for item in items:
+            if isinstance(item, dict) and item.get('failure_id') is not None and item.get('analysis'):
+                analysis = item['analysis']
+                if isinstance(analysis, list):
+                    analysis = '\n'.join(f"- {line}" for line in analysis)
+                answers[str(item['failure_id'])] = str(analysis)
+        return answers
+
+    def _estimate_tokens(self, text: str) -> int:
+        """Rough token count, about four characters per token."""
+        return len(text) // 4 + 1
+
     def analyze_failure_patterns(self, failures: List[Dict]) -> Dict:
-        """Analyze patterns across multiple failures using GPT."""
+        """Analyze patterns across multiple failures using GPT, once per cluster."""
         
-        # Group failures by type
+        # Group failures by cluster
         failure_types = self._group_failures_by_type(failures)
         
-        pattern_analysis = {}
-        for failure_type, type_failures in failure_types.items():
-            prompt = f"""
+        analyses = self._map(self._analyze_failure_type, list(failure_types.items()))
+        return dict(zip(failure_types, analyses))
+
+    def _analyze_failure_type(self, item) -> str:
+        """Analyze the failures of one type for common patterns."""
+        failure_type, type_failures = item
+        # Show distinct failures rather than repeats of the same signature
+        distinct = [group[0] for group in group_by_fingerprint(type_failures).values()]
+        prompt = f"""
             As a CI/CD expert, analyze these {failure_type} failures and identify patterns:
 
-            Number of failures: {len(type_failures)}
+            Number of failures: {len(type_failures)} ({len(distinct)} distinct)
             Recent failures:
-            {self._format_failures(type_failures[:5])}
+            {self._format_failures(distinct[:5])}
 
             Please provide:
             1. Common Patterns: What patterns do you see in these failures?
@@ -97,56 +276,55 @@ class GPTAnalyzer:
 
             Format your response in a clear, structured way with bullet points.
             """
-            
-            try:
-                response = self.client.chat.completions.create(
-                    model=self.model,
-                    messages=[
-                        {"role": "system", "content": "You are an expert CI/CD engineer analyzing patterns in pipeline failures."},
-                        {"role": "user", "content": prompt}
-                    ],
-                    temperature=0.7,
-                    max_tokens=1000
-                )
-                
-                pattern_analysis[failure_type] = response.choices[0].message.content
-                
-            except Exception as e:
-                print(f"Error in pattern analysis: {str(e)}")
-                pattern_analysis[failure_type] = "Error in pattern analysis"
-        
-        return pattern_analysis
+        
+        try:
+            return self._chat(
+                model=self.model,
+                messages=[
+                    {"role": "system", "content": "You are an expert CI/CD engineer analyzing patterns in pipeline failures."},
+                    {"role": "user", "content": prompt}
+                ],
+                temperature=0.7,
+                max_tokens=1000
+            )
+        except Exception as e:
+            print(f"Error in pattern analysis: {str(e)}")
+            return "Error in pattern analysis"
 
     def _group_failures_by_type(self, failures: List[Dict]) -> Dict[str, List[Dict]]:
-        """Group failures by their type."""
-        failure_types = {}
+        """Group failures into clusters of near-duplicates, named by their type.
         
+        Failures carrying a stored 'cluster_id' are grouped by it; the rest
+        are clustered here on their failure reason. Failures left alone in
+        a cluster are grouped by type, so one-offs are still analyzed
+        together rather than one request each.
+        """
+        clusters = {}
+        unclustered = [failure for failure in failures if failure.get('cluster_id') is None]
+        numbers = iter(cluster_texts([failure['failure_reason'] or '' for failure in unclustered]))
         for failure in failures:
-            failure_type = self._categorize_failure(failure)
-            if failure_type not in failure_types:
-                failure_types[failure_type] = []
-            failure_types[failure_type].append(failure)
+            if failure.get('cluster_id') is not None:
+                key = ('stored', failure['cluster_id'])
+            else:
+                key = ('local', next(numbers))
+            clusters.setdefault(key, []).append(failure)
+        
+        failure_types = {}
+        for (kind, cluster_id), members in clusters.items():
+            failure_type = self._categorize_failure(members[0])
+            if len(members) > 1:
+                if kind == 'stored':
+                    failure_type = f"{failure_type} (cluster {cluster_id})"
+                else:
+                    failure_type = f"{failure_type} (like run {members[0]['run_id']})"
+            failure_types.setdefault(failure_type, []).extend(members)
         
         return failure_types
 
     def _categorize_failure(self, failure: Dict) -> str:
         """Categorize a failure into a specific type."""
-        reason = failure['failure_reason'].lower()
-        
-        if 'test' in reason:
-            return 'Test Failures'
-        elif 'build' in reason:
-            return 'Build Failures'
-        elif 'timeout' in reason:
-            return 'Timeout Issues'
-        elif 'dependency' in reason:
-            return 'Dependency Problems'
-        elif 'permission' in reason:
-            return 'Permission Issues'
-        elif 'network' in reason or 'connection' in reason:
-            return 'Network Problems'
-        else:
-            return 'Other Issues'
+        match = self.classifier.classify(failure['failure_reason'] or '', record=False)
+        return match['category'] if match else 'Other Issues'
 
     def _format_failures(self, failures: List[Dict]) -> str:
         """Format failures for the prompt."""
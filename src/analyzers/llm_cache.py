@@ -0,0 +1,241 @@
+# src/analyzers/llm_cache.py
+
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Optional
+
+from src.utils.paths import DEFAULT_LLM_CACHE_PATH, project_path
+
+class LLMResponseCache:
+    """Persistent cache of chat completion answers keyed by the exact request.
+
+    The key is a hash of the model, every message (system and user prompt)
+    and the sampling parameters, so only byte-for-byte identical requests
+    share an answer. Entries expire after ttl seconds and are evicted
+    least-recently-used first once the total answer size goes over
+    max_bytes. Recent hits are also kept in memory so repeated lookups skip
+    SQLite reads; their access times are written back every access_batch
+    hits (and always before evicting), so entries served from memory still
+    count as recently used.
+    """
+
+    def __init__(self, db_path: str = DEFAULT_LLM_CACHE_PATH, ttl: int = 7 * 24 * 3600,
+                 max_bytes: int = 64 * 1024 * 1024, memory_entries: int = 256,
+                 access_batch: int = 64):
+        self.db_path = db_path
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self.memory_entries = memory_entries
+        self.access_batch = access_batch
+        self._lock = threading.Lock()
+        self._memory: OrderedDict = OrderedDict()
+        self._accessed: Dict[str, float] = {}
+        self._unflushed_hits = 0
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        self._conn.execute('PRAGMA journal_mode=WAL')
+        self._conn.execute('''
+            CREATE TABLE IF NOT EXISTS llm_cache (
+                cache_key TEXT PRIMARY KEY,
+                model TEXT,
+                response TEXT,
+                size INTEGER,
+                created_at REAL,
+                last_access REAL
+            )
+        ''')
+        self._conn.execute('CREATE INDEX IF NOT EXISTS idx_llm_cache_last_access ON llm_cache(last_access)')
+        self._conn.commit()
+        self._total_bytes = self._conn.execute('SELECT COALESCE(SUM(size), 0) FROM llm_cache').fetchone()[0]
+
+        self.stats = {
+            'hits': 0,
+            'misses': 0,
+            'stores': 0,
+            'expired': 0,
+            'evictions': 0
+        }
+
+    @staticmethod
+    def make_key(request: Dict) -> str:
+        """Hash a chat completion request (model, messages and parameters)."""
+        canonical = json.dumps(request, sort_keys=True, separators=(',', ':'), default=str)
+        return hashlib.sha256(canonical.encode('utf-8')).hexdigest()
+
+    def get(self, cache_key: str) -> Optional[str]:
+        """Get a cached answer, or None if it is missing or expired."""
+        now = time.time()
+        with self._lock:
+            entry = self._memory.get(cache_key)
+            if entry is not None and entry[1] > now:
+                self._memory.move_to_end(cache_key)
+                self._accessed[cache_key] = now
+                self._unflushed_hits += 1
+                if self._unflushed_hits >= self.access_batch:
+                    self._flush_access()
+                    self._conn.commit()
+                self.stats['hits'] += 1
+                return entry[0]
+
+            row = self._conn.execute(
+                'SELECT response, created_at FROM llm_cache WHERE cache_key = ?', (cache_key,)
+            ).fetchone()
+            if row is None:
+                self.stats['misses'] += 1
+                return None
+            if row[1] + self.ttl <= now:
+                self._delete(cache_key)
+                self._conn.commit()
+                self.stats['expired'] += 1
+                self.stats['misses'] += 1
+                return None
+
+            self._accessed[cache_key] = now
+            self._flush_access()
+            self._conn.commit()
+            self._remember(cache_key, row[0], row[1] + self.ttl)
+            self.stats['hits'] += 1
+            return row[0]
+
+    def store(self, cache_key: str, model: str, response: str):
+        """Store an answer, evicting old entries if the cache is full."""
+        size = len(response.encode('utf-8'))
+        if size > self.max_bytes:
+            return
+
+        now = time.time()
+        with self._lock:
+            old = self._conn.execute('SELECT size FROM llm_cache WHERE cache_key = ?', (cache_key,)).fetchone()
+            self._conn.execute('''
+                INSERT OR REPLACE INTO llm_cache
+                (cache_key, model, response, size, created_at, last_access)
+                VALUES (?, ?, ?, ?, ?, ?)
+            ''', (cache_key, model, response, size, now, now))
+            self._total_bytes += size - (old[0] if old else 0)
+            self.stats['stores'] += 1
+            self._remember(cache_key, response, now + self.ttl)
+            self._evict()
+            self._conn.commit()
+
+    def complete(self, client, **request) -> str:
+        """Get the answer text for a chat completion request, calling client only on a miss.
+
+        client is anything with chat.completions.create(**request), such as
+        openai.OpenAI or a local stub. Errors from the client are not cached.
+        """
+        cache_key = self.make_key(request)
+        cached = self.get(cache_key)
+        if cached is not None:
+            return cached
+
+        response = client.chat.completions.create(**request)
+        content = response.choices[0].message.content
+        if content is not None:
+            self.store(cache_key, request.get('model'), content)
+        return content
+
+    def flush(self):
+        """Write pending access times from in-memory hits to SQLite."""
+        with self._lock:
+            self._flush_access()
+            self._conn.commit()
+
+    def get_stats(self) -> Dict:
+        """Return hit/miss counters, hit rate and current size."""
+        with self._lock:
+            stats = dict(self.stats)
+            stats['bytes'] = self._total_bytes
+        lookups = stats['hits'] + stats['misses']
+        stats['hit_rate'] = stats['hits'] / lookups if lookups else 0.0
+        return stats
+
+    def purge_expired(self) -> int:
+        """Delete every expired answer. Returns the number removed."""
+        with self._lock:
+            cutoff = time.time() - self.ttl
+            removed = self._conn.execute(
+                'SELECT COALESCE(SUM(size), 0), COUNT(*) FROM llm_cache WHERE created_at <= ?', (cutoff,)
+            ).fetchone()
+            self._conn.execute('DELETE FROM llm_cache WHERE created_at <= ?', (cutoff,))
+            self._conn.commit()
+            self._total_bytes -= removed[0]
+            self.stats['expired'] += removed[1]
+            self._memory.clear()
+            self._accessed.clear()
+            return removed[1]
+
+    def clear(self):
+        """Remove every cached answer."""
+        with self._lock:
+            self._conn.execute('DELETE FROM llm_cache')
+            self._conn.commit()
+            self._memory.clear()
+            self._accessed.clear()
+            self._total_bytes = 0
+
+    def _remember(self, cache_key: str, response: str, expires_at: float):
+        """Keep an answer in the in-memory layer. Call with the lock held."""
+        self._memory[cache_key] = (response, expires_at)
+        self._memory.move_to_end(cache_key)
+        while len(self._memory) > self.memory_entries:
+            self._memory.popitem(last=False)
+
+    def _flush_access(self):
+        """Write pending access times; the caller commits. Call with the lock held."""
+        if self._accessed:
+            self._conn.executemany(
+                'UPDATE llm_cache SET last_access = MAX(last_access, ?) WHERE cache_key = ?',
+                [(accessed, cache_key) for cache_key, accessed in self._accessed.items()]
+            )
+            self._accessed.clear()
+        self._unflushed_hits = 0
+
+    def _delete(self, cache_key: str):
+        """Remove one entry. Call with the lock held."""
+        row = self._conn.execute('SELECT size FROM llm_cache WHERE cache_key = ?', (cache_key,)).fetchone()
+        if row:
+            self._conn.execute('DELETE FROM llm_cache WHERE cache_key = ?', (cache_key,))
+            self._total_bytes -= row[0]
+        self._memory.pop(cache_key, None)
+
+    def _evict(self):
+        """Drop least recently used entries until under max_bytes. Call with the lock held."""
+        if self._total_bytes > self.max_bytes:
+            self._flush_access()
+        while self._total_bytes > self.max_bytes:
+            rows = self._conn.execute(
+                'SELECT cache_key, size FROM llm_cache ORDER BY last_access LIMIT 32'
+            ).fetchall()
+            if not rows:
+                self._total_bytes = 0
+                return
+            for cache_key, size in rows:
+                if self._total_bytes <= self.max_bytes:
+                    break
+                self._conn.execute('DELETE FROM llm_cache WHERE cache_key = ?', (cache_key,))
+                self._memory.pop(cache_key, None)
+                self._total_bytes -= size
+                self.stats['evictions'] += 1
+
+_shared_caches: Dict[str, LLMResponseCache] = {}
+_shared_lock = threading.Lock()
+
+def get_shared_cache(db_path: str = DEFAULT_LLM_CACHE_PATH) -> LLMResponseCache:
+    """Get the process-wide response cache for db_path, creating it on first use."""
+    with _shared_lock:
+        if db_path not in _shared_caches:
+            _shared_caches[db_path] = LLMResponseCache(db_path)
+        return _shared_caches[db_path]
+
+def get_default_cache() -> Optional[LLMResponseCache]:
+    """Get the shared cache at LLM_CACHE_PATH (default llm_cache.db); an empty path disables caching.
+    
+    Relative paths are taken from the project root, so every script uses
+    the same cache whichever directory it is started from.
+    """
+    db_path = os.getenv('LLM_CACHE_PATH', DEFAULT_LLM_CACHE_PATH)
+    return get_shared_cache(project_path(db_path)) if db_path else None
@@ -0,0 +1,216 @@
+# src/analyzers/llm_executor.py
+
+import collections
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, List
+
+import openai
+
+class TokenRateLimiter:
+    """Keeps chat completion traffic under requests- and tokens-per-minute budgets.
+
+    Every request reserves its estimated token cost in a sliding one-minute
+    window and blocks until both budgets have room. A single request larger
+    than the whole token budget is let through once the window is empty,
+    so it cannot wait forever. pause() holds every request back, for when
+    the API itself reports a rate limit.
+    """
+
+    WINDOW = 60.0
+
+    def __init__(self, requests_per_minute: int = 500, tokens_per_minute: int = 90000):
+        self.requests_per_minute = requests_per_minute
+        self.tokens_per_minute = tokens_per_minute
+        self._cond = threading.Condition()
+        self._window = collections.deque()
+        self._tokens = 0
+        self._paused_until = 0.0
+
+        self.stats = {
+            'waits': 0,
+            'waited_seconds': 0.0
+        }
+
+    def acquire(self, tokens: int) -> List:
+        """Block until a request of the given estimated size may be sent.
+
+        Returns the window entry so the estimate can be corrected later.
+        """
+        with self._cond:
+            started = time.monotonic()
+            waited = False
+            while True:
+                now = time.monotonic()
+                self._prune(now)
+                delay = self._delay(now, tokens)
+                if delay <= 0:
+                    break
+                waited = True
+                self._cond.wait(delay)
+            # [sent at, tokens, still in the window]
+            entry = [now, tokens, True]
+            self._window.append(entry)
+            self._tokens += tokens
+            if waited:
+                self.stats['waits'] += 1
+                self.stats['waited_seconds'] += time.monotonic() - started
+            return entry
+
+    def adjust(self, entry: List, tokens: int):
+        """Replace a request's estimated token cost with its actual usage."""
+        with self._cond:
+            if entry[2]:
+                self._tokens += tokens - entry[1]
+            entry[1] = tokens
+            self._cond.notify_all()
+
+    def pause(self, seconds: float):
+        """Hold back every request for the given number of seconds."""
+        with self._cond:
+            self._paused_until = max(self._paused_until, time.monotonic() + seconds)
+
+    def _prune(self, now: float):
+        """Drop requests older than the window. Call with the lock held."""
+        while self._window and self._window[0][0] <= now - self.WINDOW:
+            entry = self._window.popleft()
+            entry[2] = False
+            self._tokens -= entry[1]
+
+    def _delay(self, now: float, tokens: int) -> float:
+        """Seconds to wait before a request may go out. Call with the lock held."""
+        if self._paused_until > now:
+            return self._paused_until - now
+        if not self._window:
+            return 0.0
+        if len(self._window) >= self.requests_per_minute or self._tokens + tokens > self.tokens_per_minute:
+            # Room frees up as the oldest request leaves the window
+            return self._window[0][0] + self.WINDOW - now
+        return 0.0
+
+class LLMExecutor:
+    """Runs chat completions concurrently within rate budgets, retrying transient errors.
+
+    wrap() turns an OpenAI-compatible client into one whose
+    chat.completions.create goes through the shared rate limiter and retry
+    loop, so cached answers never spend budget. map() runs a function over
+    items on a thread pool and returns results in input order. At most
+    max_workers requests are in flight at once across every map() call and
+    thread sharing the executor.
+    """
+
+    RETRY_STATUSES = {408, 409, 429, 500, 502, 503, 504}
+
+    def __init__(self, max_workers: int = 8, requests_per_minute: int = 500,
+                 tokens_per_minute: int = 90000, max_retries: int = 5,
+                 backoff_factor: float = 1.0, max_backoff: float = 60):
+        self.max_workers = max_workers
+        self.max_retries = max_retries
+        self.backoff_factor = backoff_factor
+        self.max_backoff = max_backoff
+        self.limiter = TokenRateLimiter(requests_per_minute, tokens_per_minute)
+        self._lock = threading.Lock()
+        self._in_flight = threading.BoundedSemaphore(max(1, max_workers))
+
+        self.stats = {
+            'requests': 0,
+            'retries': 0,
+            'errors': 0,
+            'tokens': 0,
+            'elapsed': 0.0
+        }
+
+    def wrap(self, client) -> 'RateLimitedClient':
+        """Wrap a client so its completions go through this executor."""
+        return RateLimitedClient(client, self)
+
+    def map(self, fn: Callable, items: List) -> List:
+        """Apply fn to every item concurrently, keeping input order."""
+        items = list(items)
+        if self.max_workers > 1 and len(items) > 1:
+            with ThreadPoolExecutor(max_workers=min(self.max_workers, len(items))) as executor:
+                return list(executor.map(fn, items))
+        return [fn(item) for item in items]
+
+    def call(self, create: Callable, request: Dict):
+        """Send one completion request, waiting for budget and retrying transient errors."""
+        attempt = 0
+        while True:
+            # The in-flight slot is held for the request only, not for backoff sleeps
+            with self._in_flight:
+                entry = self.limiter.acquire(self._estimate_tokens(request))
+                started = time.monotonic()
+                try:
+                    response, error = create(**request), None
+                except Exception as e:
+                    response, error = None, e
+
+            if error is not None:
+                self._record(time.monotonic() - started, error=True)
+                self.limiter.adjust(entry, 0)
+                if attempt >= self.max_retries or not self._should_retry(error):
+                    raise error
+                self._sleep_before_retry(attempt, error)
+                attempt += 1
+                continue
+
+            usage = getattr(response, 'usage', None)
+            tokens = getattr(usage, 'total_tokens', None) if usage is not None else None
+            if tokens is not None:
+                self.limiter.adjust(entry, tokens)
+            self._record(time.monotonic() - started, tokens=tokens or entry[1])
+            return response
+
+    def get_stats(self) -> Dict:
+        """Return request, retry and token counters plus rate-limit waits."""
+        with self._lock:
+            stats = dict(self.stats)
+        stats['rate_limit'] = dict(self.limiter.stats)
+        return stats
+
+    def _estimate_tokens(self, request: Dict) -> int:
+        """Rough token cost of a request: about four characters per prompt token plus the answer budget."""
+        prompt_chars = sum(len(str(message.get('content') or '')) for message in request.get('messages', []))
+        return prompt_chars // 4 + (request.get('max_tokens') or 0)
+
+    def _should_retry(self, error: Exception) -> bool:
+        """Check whether an API error is transient."""
+        if isinstance(error, (openai.APIConnectionError, openai.APITimeoutError)):
+            return True
+        return getattr(error, 'status_code', None) in self.RETRY_STATUSES
+
+    def _sleep_before_retry(self, attempt: int, error: Exception):
+        """Back off exponentially with jitter, honouring Retry-After on rate-limit errors."""
+        with self._lock:
+            self.stats['retries'] += 1
+        response = getattr(error, 'response', None)
+        retry_after = response.headers.get('retry-after', '') if response is not None else ''
+        if retry_after.replace('.', '', 1).isdigit():
+            # Every worker would hit the same limit, so hold them all back
+            self.limiter.pause(float(retry_after))
+            return
+        delay = min(self.backoff_factor * (2 ** attempt), self.max_backoff)
+        time.sleep(delay * random.uniform(0.5, 1.0))
+
+    def _record(self, elapsed: float, tokens: int = 0, error: bool = False):
+        with self._lock:
+            self.stats['requests'] += 1
+            self.stats['tokens'] += tokens
+            self.stats['elapsed'] += elapsed
+            if error:
+                self.stats['errors'] += 1
+
+class RateLimitedClient:
+    """OpenAI-compatible client whose chat completions run through an LLMExecutor."""
+
+    def __init__(self, client, executor: LLMExecutor):
+        self.client = client
+        self.executor = executor
+        # Mirror the client.chat.completions.create call path
+        self.chat = self
+        self.completions = self
+
+    def create(self, **request):
+        return self.executor.call(self.client.chat.completions.create, request)
@@ -7,22 +7,53 @@ import openai
 import os
 from datetime import datetime
 
+from src.analyzers.llm_cache import LLMResponseCache
+from src.analyzers.workflow_catalog import WorkflowEntry
+
 class PipelineAnalyzer:
-    def __init__(self):
-        self.client = openai.OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
+    # Shown when the API cannot be reached
+    FALLBACK_SUGGESTIONS = [
+        "Review the error message carefully",
+        "Check the workflow configuration",
+        "Verify all dependencies are correctly specified"
+    ]
+
+    def __init__(self, client=None, cache: LLMResponseCache = None):
+        """
+        Args:
+            cache: Answers repeated prompts; None means no caching, pass
+                get_default_cache() for the shared on-disk cache
+        """
+        self.client = client or openai.OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
         self.model = "gpt-3.5-turbo"
+        self.cache = cache
+
+    def _chat(self, **request) -> str:
+        """Run a chat completion, answering repeated prompts from the cache."""
+        if self.cache:
+            return self.cache.complete(self.client, **request)
+        return self.client.chat.completions.create(**request).choices[0].message.content
 
-    def analyze_pipeline(self, pipeline_content: str, failure_data: Dict) -> Dict:
-        """Analyze a pipeline file and identify the error location."""
+    def analyze_pipeline(self, pipeline_content: str, failure_data: Dict,
+                         workflow: WorkflowEntry = None) -> Dict:
+        """Analyze a pipeline file and identify the error location.
+        
+        Pass the file's catalog entry as workflow to reuse its parsed YAML.
+        """
         try:
-            # Parse the YAML content
-            workflow_yaml = yaml.safe_load(pipeline_content)
+            # Parse the YAML content and index its jobs and steps
+            if workflow is None:
+                workflow = WorkflowEntry(failure_data['workflow_name'], None, pipeline_content)
+            if workflow.error:
+                raise yaml.YAMLError(workflow.error)
+            
+            location = workflow.locate(failure_data['failure_reason'])
             
             # Find the error location
-            error_line, error_context = self._find_error_location(pipeline_content, failure_data['failure_reason'])
+            error_line, error_context = self._find_error_location(workflow, failure_data['failure_reason'], location)
             
             # Get the failed job
-            failed_job = self._find_failed_job(workflow_yaml, failure_data['failure_reason'])
+            failed_job = self._find_failed_job(location)
             
             # Get AI suggestions
             suggestions = self._get_ai_suggestions(
@@ -33,12 +64,16 @@ class PipelineAnalyzer:
                 workflow_name=failure_data['workflow_name']
             )
             
-            return {
+            analysis = {
                 'error_line': error_line,
                 'error_context': error_context,
                 'failed_job': failed_job,
-                'suggestions': suggestions
+                'suggestions': suggestions if suggestions is not None else list(self.FALLBACK_SUGGESTIONS)
             }
+            if suggestions is None:
+                # Canned suggestions, not worth reusing for other runs
+                analysis['fallback'] = True
+            return analysis
         except Exception as e:
             return {
                 'error': f"Error analyzing pipeline: {str(e)}",
@@ -48,50 +83,47 @@ class PipelineAnalyzer:
                 'suggestions': ['Check pipeline file syntax', 'Verify file permissions']
             }
 
-    def _find_error_location(self, pipeline_content: str, failure_reason: str) -> Tuple[str, str]:
+    def _find_error_location(self, workflow: WorkflowEntry, failure_reason: str,
+                             location: Dict = None) -> Tuple[str, str]:
         """Find the exact line where the error occurred."""
-        lines = pipeline_content.split('\n')
+        step = location['step'] if location else None
+        if step and step.get('run_range'):
+            # The failing step's script, however many lines it spans
+            first, last = step['run_range']
+            script = [line.strip() for line in step['run'].split('\n') if line.strip()]
+            return '\n'.join(script), f"Line {first}" if first == last else f"Lines {first}-{last}"
+        if step:
+            line = step.get('uses_line') or step['line']
+            return workflow.lines[line - 1].strip(), f"Line {line}"
         
-        # Try to match the failure reason with the pipeline content
-        for i, line in enumerate(lines):
-            if failure_reason.lower() in line.lower():
-                return line.strip(), f"Line {i + 1}"
-            
-            # Check for common GitHub Actions error patterns
-            if 'error:' in line.lower() or 'failed:' in line.lower():
-                return line.strip(), f"Line {i + 1}"
+        # Otherwise the first line quoting the failure reason or an error marker
+        candidates = [line for line in (workflow.find_line(failure_reason), workflow.error_marker_line) if line]
+        if candidates:
+            line = min(candidates)
+            return workflow.lines[line - 1].strip(), f"Line {line}"
+        
+        if location:
+            line = location['line']
+            return workflow.lines[line - 1].strip(), f"Line {line}"
         
-        # If no exact match found, return the most relevant line
-        for i, line in enumerate(lines):
-            if 'run:' in line.lower() or 'uses:' in line.lower():
-                return line.strip(), f"Line {i + 1}"
+        # If no match found, return the first run or uses line
+        if workflow.first_action_line:
+            line = workflow.first_action_line
+            return workflow.lines[line - 1].strip(), f"Line {line}"
         
         return "Error location not found", "Unknown line"
 
-    def _find_failed_job(self, workflow_yaml: Dict, failure_reason: str) -> str:
+    def _find_failed_job(self, location: Dict) -> str:
         """Find the job that failed in the workflow."""
-        if not isinstance(workflow_yaml, dict):
+        if not location:
             return "Unknown job"
-        
-        jobs = workflow_yaml.get('jobs', {})
-        for job_name, job_config in jobs.items():
-            # Check if the job name is mentioned in the failure reason
-            if job_name.lower() in failure_reason.lower():
-                return job_name
-            
-            # Check if any step in the job matches the failure reason
-            steps = job_config.get('steps', [])
-            for step in steps:
-                if isinstance(step, dict):
-                    step_name = step.get('name', '').lower()
-                    if step_name in failure_reason.lower():
-                        return f"{job_name} - {step['name']}"
-        
-        return "Unknown job"
+        if location['step'] and location['step']['name']:
+            return f"{location['job']['id']} - {location['step']['name']}"
+        return location['job']['id']
 
     def _get_ai_suggestions(self, error_line: str, error_context: str, failure_reason: str, 
                           failed_job: str, workflow_name: str) -> list:
-        """Get AI-powered suggestions for fixing the error."""
+        """Get AI-powered suggestions for fixing the error, or None if the API call failed."""
         try:
             prompt = f"""
             As a CI/CD expert, analyze this GitHub Actions workflow failure and provide specific, actionable suggestions:
@@ -106,7 +138,7 @@ class PipelineAnalyzer:
             Format each suggestion as a clear, concise bullet point.
             """
 
-            response = self.client.chat.completions.create(
+            content = self._chat(
                 model=self.model,
                 messages=[
                     {"role": "system", "content": "You are an expert CI/CD engineer with deep knowledge of GitHub Actions and pipeline failures."},
@@ -117,7 +149,7 @@ class PipelineAnalyzer:
             )
             
             # Extract suggestions from the response
-            suggestions = response.choices[0].message.content.strip().split('\n')
+            suggestions = content.strip().split('\n')
             # Clean up the suggestions (remove bullet points, etc.)
             suggestions = [s.strip('- ').strip() for s in suggestions if s.strip()]
             
@@ -125,8 +157,4 @@ class PipelineAnalyzer:
             
         except Exception as e:
             print(f"Error getting AI suggestions: {str(e)}")
-            return [
-                "Review the error message carefully",
-                "Check the workflow configuration",
-                "Verify all dependencies are correctly specified"
-            ]
\ No newline at end of file
+            return None
\ No newline at end of file
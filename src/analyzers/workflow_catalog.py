@@ -0,0 +1,282 @@
+# src/analyzers/workflow_catalog.py
+
+import bisect
+import re
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Iterator, List, Optional, Tuple
+
+import yaml
+
+WORKFLOWS_DIR = '.github/workflows'
+
+# Failure reasons written by GitHubCollector._get_failure_reason
+STEP_REASON = re.compile(r'in step: (.+)$', re.IGNORECASE)
+JOB_REASON = re.compile(r'in job: (.+)$', re.IGNORECASE)
+
+def _mapping_items(node: yaml.Node) -> Iterator[Tuple[str, yaml.Node, yaml.Node]]:
+    """Yield (key, key node, value node) for the scalar keys of a mapping node."""
+    if isinstance(node, yaml.MappingNode):
+        for key_node, value_node in node.value:
+            if isinstance(key_node, yaml.ScalarNode):
+                yield key_node.value, key_node, value_node
+
+class WorkflowEntry:
+    """One workflow file, parsed once, with its job and step tables.
+
+    jobs maps job id to {'id', 'name', 'line', 'end_line', 'steps'}; steps is
+    every step in file order as {'job', 'index', 'name', 'uses', 'run',
+    'line', 'end_line'} plus '<key>_line' for each of name/uses/run that is
+    present and 'run_range', the first and last line of the script. Line
+    numbers are 1-based and come from the YAML node marks, so locating a
+    step or job is a dict lookup rather than a scan of the file.
+    """
+
+    def __init__(self, path: str, sha: str, content: str):
+        self.path = path
+        self.sha = sha
+        self.content = content
+        self.data = None
+        self.error = None
+        self.jobs: Dict[str, Dict] = {}
+        self.steps: List[Dict] = []
+        self.steps_by_name: Dict[str, Dict] = {}
+        self.jobs_by_name: Dict[str, Dict] = {}
+        self.first_action_line: Optional[int] = None
+
+        self.lines = content.split('\n')
+        self._lowered = content.lower()
+        self._line_starts = [0]
+        for line in self.lines[:-1]:
+            self._line_starts.append(self._line_starts[-1] + len(line) + 1)
+        markers = [offset for offset in (self._lowered.find('error:'), self._lowered.find('failed:')) if offset != -1]
+        self.error_marker_line = self._line_at(min(markers)) if markers else None
+
+        root = None
+        try:
+            # Compose and construct separately so the node marks stay available
+            loader = yaml.SafeLoader(content)
+            try:
+                root = loader.get_single_node()
+                if root is not None:
+                    self.data = loader.construct_document(root)
+            finally:
+                loader.dispose()
+        except yaml.YAMLError as e:
+            self.error = str(e)
+
+        # GitHub shows the file path for workflows without a name
+        name = self.data.get('name') if isinstance(self.data, dict) else None
+        self.name = str(name) if name else path
+
+        if root is not None:
+            self._index(root)
+
+    def _index(self, root: yaml.Node):
+        """Build the job and step tables from the composed document."""
+        for key, _, jobs_node in _mapping_items(root):
+            if key != 'jobs':
+                continue
+            for job_id, job_key, job_node in _mapping_items(jobs_node):
+                job = {
+                    'id': job_id,
+                    'name': job_id,
+                    'line': job_key.start_mark.line + 1,
+                    'end_line': self._last_line(job_node),
+                    'steps': []
+                }
+                for job_field, _, value in _mapping_items(job_node):
+                    if job_field == 'name' and isinstance(value, yaml.ScalarNode):
+                        job['name'] = value.value
+                    elif job_field == 'uses' and isinstance(value, yaml.ScalarNode):
+                        # Reusable workflow call
+                        self._note_action(value.start_mark.line + 1)
+                    elif job_field == 'steps' and isinstance(value, yaml.SequenceNode):
+                        for index, step_node in enumerate(value.value):
+                            job['steps'].append(self._index_step(job_id, index, step_node))
+                self.jobs[job_id] = job
+                self.steps.extend(job['steps'])
+
+        for job in self.jobs.values():
+            self.jobs_by_name.setdefault(job['id'].lower(), job)
+            self.jobs_by_name.setdefault(str(job['name']).lower(), job)
+        for step in self.steps:
+            if step['name']:
+                self.steps_by_name.setdefault(step['name'].lower(), step)
+
+    def _index_step(self, job_id: str, index: int, step_node: yaml.Node) -> Dict:
+        step = {
+            'job': job_id,
+            'index': index,
+            'name': None,
+            'uses': None,
+            'run': None,
+            'line': step_node.start_mark.line + 1,
+            'end_line': self._last_line(step_node)
+        }
+        for field, _, value in _mapping_items(step_node):
+            if field in ('name', 'uses', 'run') and isinstance(value, yaml.ScalarNode):
+                step[field] = value.value
+                step[f'{field}_line'] = value.start_mark.line + 1
+                if field == 'run':
+                    # A block scalar's script starts on the line after the | or > indicator
+                    first = value.start_mark.line + (2 if value.style in ('|', '>') else 1)
+                    step['run_range'] = (first, max(first, self._last_line(value)))
+                if field != 'name':
+                    self._note_action(step[f'{field}_line'])
+        return step
+
+    def _note_action(self, line: int):
+        if self.first_action_line is None or line < self.first_action_line:
+            self.first_action_line = line
+
+    def _last_line(self, node: yaml.Node) -> int:
+        """1-based last line of a node, leaving out trailing blank and comment lines."""
+        # The end mark sits at the start of whatever follows the node, which
+        # may be the next "- " item on its own line
+        end = node.end_mark
+        before = self.lines[end.line][:end.column] if end.line < len(self.lines) else ''
+        line = end.line if not before.strip() else end.line + 1
+        while line > node.start_mark.line + 1 and line <= len(self.lines):
+            text = self.lines[line - 1].strip()
+            # Comment lines inside a block scalar are part of the script
+            if text and not (text.startswith('#') and not isinstance(node, yaml.ScalarNode)):
+                break
+            line -= 1
+        return line
+
+    def _line_at(self, offset: int) -> int:
+        """1-based line number of a character offset in the content."""
+        return bisect.bisect_right(self._line_starts, offset)
+
+    def locate(self, failure_reason: str) -> Optional[Dict]:
+        """Find the job and step a failure reason points at.
+        
+        Returns {'job', 'step', 'line', 'end_line'} or None. Reasons naming a
+        step or job are looked up directly; for free-form reasons the first
+        job id or step name mentioned in the text wins.
+        """
+        reason = (failure_reason or '').strip()
+        match = STEP_REASON.search(reason)
+        if match and match.group(1).strip().lower() in self.steps_by_name:
+            return self._location(self.steps_by_name[match.group(1).strip().lower()])
+        match = JOB_REASON.search(reason)
+        if match and match.group(1).strip().lower() in self.jobs_by_name:
+            return self._location(None, self.jobs_by_name[match.group(1).strip().lower()])
+
+        lowered = reason.lower()
+        for job in self.jobs.values():
+            if job['id'].lower() in lowered:
+                return self._location(None, job)
+            for step in job['steps']:
+                if step['name'] and step['name'].lower() in lowered:
+                    return self._location(step)
+        return None
+
+    def find_line(self, text: str) -> Optional[int]:
+        """First line containing text, ignoring case."""
+        if not text:
+            return None
+        offset = self._lowered.find(text.lower())
+        return self._line_at(offset) if offset != -1 else None
+
+    def _location(self, step: Optional[Dict], job: Dict = None) -> Dict:
+        job = job or self.jobs[step['job']]
+        target = step or job
+        return {'job': job, 'step': step, 'line': target['line'], 'end_line': target['end_line']}
+
+class WorkflowCatalog:
+    """The repository's workflow files, each fetched and parsed once.
+
+    refresh() lists .github/workflows and only fetches and parses files
+    whose blob SHA changed since the last refresh, so a catalog kept across
+    analysis passes does no work for unchanged files. Entries are indexed by
+    workflow name and by path.
+    """
+
+    def __init__(self, collector, max_workers: int = None):
+        self.collector = collector
+        self.max_workers = max_workers or collector.max_workers
+        self._lock = threading.Lock()
+        self._by_path: Dict[str, WorkflowEntry] = {}
+        self._by_name: Dict[str, WorkflowEntry] = {}
+
+        self.stats = {
+            'refreshes': 0,
+            'parsed': 0,
+            'reused': 0,
+            'removed': 0
+        }
+
+    def refresh(self) -> int:
+        """Bring the catalog up to date with the repository. Returns the number of files parsed."""
+        files = self._list_files()
+        if files is None:
+            # Keep what we have rather than emptying the catalog
+            return 0
+
+        with self._lock:
+            changed = [f for f in files
+                       if f['path'] not in self._by_path or self._by_path[f['path']].sha != f['sha']]
+        contents = self._fetch(changed)
+
+        with self._lock:
+            current = {f['path'] for f in files}
+            removed = [path for path in self._by_path if path not in current]
+            for path in removed:
+                del self._by_path[path]
+
+            parsed = 0
+            for file, content in zip(changed, contents):
+                if content:
+                    self._by_path[file['path']] = WorkflowEntry(file['path'], file['sha'], content)
+                    parsed += 1
+
+            self._by_name = {}
+            for entry in self._by_path.values():
+                self._by_name.setdefault(entry.name, entry)
+
+            self.stats['refreshes'] += 1
+            self.stats['parsed'] += parsed
+            self.stats['reused'] += len(files) - len(changed)
+            self.stats['removed'] += len(removed)
+            return parsed
+
+    def get_by_name(self, name: str) -> Optional[WorkflowEntry]:
+        """Find a workflow by its name (or by path, which GitHub uses for unnamed workflows)."""
+        with self._lock:
+            return self._by_name.get(name) or self._by_path.get(name)
+
+    def get_by_path(self, path: str) -> Optional[WorkflowEntry]:
+        with self._lock:
+            return self._by_path.get(path)
+
+    def entries(self) -> List[WorkflowEntry]:
+        with self._lock:
+            return list(self._by_path.values())
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._by_path)
+
+    def _list_files(self) -> Optional[List[Dict]]:
+        """List the workflow files with their blob SHAs, or None if the listing failed."""
+        try:
+            response = self.collector.http.get(f"{self.collector.base_url}/contents/{WORKFLOWS_DIR}")
+            response.raise_for_status()
+            return [
+                {'path': file['path'], 'sha': file['sha']}
+                for file in response.json()
+                if file['name'].endswith(('.yml', '.yaml'))
+            ]
+        except Exception as e:
+            print(f"Error listing workflow files: {str(e)}")
+            return None
+
+    def _fetch(self, files: List[Dict]) -> List[str]:
+        """Fetch file contents by blob SHA, in the same order as files."""
+        shas = [file['sha'] for file in files]
+        if self.max_workers > 1 and len(shas) > 1:
+            with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+                return list(executor.map(self.collector.get_blob_content, shas))
+        return [self.collector.get_blob_content(sha) for sha in shas]
@@ -1,48 +1,225 @@
 # src/collectors/github_collector.py
 
-import requests
-from datetime import datetime
-from typing import Dict, List
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from typing import Dict, Iterator, List, Optional, Tuple
 import base64
 import re
 
+from src.analyzers.failure_classifier import FailureClassifier
+from src.collectors.http_client import GitHubHttpClient, get_shared_client
+from src.collectors.log_scanner import LogScanner
+from src.collectors.rate_limiter import PRIORITY_LISTING, PRIORITY_LOGS
+
 class GitHubCollector:
-    def __init__(self, token: str, owner: str, repo: str):
+    RUNS_PER_PAGE = 100
+
+    def __init__(self, token: str, owner: str, repo: str, max_workers: int = 8,
+                 http_client: GitHubHttpClient = None, classifier: FailureClassifier = None,
+                 log_tail_kb: int = 64, max_log_tail_kb: int = 4096, rerun_window_hours: int = 24):
+        """
+        Args:
+            log_tail_kb: Size of the first log tail fetched for failure reasons;
+                0 always downloads whole logs
+            max_log_tail_kb: Largest tail tried before falling back to a full download
+            rerun_window_hours: How far before its sync cursor a workflow's runs
+                are listed again, so re-runs of recent runs are picked up
+        """
         self.token = token
         self.owner = owner
         self.repo = repo
+        self.max_workers = max_workers
         self.base_url = f"https://api.github.com/repos/{owner}/{repo}"
         self.headers = {
             "Authorization": f"token {token}",
             "Accept": "application/vnd.github.v3+json"
         }
+        self.http = http_client or get_shared_client(token)
+        self.classifier = classifier or FailureClassifier(FailureClassifier.LOG_PATTERNS)
+        self.log_tail_kb = log_tail_kb
+        self.max_log_tail_kb = max_log_tail_kb
+        self.rerun_window_hours = rerun_window_hours
 
-    def get_workflow_runs(self, created_after: str = None) -> List[Dict]:
+    def get_workflow_runs(self, created_after: str = None, all_pages: bool = False,
+                          max_workers: int = None) -> List[Dict]:
         """Get workflow runs from GitHub.
         
         Args:
             created_after: ISO format date string to filter runs after this date
+            all_pages: Walk every page of results instead of only the first one
+            max_workers: Number of concurrent job/log fetches for failed runs
+                (defaults to the collector's max_workers)
         """
+        url = f"https://api.github.com/repos/{self.owner}/{self.repo}/actions/runs"
+        params = {}
+        if created_after:
+            params['created'] = f">={created_after}"
+        
+        runs = []
         try:
-            url = f"https://api.github.com/repos/{self.owner}/{self.repo}/actions/runs"
-            params = {}
-            if created_after:
-                params['created'] = f">={created_after}"
-            
-            response = requests.get(url, headers=self.headers, params=params)
-            response.raise_for_status()
-            
-            runs = response.json()['workflow_runs']
-            return [self._process_run(run) for run in runs]
-            
+            if all_pages:
+                params['per_page'] = self.RUNS_PER_PAGE
+                for run in self._iter_pages(url, params, 'workflow_runs'):
+                    runs.append(run)
+            else:
+                response = self.http.get(url, params=params, priority=PRIORITY_LISTING)
+                response.raise_for_status()
+                runs = response.json()['workflow_runs']
         except Exception as e:
+            # Keep whatever pages were already read
             print(f"Error getting workflow runs: {str(e)}")
+        
+        try:
+            return self._process_runs(runs, max_workers)
+        except Exception as e:
+            print(f"Error processing workflow runs: {str(e)}")
             return []
 
+    def _iter_pages(self, url: str, params: Dict, key: str) -> Iterator[Dict]:
+        """Yield items from every page of a list endpoint, following the Link header."""
+        for page in self._iter_page_lists(url, params, key):
+            yield from page
+
+    def _iter_page_lists(self, url: str, params: Dict, key: str) -> Iterator[List[Dict]]:
+        """Yield each page of a list endpoint; stop iterating to stop fetching."""
+        while url:
+            response = self.http.get(url, params=params, priority=PRIORITY_LISTING)
+            response.raise_for_status()
+            yield response.json()[key]
+            
+            # The next link already carries the query string
+            url = response.links.get('next', {}).get('url')
+            params = None
+
+    def _process_runs(self, runs: List[Dict], max_workers: int = None,
+                      failed: List[Dict] = None) -> List[Dict]:
+        """Process runs, fetching failure reasons for failed runs concurrently.
+        
+        Results are returned in the same order as the input runs. When a
+        failed list is given, runs whose jobs or logs could not be fetched
+        are moved there instead of aborting the whole batch.
+        """
+        workers = max_workers or self.max_workers
+        failed_ids = [run['id'] for run in runs if run['conclusion'] == 'failure']
+        fetch = self._get_failure_details if failed is None else self._try_failure_details
+        
+        if workers > 1 and len(failed_ids) > 1:
+            with ThreadPoolExecutor(max_workers=workers) as executor:
+                details = dict(zip(failed_ids, executor.map(fetch, failed_ids)))
+        else:
+            details = {run_id: fetch(run_id) for run_id in failed_ids}
+        
+        processed = []
+        for run in runs:
+            if run['id'] in details and details[run['id']] is None:
+                failed.append(run)
+                continue
+            processed.append(self._process_run(run, *details.get(run['id'], (None, None))))
+        return processed
+
+    def _try_failure_details(self, run_id: str) -> Optional[Tuple[str, Optional[List[Dict]]]]:
+        """Get the failure details for a run, or None if they could not be fetched."""
+        try:
+            return self._get_failure_details(run_id)
+        except Exception as e:
+            print(f"Error getting failure details for run {run_id}: {str(e)}")
+            return None
+
+    def get_workflows(self) -> List[Dict]:
+        """Get every workflow defined in the repository."""
+        url = f"{self.base_url}/actions/workflows"
+        return list(self._iter_pages(url, {'per_page': self.RUNS_PER_PAGE}, 'workflows'))
+
+    def sync_workflow_runs(self, db, max_workers: int = None) -> List[Dict]:
+        """Fetch and store only runs that are new or changed since the last sync.
+        
+        Each workflow keeps a cursor in the database at the latest updated_at
+        it has stored. The runs API cannot filter or sort by updated_at, so
+        runs created up to rerun_window_hours before the cursor are listed,
+        newest first, and those updated at or after it are kept. Paging
+        stops after the first page holding a run not updated since the
+        cursor, so a poll usually costs one request per workflow. Runs that
+        finish or are re-run within the window and within those pages are
+        picked up this way. Runs whose
+        stored conclusion already matches are skipped, which avoids
+        fetching their jobs and logs again.
+        
+        Errors are contained per workflow, and per run for job and log
+        fetches. A workflow's cursor only moves once its runs are stored,
+        and never past a run that failed to process, so the next sync
+        retries it.
+        
+        Args:
+            db: DatabaseManager used for cursors and storage
+            max_workers: Number of concurrent job/log fetches for failed runs
+        
+        Returns:
+            The runs that were stored during this sync
+        """
+        repository = f"{self.owner}/{self.repo}"
+        synced = []
+        
+        for workflow in self.get_workflows():
+            cursor = db.get_sync_cursor(repository, workflow['name'])
+            last_updated_at = cursor['last_updated_at'] if cursor else None
+            params = {'per_page': self.RUNS_PER_PAGE}
+            if last_updated_at:
+                params['created'] = f">={self._rerun_horizon(last_updated_at)}"
+            
+            url = f"{self.base_url}/actions/workflows/{workflow['id']}/runs"
+            try:
+                runs = []
+                for page in self._iter_page_lists(url, params, 'workflow_runs'):
+                    if not last_updated_at:
+                        runs.extend(page)
+                        continue
+                    runs.extend(run for run in page if run['updated_at'] >= last_updated_at)
+                    # Past the newest runs into history the cursor already covers
+                    if any(run['updated_at'] <= last_updated_at for run in page):
+                        break
+            except Exception as e:
+                # Leave the cursor where it was so the next sync retries
+                print(f"Error syncing workflow {workflow['name']}: {str(e)}")
+                continue
+            if not runs:
+                continue
+            runs.sort(key=lambda run: run['updated_at'], reverse=True)
+            
+            failed = []
+            try:
+                stored = db.get_stored_conclusions([run['id'] for run in runs])
+                changed = [
+                    run for run in runs
+                    if str(run['id']) not in stored or stored[str(run['id'])] != run['conclusion']
+                ]
+                processed = self._process_runs(changed, max_workers, failed=failed)
+                db.store_pipeline_runs(processed)
+            except Exception as e:
+                print(f"Error storing runs for workflow {workflow['name']}: {str(e)}")
+                continue
+            synced.extend(processed)
+            
+            if failed:
+                # Stop at the oldest update that still has to be processed
+                print(f"{len(failed)} runs of workflow {workflow['name']} will be retried on the next sync")
+                new_cursor = min(run['updated_at'] for run in failed)
+            else:
+                new_cursor = runs[0]['updated_at']
+            db.update_sync_cursor(repository, workflow['name'], new_cursor,
+                                  max(run['id'] for run in runs))
+        
+        return synced
+
+    def _rerun_horizon(self, updated_at: str) -> str:
+        """Earliest creation time of the runs listed again for a cursor at updated_at."""
+        window = timedelta(hours=self.rerun_window_hours)
+        horizon = datetime.fromisoformat(updated_at.replace('Z', '+00:00')) - window
+        return horizon.strftime('%Y-%m-%dT%H:%M:%SZ')
+
     def get_run_jobs(self, run_id: str) -> List[Dict]:
         """Get jobs for a specific run."""
         url = f"{self.base_url}/actions/runs/{run_id}/jobs"
-        response = requests.get(url, headers=self.headers)
+        response = self.http.get(url)
         response.raise_for_status()
         
         return response.json()['jobs']
@@ -51,7 +228,7 @@ class GitHubCollector:
         """Get logs for a specific job."""
         try:
             url = f"{self.base_url}/actions/jobs/{job_id}/logs"
-            response = requests.get(url, headers=self.headers)
+            response = self.http.get(url, priority=PRIORITY_LOGS)
             response.raise_for_status()
             
             # Try different encodings if utf-8 fails
@@ -63,18 +240,87 @@ class GitHubCollector:
             print(f"Error getting logs for job {job_id}: {str(e)}")
             return ""
 
-    def _process_run(self, run: Dict) -> Dict:
+    def scan_job_logs(self, job_id: str, chunk_size: int = 64 * 1024) -> LogScanner:
+        """Stream the logs for a job through a LogScanner without holding them in memory."""
+        scanner = LogScanner(classifier=self.classifier)
+        try:
+            url = f"{self.base_url}/actions/jobs/{job_id}/logs"
+            with self.http.get(url, priority=PRIORITY_LOGS, stream=True) as response:
+                response.raise_for_status()
+                for chunk in response.iter_content(chunk_size=chunk_size):
+                    scanner.feed(chunk)
+        except Exception as e:
+            print(f"Error getting logs for job {job_id}: {str(e)}")
+        return scanner.finish()
+
+    def scan_job_log_tail(self, job_id: str, chunk_size: int = 64 * 1024) -> LogScanner:
+        """Scan the end of a job log first, widening the window only when needed.
+        
+        The last log_tail_kb are requested with a Range header. If no failure
+        signature or error line turns up, the window grows fourfold up to
+        max_log_tail_kb, after which the whole log is scanned. A server that
+        ignores the range answers 200 with the full log, which is scanned as is.
+        """
+        url = f"{self.base_url}/actions/jobs/{job_id}/logs"
+        window_kb = self.log_tail_kb
+        try:
+            while window_kb <= self.max_log_tail_kb:
+                headers = {'Range': f"bytes=-{window_kb * 1024}"}
+                with self.http.get(url, priority=PRIORITY_LOGS, stream=True, headers=headers) as response:
+                    response.raise_for_status()
+                    if response.status_code != 206:
+                        # Range ignored, this is already the full log
+                        scanner = LogScanner(classifier=self.classifier)
+                        for chunk in response.iter_content(chunk_size=chunk_size):
+                            scanner.feed(chunk)
+                        return scanner.finish()
+                    
+                    start, total = self._parse_content_range(response.headers.get('Content-Range'))
+                    covers_log = start == 0 or (total is not None and total <= window_kb * 1024)
+                    # The window usually starts mid-line, so drop the first partial line
+                    scanner = LogScanner(classifier=self.classifier, skip_first_line=not covers_log,
+                                         start_offset=start or 0)
+                    for chunk in response.iter_content(chunk_size=chunk_size):
+                        scanner.feed(chunk)
+                    scanner.finish()
+                
+                if covers_log or scanner.best_match() or scanner.error_lines:
+                    return scanner
+                window_kb *= 4
+        except Exception as e:
+            print(f"Error getting log tail for job {job_id}: {str(e)}")
+        
+        return self.scan_job_logs(job_id, chunk_size)
+
+    def _parse_content_range(self, content_range: str) -> Tuple[Optional[int], Optional[int]]:
+        """Get the start offset and full size from a header like 'bytes 100-199/1000'."""
+        match = re.match(r'bytes (\d+)-\d+/(\d+|\*)', content_range or '')
+        if not match:
+            return None, None
+        total = match.group(2)
+        return int(match.group(1)), int(total) if total.isdigit() else None
+
+    def _process_run(self, run: Dict, failure_reason: str = None, log_snippets: List[Dict] = None) -> Dict:
         """Process a workflow run into a standard format."""
-        return {
+        if failure_reason is None and run['conclusion'] == 'failure':
+            failure_reason, log_snippets = self._get_failure_details(run['id'])
+        
+        processed = {
             'run_id': run['id'],
             'workflow_name': run['name'],
             'status': run['status'],
             'conclusion': run['conclusion'],
             'started_at': run['created_at'],
+            'completed_at': run['updated_at'],
             'duration': self._calculate_duration(run['created_at'], run['updated_at']),
+            'repository': f"{self.owner}/{self.repo}",
             'branch': run['head_branch'],
-            'failure_reason': self._get_failure_reason(run['id']) if run['conclusion'] == 'failure' else None
+            'commit_sha': run.get('head_sha'),
+            'failure_reason': failure_reason
         }
+        if log_snippets is not None:
+            processed['log_snippets'] = log_snippets
+        return processed
 
     def _calculate_duration(self, started: str, completed: str) -> int:
         """Calculate duration in seconds."""
@@ -84,6 +330,14 @@ class GitHubCollector:
 
     def _get_failure_reason(self, run_id: str) -> str:
         """Get the reason for failure if the run failed."""
+        return self._get_failure_details(run_id)[0]
+
+    def _get_failure_details(self, run_id: str) -> Tuple[str, Optional[List[Dict]]]:
+        """Get the failure reason and, when the logs were scanned, the error lines kept from them.
+        
+        Snippets are [{'job_id', 'content'}] for the search index; they are
+        None when the reason came from the job steps without reading logs.
+        """
         if run_id:
             jobs = self.get_run_jobs(run_id)
             for job in jobs:
@@ -94,43 +348,34 @@ class GitHubCollector:
                         if step.get('conclusion') == 'failure':
                             step_name = step.get('name', '')
                             if 'test' in step_name.lower():
-                                return f"Test failure in step: {step_name}"
+                                return f"Test failure in step: {step_name}", None
                             elif 'build' in step_name.lower():
-                                return f"Build failure in step: {step_name}"
-                            return f"Failure in step: {step_name}"
-
-                    # If no step failure found, try to get logs
-                    logs = self.get_job_logs(job['id'])
-                    if logs:
-                        # Look for common failure patterns
-                        if "AssertionError" in logs:
-                            return "Test assertion failed"
-                        elif "ModuleNotFoundError" in logs:
-                            return "Missing dependency"
-                        elif "Timeout" in logs:
-                            return "Job timed out"
-                        elif "Permission denied" in logs:
-                            return "Permission error"
-                        elif "Connection refused" in logs:
-                            return "Network connection failed"
-                        
-                        # Try to find the last error message
-                        error_lines = [line for line in logs.split('\n') 
-                                     if any(keyword in line.lower() 
-                                           for keyword in ['error', 'failed', 'exception', 'traceback'])]
-                        if error_lines:
-                            return error_lines[-1].strip()
+                                return f"Build failure in step: {step_name}", None
+                            return f"Failure in step: {step_name}", None
+
+                    # If no step failure found, scan the logs
+                    if self.log_tail_kb:
+                        scanner = self.scan_job_log_tail(job['id'])
+                    else:
+                        scanner = self.scan_job_logs(job['id'])
+                    match = scanner.best_match()
+                    if match:
+                        self.classifier.record_hit(match['pattern'])
+                    lines = scanner.snippets()
+                    snippets = [{'job_id': job['id'], 'content': '\n'.join(lines)}] if lines else []
+                    reason = scanner.failure_reason()
+                    if reason:
+                        return reason, snippets
 
                     # Fallback to job name
-                    return f"Failure in job: {job.get('name', 'Unknown job')}"
-        return 'Unknown failure'
+                    return f"Failure in job: {job.get('name', 'Unknown job')}", snippets
+        return 'Unknown failure', None
 
     def get_file_content(self, file_path: str) -> str:
         """Get the content of a file from GitHub."""
         try:
-            response = requests.get(
-                f"https://api.github.com/repos/{self.owner}/{self.repo}/contents/{file_path}",
-                headers=self.headers
+            response = self.http.get(
+                f"https://api.github.com/repos/{self.owner}/{self.repo}/contents/{file_path}"
             )
             response.raise_for_status()
             
@@ -140,4 +385,19 @@ class GitHubCollector:
             
         except Exception as e:
             print(f"Error getting file content: {str(e)}")
+            return ""
+
+    def get_blob_content(self, sha: str) -> str:
+        """Get the content of a git blob by SHA.
+        
+        Blobs never change, so the response is cached for good by the HTTP
+        client's conditional requests.
+        """
+        try:
+            response = self.http.get(f"{self.base_url}/git/blobs/{sha}")
+            response.raise_for_status()
+            return base64.b64decode(response.json()['content']).decode('utf-8')
+            
+        except Exception as e:
+            print(f"Error getting blob content: {str(e)}")
             return ""
\ No newline at end of file
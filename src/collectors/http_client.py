@@ -0,0 +1,201 @@
+# src/collectors/http_client.py
+
+import hashlib
+import threading
+import time
+from typing import Dict
+
+import requests
+from requests.adapters import HTTPAdapter
+from requests.structures import CaseInsensitiveDict
+
+from src.collectors.rate_limiter import PRIORITY_METADATA, RateLimitScheduler
+from src.collectors.response_cache import ResponseCache
+from src.utils.paths import DEFAULT_HTTP_CACHE_PATH
+
+class GitHubHttpClient:
+    """Pooled, keep-alive HTTP transport shared by all GitHub API calls."""
+
+    RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+    def __init__(self, token: str, pool_size: int = 16, max_retries: int = 5,
+                 backoff_factor: float = 1.0, max_backoff: float = 60.0, timeout: float = 30.0,
+                 scheduler: RateLimitScheduler = None, cache: ResponseCache = None):
+        self.scheduler = scheduler or RateLimitScheduler()
+        self.cache = cache
+        # Cache entries are per token, since what a token may see differs
+        self._cache_scope = hashlib.sha256(token.encode()).hexdigest()[:16]
+        self.max_retries = max_retries
+        self.backoff_factor = backoff_factor
+        self.max_backoff = max_backoff
+        self.timeout = timeout
+
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+        self.session.headers.update({
+            "Authorization": f"token {token}",
+            "Accept": "application/vnd.github.v3+json"
+        })
+
+        self._lock = threading.Lock()
+        self.stats = {
+            'requests': 0,
+            'bytes': 0,
+            'retries': 0,
+            'errors': 0,
+            'elapsed': 0.0
+        }
+
+    def get(self, url: str, params: Dict = None, priority: int = PRIORITY_METADATA,
+            **kwargs) -> requests.Response:
+        """Send a GET request through the shared session.
+
+        With a response cache configured, non-streamed GETs are sent as
+        conditional requests and a 304 is answered from the cache. Entries
+        are keyed by token and URL, so clients with different tokens can
+        share one cache without seeing each other's responses.
+        """
+        if self.cache is None or kwargs.get('stream'):
+            return self.request("GET", url, params=params, priority=priority, **kwargs)
+
+        full_url = requests.Request("GET", url, params=params).prepare().url
+        cache_key = f"{self._cache_scope}:{full_url}"
+        entry = self.cache.get(cache_key)
+        if entry:
+            kwargs['headers'] = {**(kwargs.get('headers') or {}), **self.cache.conditional_headers(entry)}
+
+        response = self.request("GET", url, params=params, priority=priority, **kwargs)
+
+        if entry and response.status_code == 304:
+            self.cache.record_hit(cache_key)
+            return self._cached_response(full_url, entry)
+
+        # Errors and uncacheable answers are neither hits nor misses
+        etag = response.headers.get('ETag')
+        last_modified = response.headers.get('Last-Modified')
+        if response.status_code == 200 and (etag or last_modified):
+            self.cache.record_miss()
+            self.cache.store(cache_key, etag, last_modified, dict(response.headers), response.content)
+        return response
+
+    def request(self, method: str, url: str, priority: int = PRIORITY_METADATA,
+                **kwargs) -> requests.Response:
+        """Send a request, retrying with exponential backoff on transient failures.
+
+        Every attempt waits for the rate-limit scheduler first. Connection
+        errors, 5xx, 429 and GitHub's secondary rate limit (403 with
+        Retry-After or a "secondary rate limit" message) are retried up to
+        max_retries times. Responses rejected because the primary quota ran
+        out are retried after the scheduler's pause, within the same
+        max_retries; once that is used up requests.HTTPError is raised. Other
+        final responses are returned as-is so callers keep using
+        raise_for_status().
+        """
+        kwargs.setdefault('timeout', self.timeout)
+        attempt = 0
+        while True:
+            self.scheduler.acquire(priority)
+            started = time.monotonic()
+            try:
+                response = self.session.request(method, url, **kwargs)
+            except (requests.ConnectionError, requests.Timeout):
+                self._record(time.monotonic() - started, 0, error=True)
+                if attempt >= self.max_retries:
+                    raise
+                self._sleep_before_retry(attempt, None)
+                attempt += 1
+                continue
+
+            self._record(time.monotonic() - started, self._response_size(response, kwargs.get('stream')))
+            self.scheduler.update(response.status_code, response.headers)
+
+            if self.scheduler.is_rate_limited(response.status_code, response.headers):
+                if attempt >= self.max_retries:
+                    response.raise_for_status()
+                # The scheduler holds the next attempt until the quota resets
+                with self._lock:
+                    self.stats['retries'] += 1
+                response.close()
+                attempt += 1
+                continue
+
+            if attempt < self.max_retries and self._should_retry(response):
+                self._sleep_before_retry(attempt, response)
+                response.close()
+                attempt += 1
+                continue
+
+            return response
+
+    def get_stats(self) -> Dict:
+        """Return a snapshot of the transport and rate-limit counters."""
+        with self._lock:
+            stats = dict(self.stats)
+        stats['rate_limit'] = self.scheduler.get_stats()
+        if self.cache is not None:
+            stats['cache'] = self.cache.get_stats()
+        return stats
+
+    def _cached_response(self, url: str, entry: Dict) -> requests.Response:
+        """Rebuild a 200 response from a cache entry."""
+        response = requests.Response()
+        response.status_code = 200
+        response.url = url
+        response.headers = CaseInsensitiveDict(entry['headers'])
+        response._content = entry['body']
+        response.encoding = requests.utils.get_encoding_from_headers(response.headers)
+        response.from_cache = True
+        return response
+
+    def _should_retry(self, response: requests.Response) -> bool:
+        """Check whether a response is a transient failure worth retrying."""
+        if response.status_code in self.RETRY_STATUSES:
+            return True
+        if response.status_code == 403:
+            if 'Retry-After' in response.headers:
+                return True
+            return 'secondary rate limit' in response.text.lower()
+        return False
+
+    def _sleep_before_retry(self, attempt: int, response: requests.Response):
+        """Back off exponentially before a retry.
+
+        Retry-After is left to the scheduler, which pauses every request
+        rather than just this one.
+        """
+        with self._lock:
+            self.stats['retries'] += 1
+        if response is not None and response.headers.get('Retry-After', '').isdigit():
+            return
+        time.sleep(min(self.backoff_factor * (2 ** attempt), self.max_backoff))
+
+    def _response_size(self, response: requests.Response, stream: bool) -> int:
+        """Get the body size without forcing a streamed body to be read."""
+        if stream:
+            return int(response.headers.get('Content-Length', 0) or 0)
+        return len(response.content)
+
+    def _record(self, elapsed: float, size: int, error: bool = False):
+        with self._lock:
+            self.stats['requests'] += 1
+            self.stats['bytes'] += size
+            self.stats['elapsed'] += elapsed
+            if error:
+                self.stats['errors'] += 1
+
+_shared_clients: Dict[str, GitHubHttpClient] = {}
+_shared_lock = threading.Lock()
+
+def get_shared_client(token: str, cache_path: str = DEFAULT_HTTP_CACHE_PATH) -> GitHubHttpClient:
+    """Get the process-wide client for a token, creating it on first use.
+
+    The shared client keeps conditional-request bodies in an SQLite cache
+    at cache_path; pass None to disable caching.
+    """
+    with _shared_lock:
+        if token not in _shared_clients:
+            cache = ResponseCache(cache_path) if cache_path else None
+            _shared_clients[token] = GitHubHttpClient(token, cache=cache)
+        return _shared_clients[token]
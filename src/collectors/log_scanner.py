@@ -0,0 +1,110 @@
+# src/collectors/log_scanner.py
+
+import re
+from collections import deque
+from typing import Dict, List, Optional
+
+from src.analyzers.failure_classifier import FailureClassifier
+
+class LogScanner:
+    """Single-pass scanner for job logs fed in chunks.
+
+    Only the first match of each failure pattern and a ring buffer of the
+    last error-looking lines are kept, so memory stays constant no matter how
+    large the log is.
+    """
+
+    ERROR_REGEX = re.compile(r'error|failed|exception|traceback', re.IGNORECASE)
+
+    _default_classifier = None
+
+    def __init__(self, tail_size: int = 50, max_line_bytes: int = 64 * 1024,
+                 classifier: FailureClassifier = None, skip_first_line: bool = False,
+                 start_offset: int = 0):
+        """
+        Args:
+            skip_first_line: Drop everything up to the first newline, for
+                scanning a byte range that starts mid-line
+            start_offset: Position of the first fed byte in the full log
+        """
+        self.max_line_bytes = max_line_bytes
+        self.classifier = classifier or self._get_default_classifier()
+        self.first_hits: Dict[str, Dict] = {}
+        self.error_lines = deque(maxlen=tail_size)
+        self.bytes_scanned = 0
+        self.lines_scanned = 0
+        self._line_start = start_offset
+        self._partial = b''
+        self._partial_dropped = 0
+        self._skip_first_line = skip_first_line
+
+    def feed(self, chunk: bytes):
+        """Scan a chunk of raw log bytes."""
+        self.bytes_scanned += len(chunk)
+        if self._skip_first_line:
+            newline = chunk.find(b'\n')
+            if newline == -1:
+                self._line_start += len(chunk)
+                return
+            self._line_start += newline + 1
+            chunk = chunk[newline + 1:]
+            self._skip_first_line = False
+        lines = (self._partial + chunk).split(b'\n')
+        last = lines.pop()
+        for line in lines:
+            self._scan_line(line[:self.max_line_bytes], len(line) + self._partial_dropped + 1)
+            self._partial_dropped = 0
+        self._partial_dropped += max(len(last) - self.max_line_bytes, 0)
+        self._partial = last[:self.max_line_bytes]
+
+    def finish(self) -> 'LogScanner':
+        """Scan whatever is left after the last newline."""
+        if self._partial:
+            self._scan_line(self._partial, len(self._partial) + self._partial_dropped)
+            self._partial = b''
+            self._partial_dropped = 0
+        return self
+
+    def best_match(self) -> Optional[Dict]:
+        """Get the highest-priority pattern match found, if any."""
+        return self.classifier.best_match(self.first_hits.values())
+
+    def failure_reason(self) -> Optional[str]:
+        """Get the most specific failure reason found, if any."""
+        match = self.best_match()
+        if match:
+            return match['category']
+        if self.error_lines:
+            return self.error_lines[-1]
+        return None
+
+    def snippets(self) -> List[str]:
+        """Get the retained error lines, oldest first."""
+        return list(self.error_lines)
+
+    @classmethod
+    def _get_default_classifier(cls) -> FailureClassifier:
+        if cls._default_classifier is None:
+            cls._default_classifier = FailureClassifier(FailureClassifier.LOG_PATTERNS)
+        return cls._default_classifier
+
+    def _scan_line(self, raw: bytes, length: int):
+        """Scan one line. length is its size in the log, including the newline."""
+        line_start = self._line_start
+        self._line_start += length
+        self.lines_scanned += 1
+        # Try different encodings if utf-8 fails
+        try:
+            line = raw.decode('utf-8')
+        except UnicodeDecodeError:
+            line = raw.decode('latin-1')
+
+        for match in self.classifier.matches(line):
+            if match['pattern'] not in self.first_hits:
+                # Offsets point into the whole log, not just the line
+                match['offset'] += line_start
+                match['line'] = line.strip()
+                self.first_hits[match['pattern']] = match
+
+        if self.ERROR_REGEX.search(line):
+            self.error_lines.append(line.strip())
@@ -0,0 +1,137 @@
+# src/collectors/rate_limiter.py
+
+import heapq
+import itertools
+import threading
+import time
+from typing import Dict, Mapping
+
+# Request priorities, lower runs first when requests are queued
+PRIORITY_LISTING = 0
+PRIORITY_METADATA = 1
+PRIORITY_LOGS = 2
+
+class RateLimitScheduler:
+    """Paces GitHub requests using the X-RateLimit-* and Retry-After headers.
+
+    Requests run freely while plenty of quota remains. Once the remaining
+    quota drops below pace_below, requests are spread evenly over the time
+    left until the reset. At the reserve, everything pauses until the window
+    resets. A rate-limited response always pauses for at least its
+    Retry-After, or until a reset time still in the future, or else for
+    min_pause seconds. Queued requests are released in priority order, so
+    run listing goes ahead of job lookups and log downloads.
+    """
+
+    def __init__(self, reserve: int = 10, pace_below: int = 500, min_pause: float = 60.0):
+        self.reserve = reserve
+        self.pace_below = pace_below
+        self.min_pause = min_pause
+
+        self._cond = threading.Condition()
+        self._waiting = []
+        self._tickets = itertools.count()
+        self._remaining = None
+        self._reset_at = None
+        self._paused_until = 0.0
+        self._last_request = 0.0
+
+        self.stats = {
+            'waits': 0,
+            'waited_seconds': 0.0,
+            'rate_limited': 0
+        }
+
+    def acquire(self, priority: int = PRIORITY_METADATA):
+        """Block until a request of the given priority may be sent."""
+        with self._cond:
+            ticket = (priority, next(self._tickets))
+            heapq.heappush(self._waiting, ticket)
+            started = time.monotonic()
+            waited = False
+            try:
+                while True:
+                    if self._waiting[0] == ticket:
+                        delay = self._delay()
+                        if delay <= 0:
+                            break
+                        self._cond.wait(delay)
+                    else:
+                        self._cond.wait()
+                    waited = True
+            finally:
+                self._waiting.remove(ticket)
+                heapq.heapify(self._waiting)
+                self._cond.notify_all()
+
+            if waited:
+                self.stats['waits'] += 1
+                self.stats['waited_seconds'] += time.monotonic() - started
+            self._last_request = time.monotonic()
+            if self._remaining is not None:
+                # Count in-flight requests against the quota until headers catch up
+                self._remaining -= 1
+
+    def update(self, status_code: int, headers: Mapping[str, str]):
+        """Record the quota reported by a response."""
+        with self._cond:
+            remaining = headers.get('X-RateLimit-Remaining')
+            reset = headers.get('X-RateLimit-Reset')
+            if remaining is not None and remaining.isdigit():
+                self._remaining = int(remaining)
+            if reset is not None and reset.isdigit():
+                self._reset_at = float(reset)
+
+            now = time.time()
+            retry_after = headers.get('Retry-After')
+            if retry_after and retry_after.isdigit():
+                self._pause(now + int(retry_after))
+            elif self.is_rate_limited(status_code, headers):
+                # A missing or already passed reset (clock skew) must not
+                # turn into an immediate retry
+                if self._reset_at and self._reset_at > now:
+                    self._pause(self._reset_at)
+                else:
+                    self._pause(now + self.min_pause)
+
+            self._cond.notify_all()
+
+    def is_rate_limited(self, status_code: int, headers: Mapping[str, str]) -> bool:
+        """Check whether a response was rejected for exhausting the primary quota."""
+        return status_code in (403, 429) and headers.get('X-RateLimit-Remaining') == '0'
+
+    def get_stats(self) -> Dict:
+        """Return the wait counters and the last known quota."""
+        with self._cond:
+            stats = dict(self.stats)
+            stats['remaining'] = self._remaining
+            stats['reset_at'] = self._reset_at
+            return stats
+
+    def _pause(self, until_epoch: float):
+        self.stats['rate_limited'] += 1
+        self._paused_until = max(self._paused_until, until_epoch)
+
+    def _delay(self) -> float:
+        """Seconds the next request has to wait. Call with the lock held."""
+        now = time.time()
+        if self._paused_until > now:
+            return self._paused_until - now
+
+        if self._remaining is None or self._reset_at is None:
+            return 0.0
+
+        window = max(self._reset_at - now, 0.0)
+        if window == 0.0:
+            # The window has reset, the next response will refresh the quota
+            self._remaining = None
+            return 0.0
+
+        budget = self._remaining - self.reserve
+        if budget <= 0:
+            return window
+        if self._remaining >= self.pace_below:
+            return 0.0
+
+        interval = window / budget
+        return self._last_request + interval - time.monotonic()
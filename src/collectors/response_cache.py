@@ -0,0 +1,134 @@
+# src/collectors/response_cache.py
+
+import json
+import sqlite3
+import threading
+import time
+from typing import Dict, Optional
+
+from src.utils.paths import DEFAULT_HTTP_CACHE_PATH
+
+class ResponseCache:
+    """Persistent HTTP response cache for conditional GitHub requests.
+
+    Bodies are stored with their ETag / Last-Modified validators so the next
+    request can send If-None-Match / If-Modified-Since and reuse the stored
+    body on a 304, which GitHub does not count against the rate limit.
+    Entries are evicted least-recently-used first once the total body size
+    goes over max_bytes.
+    """
+
+    def __init__(self, db_path: str = DEFAULT_HTTP_CACHE_PATH, max_bytes: int = 256 * 1024 * 1024):
+        self.db_path = db_path
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        self._conn.execute('PRAGMA journal_mode=WAL')
+        self._conn.execute('''
+            CREATE TABLE IF NOT EXISTS http_cache (
+                cache_key TEXT PRIMARY KEY,
+                etag TEXT,
+                last_modified TEXT,
+                headers TEXT,
+                body BLOB,
+                size INTEGER,
+                last_access REAL
+            )
+        ''')
+        self._conn.execute('CREATE INDEX IF NOT EXISTS idx_http_cache_last_access ON http_cache(last_access)')
+        self._conn.commit()
+        self._total_bytes = self._conn.execute('SELECT COALESCE(SUM(size), 0) FROM http_cache').fetchone()[0]
+
+        self.stats = {
+            'hits': 0,
+            'misses': 0,
+            'stores': 0,
+            'evictions': 0
+        }
+
+    def get(self, cache_key: str) -> Optional[Dict]:
+        """Get a cached entry with its validators, or None."""
+        with self._lock:
+            row = self._conn.execute(
+                'SELECT etag, last_modified, headers, body FROM http_cache WHERE cache_key = ?',
+                (cache_key,)
+            ).fetchone()
+        if row is None:
+            return None
+        return {
+            'etag': row[0],
+            'last_modified': row[1],
+            'headers': json.loads(row[2]),
+            'body': row[3]
+        }
+
+    def conditional_headers(self, entry: Dict) -> Dict[str, str]:
+        """Build the validator headers for a cached entry."""
+        headers = {}
+        if entry.get('etag'):
+            headers['If-None-Match'] = entry['etag']
+        if entry.get('last_modified'):
+            headers['If-Modified-Since'] = entry['last_modified']
+        return headers
+
+    def record_hit(self, cache_key: str):
+        """Count a 304 revalidation and refresh the entry's LRU position."""
+        with self._lock:
+            self.stats['hits'] += 1
+            self._conn.execute('UPDATE http_cache SET last_access = ? WHERE cache_key = ?',
+                               (time.time(), cache_key))
+            self._conn.commit()
+
+    def record_miss(self):
+        with self._lock:
+            self.stats['misses'] += 1
+
+    def store(self, cache_key: str, etag: str, last_modified: str, headers: Dict, body: bytes):
+        """Store a response body, evicting old entries if the cache is full."""
+        size = len(body)
+        if size > self.max_bytes:
+            return
+
+        with self._lock:
+            old = self._conn.execute('SELECT size FROM http_cache WHERE cache_key = ?', (cache_key,)).fetchone()
+            self._conn.execute('''
+                INSERT OR REPLACE INTO http_cache
+                (cache_key, etag, last_modified, headers, body, size, last_access)
+                VALUES (?, ?, ?, ?, ?, ?, ?)
+            ''', (cache_key, etag, last_modified, json.dumps(headers), body, size, time.time()))
+            self._total_bytes += size - (old[0] if old else 0)
+            self.stats['stores'] += 1
+            self._evict()
+            self._conn.commit()
+
+    def get_stats(self) -> Dict:
+        """Return hit/miss counters, hit rate and current size."""
+        with self._lock:
+            stats = dict(self.stats)
+            stats['bytes'] = self._total_bytes
+        lookups = stats['hits'] + stats['misses']
+        stats['hit_rate'] = stats['hits'] / lookups if lookups else 0.0
+        return stats
+
+    def clear(self):
+        """Remove every cached response."""
+        with self._lock:
+            self._conn.execute('DELETE FROM http_cache')
+            self._conn.commit()
+            self._total_bytes = 0
+
+    def _evict(self):
+        """Drop least recently used entries until under max_bytes. Call with the lock held."""
+        while self._total_bytes > self.max_bytes:
+            rows = self._conn.execute(
+                'SELECT cache_key, size FROM http_cache ORDER BY last_access LIMIT 32'
+            ).fetchall()
+            if not rows:
+                self._total_bytes = 0
+                return
+            for cache_key, size in rows:
+                if self._total_bytes <= self.max_bytes:
+                    break
+                self._conn.execute('DELETE FROM http_cache WHERE cache_key = ?', (cache_key,))
+                self._total_bytes -= size
+                self.stats['evictions'] += 1
@@ -0,0 +1,147 @@
+# src/database/connection_pool.py
+
+import queue
+import sqlite3
+import threading
+from concurrent.futures import Future
+from typing import Any, Callable, List
+
+class ConnectionPool:
+    """One writer connection fed by a queue plus reusable per-thread readers.
+
+    Writes are callables run on a dedicated writer thread. Jobs that queue
+    up while a transaction is in progress are committed together (group
+    commit), each inside its own savepoint so a failing job only rolls back
+    its own changes. Every thread that reads gets its own connection, reused
+    across calls, with a statement cache so hot queries are prepared once.
+    """
+
+    def __init__(self, connect: Callable[..., sqlite3.Connection], cached_statements: int = 256,
+                 max_group_size: int = 64):
+        self._connect = connect
+        self.cached_statements = cached_statements
+        self.max_group_size = max_group_size
+
+        self._local = threading.local()
+        self._readers: List[sqlite3.Connection] = []
+        self._readers_lock = threading.Lock()
+
+        self._jobs = queue.Queue()
+        self._writer_thread = None
+        self._writer_conn = None
+        self._writer_lock = threading.Lock()
+        self._closed = False
+
+    def reader(self) -> sqlite3.Connection:
+        """Get this thread's read connection, opening it on first use."""
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = self._connect(cached_statements=self.cached_statements, check_same_thread=False)
+            self._local.conn = conn
+            with self._readers_lock:
+                self._readers.append(conn)
+        return conn
+
+    def write(self, job: Callable[[sqlite3.Connection], Any]) -> Any:
+        """Run job(conn) on the writer connection in a transaction and return its result.
+
+        Jobs should return plain values, never cursors, since a cursor
+        released on another thread would touch the writer connection.
+        """
+        if threading.current_thread() is self._writer_thread:
+            # Called from inside another write job, already in a transaction
+            return job(self._writer_conn)
+        return self.submit(job).result()
+
+    def submit(self, job: Callable[[sqlite3.Connection], Any]) -> Future:
+        """Queue a write job without waiting for it."""
+        if self._closed:
+            raise RuntimeError("Connection pool is closed")
+        self._ensure_writer()
+        future = Future()
+        self._jobs.put((job, future))
+        return future
+
+    def close(self):
+        """Finish queued writes, stop the writer and close every connection."""
+        with self._writer_lock:
+            self._closed = True
+            if self._writer_thread is not None:
+                self._jobs.put(None)
+                self._writer_thread.join()
+                self._writer_thread = None
+        with self._readers_lock:
+            for conn in self._readers:
+                conn.close()
+            self._readers = []
+        self._local = threading.local()
+
+    def _ensure_writer(self):
+        with self._writer_lock:
+            if self._writer_thread is None:
+                self._writer_thread = threading.Thread(
+                    target=self._run_writer, name="sqlite-writer", daemon=True
+                )
+                self._writer_thread.start()
+
+    def _run_writer(self):
+        conn = self._connect(cached_statements=self.cached_statements)
+        # Transactions are managed explicitly below
+        conn.isolation_level = None
+        self._writer_conn = conn
+        try:
+            while True:
+                item = self._jobs.get()
+                if item is None:
+                    return
+                group = [item]
+                stop = False
+                while len(group) < self.max_group_size:
+                    try:
+                        item = self._jobs.get_nowait()
+                    except queue.Empty:
+                        break
+                    if item is None:
+                        stop = True
+                        break
+                    group.append(item)
+
+                self._run_group(conn, group)
+                if stop:
+                    return
+        finally:
+            conn.close()
+
+    def _run_group(self, conn: sqlite3.Connection, group: list):
+        """Run queued jobs in one transaction, isolating each in a savepoint."""
+        results = []
+        try:
+            conn.execute('BEGIN IMMEDIATE')
+            for job, future in group:
+                if not future.set_running_or_notify_cancel():
+                    continue
+                conn.execute('SAVEPOINT job')
+                try:
+                    result = job(conn)
+                except BaseException as e:
+                    conn.execute('ROLLBACK TO job')
+                    conn.execute('RELEASE job')
+                    results.append((future, None, e))
+                else:
+                    conn.execute('RELEASE job')
+                    results.append((future, result, None))
+            conn.execute('COMMIT')
+        except BaseException as e:
+            if conn.in_transaction:
+                conn.execute('ROLLBACK')
+            # Nothing in the group was committed
+            for _, future in group:
+                if not future.done():
+                    future.set_exception(e)
+            return
+
+        for future, result, error in results:
+            if error is not None:
+                future.set_exception(error)
+            else:
+                future.set_result(result)
@@ -1,220 +1,678 @@
 # src/database/db_manager.py
 
 import sqlite3
+from contextlib import closing
 from datetime import datetime
-from typing import Dict, List
+from typing import Dict, Iterable, List, Sequence
 import json
 
+from src.analyzers.fingerprint import failure_fingerprint
+from src.database.connection_pool import ConnectionPool
+from src.database.migrations import SEARCH_SOURCES, migrate
+from src.database.rollups import GRANULARITIES, apply_pipeline_runs, summarize
+from src.utils.paths import DEFAULT_DB_PATH
+
+PIPELINE_RUN_COLUMNS = (
+    'run_id', 'workflow_name', 'status', 'conclusion',
+    'started_at', 'completed_at', 'duration',
+    'repository', 'branch', 'commit_sha', 'failure_reason', 'fingerprint'
+)
+
+PIPELINE_RUN_INSERT = '''
+    INSERT OR REPLACE INTO pipeline_runs (
+        run_id, workflow_name, status, conclusion,
+        started_at, completed_at, duration,
+        repository, branch, commit_sha, failure_reason, fingerprint
+    ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+'''
+
+TEST_RESULT_INSERT = '''
+    INSERT INTO test_results (
+        run_id, test_name, status, duration,
+        failure_message, error_type, stack_trace, retry_count, fingerprint
+    ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+'''
+
+LOG_SNIPPET_INSERT = '''
+    INSERT INTO log_snippets (run_id, job_id, content) VALUES (?, ?, ?)
+'''
+
+# Ranked page of index hits; snippets are only built for the rows on the page
+FAILURE_SEARCH_QUERY = '''
+    SELECT hits.source, hits.run_id, hits.score,
+           snippet(failure_search, 0, ?, ?, '...', ?) AS snippet,
+           pr.workflow_name, pr.branch, pr.conclusion, pr.started_at,
+           tr.test_name, ls.job_id
+    FROM (
+        SELECT rowid, source, run_id, rank AS score FROM failure_search
+        WHERE failure_search MATCH ?{source_filter}
+        ORDER BY rank
+        LIMIT ? OFFSET ?
+    ) AS hits
+    JOIN failure_search ON failure_search.rowid = hits.rowid
+    LEFT JOIN pipeline_runs pr ON pr.run_id = hits.run_id
+    LEFT JOIN test_results tr ON hits.source = 'test' AND tr.id = hits.rowid / {sources}
+    LEFT JOIN log_snippets ls ON hits.source = 'log' AND ls.id = hits.rowid / {sources}
+    WHERE failure_search MATCH ?
+    ORDER BY hits.score
+'''
+
+SEARCH_SOURCE_NAMES = ('run', 'test', 'log')
+
+ERROR_PATTERN_INSERT = '''
+    INSERT OR REPLACE INTO error_patterns (
+        pattern, error_type, frequency, last_seen, suggested_fix
+    ) VALUES (?, ?, ?, ?, ?)
+'''
+
+ANALYSIS_RESULT_INSERT = '''
+    INSERT INTO analysis_results (
+        analysis_type, failure_id, analysis_data, timestamp, workflow_name, failure_reason,
+        fingerprint
+    ) VALUES (?, ?, ?, ?, ?, ?, ?)
+'''
+
+# Per-connection tuning; WAL lets readers run alongside the collector's writes
+CONNECTION_PRAGMAS = [
+    'PRAGMA synchronous = NORMAL',
+    'PRAGMA cache_size = -65536',
+    'PRAGMA mmap_size = 268435456',
+    'PRAGMA temp_store = MEMORY'
+]
+
 class DatabaseManager:
-    def __init__(self, db_path: str = 'ci_insights.db'):
+    BUSY_TIMEOUT = 30.0
+
+    def __init__(self, db_path: str = DEFAULT_DB_PATH):
         self.db_path = db_path
+        self._pool = ConnectionPool(self._connect)
         self.init_db()
 
     def get_connection(self):
         """Get a database connection."""
-        return sqlite3.connect(self.db_path)
+        return self._connect()
+
+    def _connect(self, **kwargs) -> sqlite3.Connection:
+        """Open a connection with the busy timeout and tuning pragmas applied."""
+        conn = sqlite3.connect(self.db_path, timeout=self.BUSY_TIMEOUT, **kwargs)
+        for pragma in CONNECTION_PRAGMAS:
+            conn.execute(pragma)
+        return conn
+
+    def close(self):
+        """Flush queued writes and close the pooled connections."""
+        self._pool.close()
+
+    def _write(self, sql: str, rows: List[tuple]) -> int:
+        """Run a statement for many rows in one transaction on the writer connection.
+        
+        Returns the number of rows changed. Jobs must not hand cursors back
+        to the calling thread, so only the count leaves the writer.
+        """
+        if not rows:
+            return 0
+        return self._pool.write(lambda conn: conn.executemany(sql, rows).rowcount)
+
+    def _read(self, sql: str, params=(), as_dict: bool = True) -> List:
+        """Run a query on this thread's pooled reader connection."""
+        c = self._pool.reader().cursor()
+        if as_dict:
+            c.row_factory = self.dict_factory
+        try:
+            return c.execute(sql, params).fetchall()
+        finally:
+            c.close()
+
+    def batch(self, commit_every: int = 500) -> 'WriteBatch':
+        """Start a unit of work that buffers rows and commits every N rows.
+
+        Usage:
+            with db.batch() as batch:
+                for run in runs:
+                    batch.add_pipeline_run(run)
+        """
+        return WriteBatch(self, commit_every)
 
     def init_db(self):
-        """Initialize the database with required tables."""
-        with sqlite3.connect(self.db_path) as conn:
-            c = conn.cursor()
-            
-            # Pipeline runs table
-            c.execute('''
-                CREATE TABLE IF NOT EXISTS pipeline_runs (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    run_id TEXT UNIQUE,
-                    workflow_name TEXT,
-                    status TEXT,
-                    conclusion TEXT,
-                    started_at TIMESTAMP,
-                    completed_at TIMESTAMP,
-                    duration INTEGER,
-                    repository TEXT,
-                    branch TEXT,
-                    commit_sha TEXT,
-                    failure_reason TEXT,
-                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-                )
-            ''')
-            
-            # Test results table
-            c.execute('''
-                CREATE TABLE IF NOT EXISTS test_results (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    run_id TEXT,
-                    test_name TEXT,
-                    status TEXT,
-                    duration REAL,
-                    failure_message TEXT,
-                    error_type TEXT,
-                    stack_trace TEXT,
-                    retry_count INTEGER DEFAULT 0,
-                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                    FOREIGN KEY (run_id) REFERENCES pipeline_runs(run_id)
-                )
-            ''')
-            
-            # Error patterns table
-            c.execute('''
-                CREATE TABLE IF NOT EXISTS error_patterns (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    pattern TEXT,
-                    error_type TEXT,
-                    frequency INTEGER,
-                    last_seen TIMESTAMP,
-                    suggested_fix TEXT,
-                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-                )
-            ''')
-            
-            # Analysis results table
-            c.execute('''
-                CREATE TABLE IF NOT EXISTS analysis_results (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    analysis_type TEXT,
-                    data JSON,
-                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-                )
-            ''')
-            
-            conn.commit()
+        """Bring the schema up to date.
+        
+        Pending migrations are applied in order inside one transaction; a
+        database that is already current costs a single PRAGMA read.
+        """
+        with closing(self._connect()) as conn:
+            migrate(conn)
 
     def store_pipeline_run(self, run_data: Dict):
         """Store pipeline run data."""
-        with sqlite3.connect(self.db_path) as conn:
-            c = conn.cursor()
-            c.execute('''
-                INSERT OR REPLACE INTO pipeline_runs (
-                    run_id, workflow_name, status, conclusion,
-                    started_at, completed_at, duration,
-                    repository, branch, commit_sha, failure_reason
-                ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-            ''', (
-                run_data['run_id'],
-                run_data['workflow_name'],
-                run_data['status'],
-                run_data['conclusion'],
-                run_data['started_at'],
-                run_data['completed_at'],
-                run_data['duration'],
-                run_data['repository'],
-                run_data['branch'],
-                run_data['commit_sha'],
-                run_data.get('failure_reason')
-            ))
-            conn.commit()
+        self.store_pipeline_runs([run_data])
+
+    def store_pipeline_runs(self, runs: Iterable[Dict]) -> int:
+        """Store many pipeline runs in one transaction. Returns the row count.
+        
+        Runs carrying 'log_snippets' (the error lines the collector kept
+        from the failed job's log) have their stored snippets replaced.
+        """
+        runs = list(runs)
+        rows = [self._pipeline_run_row(run_data) for run_data in runs]
+        snippets = self._log_snippet_rows(runs)
+        if rows:
+            self._pool.write(lambda conn: self._insert_pipeline_runs(conn, rows, snippets))
+        return len(rows)
+
+    def _insert_pipeline_runs(self, conn: sqlite3.Connection, rows: List[tuple],
+                              snippets: Dict[str, List[tuple]] = None):
+        """Insert run rows and fold them into the rollups in the same transaction."""
+        conn.executemany(PIPELINE_RUN_INSERT, rows)
+        apply_pipeline_runs(conn, [dict(zip(PIPELINE_RUN_COLUMNS, row)) for row in rows])
+        if snippets:
+            # Row by row so the delete triggers drop the old index entries
+            conn.executemany('DELETE FROM log_snippets WHERE run_id = ?', [(run_id,) for run_id in snippets])
+            conn.executemany(LOG_SNIPPET_INSERT, [row for rows in snippets.values() for row in rows])
+
+    def get_stored_conclusions(self, run_ids: List[str]) -> Dict[str, str]:
+        """Get the stored conclusion for each of the given run ids that exists."""
+        conclusions = {}
+        # Stay well under SQLite's bound-parameter limit
+        for i in range(0, len(run_ids), 500):
+            chunk = [str(run_id) for run_id in run_ids[i:i + 500]]
+            conclusions.update(self._read(f'''
+                SELECT run_id, conclusion FROM pipeline_runs
+                WHERE run_id IN ({','.join('?' * len(chunk))})
+            ''', chunk, as_dict=False))
+        return conclusions
+
+    def get_sync_cursor(self, repository: str, workflow_name: str) -> Dict:
+        """Get the incremental sync cursor for a workflow, or None if never synced."""
+        rows = self._read('''
+            SELECT * FROM sync_cursors
+            WHERE repository = ? AND workflow_name = ?
+        ''', (repository, workflow_name))
+        return rows[0] if rows else None
+
+    def update_sync_cursor(self, repository: str, workflow_name: str,
+                           last_updated_at: str, last_run_id: str):
+        """Advance the incremental sync cursor for a workflow."""
+        self._write('''
+            INSERT OR REPLACE INTO sync_cursors (
+                repository, workflow_name, last_updated_at, last_run_id, updated_at
+            ) VALUES (?, ?, ?, ?, ?)
+        ''', [(repository, workflow_name, last_updated_at, str(last_run_id),
+               datetime.now().isoformat())])
 
     def store_test_result(self, test_data: Dict):
         """Store test result data."""
-        with sqlite3.connect(self.db_path) as conn:
-            c = conn.cursor()
-            c.execute('''
-                INSERT INTO test_results (
-                    run_id, test_name, status, duration,
-                    failure_message, error_type, stack_trace, retry_count
-                ) VALUES (?, ?, ?, ?, ?, ?, ?, ?)
-            ''', (
-                test_data['run_id'],
-                test_data['test_name'],
-                test_data['status'],
-                test_data['duration'],
-                test_data.get('failure_message'),
-                test_data.get('error_type'),
-                test_data.get('stack_trace'),
-                test_data.get('retry_count', 0)
-            ))
-            conn.commit()
+        self.store_test_results([test_data])
+
+    def store_test_results(self, results: Iterable[Dict]) -> int:
+        """Store many test results in one transaction. Returns the row count."""
+        rows = [self._test_result_row(test_data) for test_data in results]
+        self._write(TEST_RESULT_INSERT, rows)
+        return len(rows)
 
     def store_error_pattern(self, pattern_data: Dict):
         """Store error pattern data."""
-        with sqlite3.connect(self.db_path) as conn:
-            c = conn.cursor()
-            c.execute('''
-                INSERT OR REPLACE INTO error_patterns (
-                    pattern, error_type, frequency, last_seen, suggested_fix
-                ) VALUES (?, ?, ?, ?, ?)
-            ''', (
-                pattern_data['pattern'],
-                pattern_data['error_type'],
-                pattern_data['frequency'],
-                pattern_data['last_seen'],
-                pattern_data['suggested_fix']
-            ))
-            conn.commit()
+        self.store_error_patterns([pattern_data])
+
+    def store_error_patterns(self, patterns: Iterable[Dict]) -> int:
+        """Store many error patterns in one transaction. Returns the row count."""
+        rows = [self._error_pattern_row(pattern_data) for pattern_data in patterns]
+        self._write(ERROR_PATTERN_INSERT, rows)
+        return len(rows)
+
+    def get_error_patterns(self) -> List[Dict]:
+        """Get all stored error patterns."""
+        return self._read('SELECT * FROM error_patterns ORDER BY id')
+
+    def record_pattern_hits(self, hits: Dict[str, int], last_seen: str):
+        """Add hit counts to error patterns and update last_seen in one transaction."""
+        self._write('''
+            UPDATE error_patterns
+            SET frequency = COALESCE(frequency, 0) + ?, last_seen = ?
+            WHERE pattern = ?
+        ''', [(count, last_seen, pattern) for pattern, count in hits.items()])
 
     def store_analysis_result(self, analysis_type: str, analysis_data: dict):
         """Store analysis results in the database."""
-        with self.get_connection() as conn:
-            c = conn.cursor()
-            
-            # First, drop the existing table if it exists
-            c.execute('DROP TABLE IF EXISTS analysis_results')
+        self.store_analysis_results(analysis_type, [analysis_data])
+
+    def store_analysis_results(self, analysis_type: str, analyses: Iterable[Dict]) -> int:
+        """Append many analysis results in one transaction. Returns the row count."""
+        rows = [self._analysis_row(analysis_type, analysis_data) for analysis_data in analyses]
+        self._write(ANALYSIS_RESULT_INSERT, rows)
+        return len(rows)
+
+    def get_latest_analysis(self, failure_id: str, analysis_type: str = None) -> Dict:
+        """Get the most recent analysis for a run, or None if it was never analyzed."""
+        query = 'SELECT * FROM analysis_results WHERE failure_id = ?'
+        params = [str(failure_id)]
+        if analysis_type:
+            query += ' AND analysis_type = ?'
+            params.append(analysis_type)
+        query += ' ORDER BY timestamp DESC, id DESC LIMIT 1'
+        
+        rows = self._read(query, params)
+        row = rows[0] if rows else None
+        if row:
+            row['analysis_data'] = json.loads(row['analysis_data'])
+        return row
+
+    def get_recent_analysis_by_fingerprint(self, fingerprint: str, analysis_type: str,
+                                           since: str) -> Dict:
+        """Get the newest analysis of a failure signature made at or after since."""
+        rows = self._read('''
+            SELECT * FROM analysis_results
+            WHERE analysis_type = ? AND fingerprint = ? AND timestamp >= ?
+            ORDER BY timestamp DESC, id DESC
+            LIMIT 1
+        ''', (analysis_type, fingerprint, since))
+        row = rows[0] if rows else None
+        if row:
+            row['analysis_data'] = json.loads(row['analysis_data'])
+        return row
+
+    def get_recent_failures(self, limit: int = 100) -> List[Dict]:
+        """Get the most recent failed pipeline runs, newest first."""
+        return self._read('''
+            SELECT * FROM pipeline_runs
+            WHERE conclusion = 'failure'
+            ORDER BY started_at DESC
+            LIMIT ?
+        ''', (limit,))
+
+    def get_recent_failures_with_clusters(self, limit: int = 10) -> List[Dict]:
+        """Get the most recent failed pipeline runs, newest first, with the cluster_id of their fingerprint."""
+        return self._read('''
+            SELECT pr.*, fc.cluster_id FROM pipeline_runs pr
+            LEFT JOIN fingerprint_clusters fc ON fc.fingerprint = pr.fingerprint
+            WHERE pr.conclusion = 'failure'
+            ORDER BY pr.started_at DESC
+            LIMIT ?
+        ''', (limit,))
+
+    def get_failed_test_traces(self, limit: int = 10000) -> List[Dict]:
+        """Get the failure message and stack trace of test results that have a stack trace."""
+        return self._read('''
+            SELECT failure_message, stack_trace FROM test_results
+            WHERE stack_trace IS NOT NULL
+            LIMIT ?
+        ''', (limit,))
+
+    def get_state(self, name: str, default: str = None) -> str:
+        """Get a value from the engine_state key/value table."""
+        rows = self._read('SELECT value FROM engine_state WHERE name = ?', (name,), as_dict=False)
+        return rows[0][0] if rows else default
+
+    def get_test_results_after(self, last_id: int, limit: int = 10000) -> List[Dict]:
+        """Get test results with id above last_id, oldest first, with their run's commit."""
+        return self._read('''
+            SELECT tr.id, tr.test_name, tr.status, tr.retry_count, tr.created_at,
+                   pr.commit_sha, pr.started_at
+            FROM test_results tr
+            LEFT JOIN pipeline_runs pr ON tr.run_id = pr.run_id
+            WHERE tr.id > ?
+            ORDER BY tr.id
+            LIMIT ?
+        ''', (last_id, limit))
+
+    def get_test_flakiness(self, test_names: List[str]) -> Dict[str, Dict]:
+        """Get the flakiness counters for the given tests, keyed by test name."""
+        summaries = {}
+        for i in range(0, len(test_names), 500):
+            chunk = test_names[i:i + 500]
+            for row in self._read(f'''
+                SELECT * FROM test_flakiness
+                WHERE test_name IN ({','.join('?' * len(chunk))})
+            ''', chunk):
+                summaries[row['test_name']] = row
+        return summaries
+
+    def store_test_flakiness(self, summaries: Iterable[Dict], last_id: int):
+        """Write flakiness counters and advance the processed-results watermark together."""
+        rows = [(
+            summary['test_name'], summary['runs'], summary['failures'], summary['flips'],
+            summary['same_commit_flips'], summary['retry_passes'], summary['flake_score'],
+            summary['last_status'], summary['last_commit'], summary['last_seen']
+        ) for summary in summaries]
+        
+        def write(conn):
+            conn.executemany('''
+                INSERT OR REPLACE INTO test_flakiness (
+                    test_name, runs, failures, flips, same_commit_flips, retry_passes,
+                    flake_score, last_status, last_commit, last_seen, updated_at
+                ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, CURRENT_TIMESTAMP)
+            ''', rows)
+            conn.execute('''
+                INSERT OR REPLACE INTO engine_state (name, value, updated_at)
+                VALUES ('flakiness_last_result_id', ?, CURRENT_TIMESTAMP)
+            ''', (str(last_id),))
+        
+        self._pool.write(write)
+
+    def get_top_flaky_tests(self, limit: int = 50) -> List[Dict]:
+        """Get the tests with the highest flake score."""
+        return self._read('''
+            SELECT * FROM test_flakiness
+            WHERE flake_score > 0
+            ORDER BY flake_score DESC
+            LIMIT ?
+        ''', (limit,))
+
+    def get_failure_texts_after(self, source: str, last_id: int, limit: int = 5000) -> List[Dict]:
+        """Fingerprinted failures with id above last_id, oldest first, as {'id', 'fingerprint', 'text'}.
+        
+        source is 'run' for failure reasons or 'test' for test failure
+        messages with their stack traces.
+        """
+        if source == 'run':
+            query = '''
+                SELECT id, fingerprint, failure_reason AS text FROM pipeline_runs
+                WHERE id > ? AND fingerprint IS NOT NULL
+                ORDER BY id
+                LIMIT ?
+            '''
+        elif source == 'test':
+            query = '''
+                SELECT id, fingerprint,
+                       COALESCE(failure_message, '') || char(10) || COALESCE(stack_trace, '') AS text
+                FROM test_results
+                WHERE id > ? AND fingerprint IS NOT NULL
+                ORDER BY id
+                LIMIT ?
+            '''
+        else:
+            raise ValueError(f"Unknown failure source: {source}")
+        return self._read(query, (last_id, limit))
+
+    def get_fingerprint_clusters(self, fingerprints: List[str]) -> Dict[str, int]:
+        """Cluster id of each of the given fingerprints that has been clustered."""
+        clusters = {}
+        for i in range(0, len(fingerprints), 500):
+            chunk = fingerprints[i:i + 500]
+            clusters.update(self._read(f'''
+                SELECT fingerprint, cluster_id FROM fingerprint_clusters
+                WHERE fingerprint IN ({','.join('?' * len(chunk))})
+            ''', chunk, as_dict=False))
+        return clusters
+
+    def get_cluster_signatures(self, fingerprints: List[str]) -> Dict[str, bytes]:
+        """Stored MinHash signature of each of the given fingerprints."""
+        signatures = {}
+        for i in range(0, len(fingerprints), 500):
+            chunk = fingerprints[i:i + 500]
+            signatures.update(self._read(f'''
+                SELECT fingerprint, signature FROM fingerprint_clusters
+                WHERE fingerprint IN ({','.join('?' * len(chunk))})
+            ''', chunk, as_dict=False))
+        return signatures
+
+    def get_lsh_candidates(self, keys: List[tuple]) -> Dict[tuple, List[tuple]]:
+        """(cluster_id, fingerprint) members stored under each (band, bucket) key."""
+        candidates = {}
+        keys = list(set(keys))
+        for i in range(0, len(keys), 250):
+            chunk = keys[i:i + 250]
+            for band, bucket, cluster_id, fingerprint in self._read(f'''
+                SELECT band, bucket, cluster_id, fingerprint FROM cluster_lsh_buckets
+                WHERE (band, bucket) IN (VALUES {','.join(['(?, ?)'] * len(chunk))})
+            ''', [value for key in chunk for value in key], as_dict=False):
+                candidates.setdefault((band, bucket), []).append((cluster_id, fingerprint))
+        return candidates
+
+    def store_failure_clusters(self, members: List[tuple], buckets: List[tuple], new_clusters: Dict[int, str],
+                               state: tuple):
+        """Write one clustering pass and advance its watermark together.
+        
+        Args:
+            members: (fingerprint, cluster, signature bytes) per new fingerprint
+            buckets: (band, bucket, cluster, fingerprint) LSH entries
+            new_clusters: Label of each cluster created in the pass, keyed by
+                the negative reference members use until it has an id
+            state: (engine_state name, last processed row id)
+        """
+        def write(conn):
+            ids = {}
+            for ref, label in new_clusters.items():
+                ids[ref] = conn.execute('INSERT INTO failure_clusters (label) VALUES (?)', (label,)).lastrowid
             
-            # Create the table with the correct schema
-            c.execute('''
-                CREATE TABLE analysis_results (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    analysis_type TEXT NOT NULL,
-                    failure_id TEXT,
-                    analysis_data TEXT NOT NULL,
-                    timestamp TEXT NOT NULL,
-                    workflow_name TEXT,
-                    failure_reason TEXT
-                )
-            ''')
-            conn.commit()
+            conn.executemany('''
+                INSERT OR IGNORE INTO fingerprint_clusters (fingerprint, cluster_id, signature)
+                VALUES (?, ?, ?)
+            ''', [(fingerprint, ids.get(cluster, cluster), signature) for fingerprint, cluster, signature in members])
+            conn.executemany('''
+                INSERT OR IGNORE INTO cluster_lsh_buckets (band, bucket, cluster_id, fingerprint)
+                VALUES (?, ?, ?, ?)
+            ''', [(band, bucket, ids.get(cluster, cluster), fingerprint) for band, bucket, cluster, fingerprint in buckets])
             
-            # Now insert the data
-            try:
-                c.execute('''
-                    INSERT INTO analysis_results 
-                    (analysis_type, failure_id, analysis_data, timestamp, workflow_name, failure_reason)
-                    VALUES (?, ?, ?, ?, ?, ?)
-                ''', (
-                    analysis_type,
-                    analysis_data.get('failure_id'),
-                    json.dumps(analysis_data),
-                    analysis_data.get('timestamp', datetime.now().isoformat()),
-                    analysis_data.get('workflow_name'),
-                    analysis_data.get('failure_reason')
-                ))
-                conn.commit()
-            except sqlite3.OperationalError as e:
-                print(f"Error storing analysis result: {str(e)}")
-                # If there's an error, try to recreate the table and insert again
-                c.execute('DROP TABLE IF EXISTS analysis_results')
-                c.execute('''
-                    CREATE TABLE analysis_results (
-                        id INTEGER PRIMARY KEY AUTOINCREMENT,
-                        analysis_type TEXT NOT NULL,
-                        failure_id TEXT,
-                        analysis_data TEXT NOT NULL,
-                        timestamp TEXT NOT NULL,
-                        workflow_name TEXT,
-                        failure_reason TEXT
-                    )
-                ''')
-                conn.commit()
-                
-                # Try the insert again
-                c.execute('''
-                    INSERT INTO analysis_results 
-                    (analysis_type, failure_id, analysis_data, timestamp, workflow_name, failure_reason)
-                    VALUES (?, ?, ?, ?, ?, ?)
-                ''', (
-                    analysis_type,
-                    analysis_data.get('failure_id'),
-                    json.dumps(analysis_data),
-                    analysis_data.get('timestamp', datetime.now().isoformat()),
-                    analysis_data.get('workflow_name'),
-                    analysis_data.get('failure_reason')
-                ))
-                conn.commit()
+            touched = {ids.get(cluster, cluster) for _, cluster, _ in members}
+            conn.executemany('''
+                UPDATE failure_clusters
+                SET size = (SELECT count(*) FROM fingerprint_clusters WHERE cluster_id = failure_clusters.id),
+                    updated_at = CURRENT_TIMESTAMP
+                WHERE id = ?
+            ''', [(cluster_id,) for cluster_id in touched])
+            conn.execute('''
+                INSERT OR REPLACE INTO engine_state (name, value, updated_at)
+                VALUES (?, ?, CURRENT_TIMESTAMP)
+            ''', (state[0], str(state[1])))
+        
+        self._pool.write(write)
+
+    def get_failure_clusters(self, limit: int = 50) -> List[Dict]:
+        """Get the clusters with the most distinct failure signatures."""
+        return self._read('''
+            SELECT * FROM failure_clusters
+            ORDER BY size DESC, id
+            LIMIT ?
+        ''', (limit,))
+
+    def get_rollups(self, granularity: str = 'day', since: str = None, until: str = None,
+                    repository: str = None, workflow_name: str = None, branch: str = None) -> List[Dict]:
+        """Get raw rollup rows for buckets starting in [since, until)."""
+        if granularity not in GRANULARITIES:
+            raise ValueError(f"Unknown granularity: {granularity}")
+        query = 'SELECT * FROM pipeline_rollups WHERE granularity = ?'
+        params = [granularity]
+        for column, op, value in [('bucket_start', '>=', since), ('bucket_start', '<', until),
+                                  ('repository', '=', repository), ('workflow_name', '=', workflow_name),
+                                  ('branch', '=', branch)]:
+            if value is not None:
+                query += f' AND {column} {op} ?'
+                params.append(value)
+        return self._read(query + ' ORDER BY bucket_start', params)
+
+    def get_rollup_summary(self, granularity: str = 'day', since: str = None, until: str = None,
+                           repository: str = None, workflow_name: str = None, branch: str = None,
+                           group_by=('workflow_name', 'branch')) -> List[Dict]:
+        """Failure rate, p50/p95 duration and mean time to recovery per group over a period.
+        
+        Answers come from merging the period's rollup buckets, e.g. seven
+        daily buckets for a weekly view, never from scanning pipeline_runs.
+        """
+        rows = self.get_rollups(granularity, since, until, repository, workflow_name, branch)
+        return summarize(rows, group_by)
+
+    def search_failures(self, query: str, limit: int = 20, offset: int = 0,
+                        sources: Sequence[str] = None, raw: bool = False,
+                        highlight=('[', ']'), snippet_tokens: int = 24) -> Dict:
+        """Full-text search over failure reasons, test failures and log snippets.
+        
+        Args:
+            query: Words to look for; every word must appear. With raw=True
+                the query is passed to FTS5 as is, for phrases, OR, NEAR
+                and prefix* searches
+            limit: Page size
+            offset: Number of ranked results to skip
+            sources: Restrict to some of 'run' (failure reasons), 'test'
+                (failure messages and stack traces) and 'log' (log snippets)
+            highlight: Markers put around matched words in snippets
+            snippet_tokens: Approximate snippet length in words
+        
+        Returns:
+            {'query', 'offset', 'limit', 'has_more', 'results'} where results
+            are best-first (lowest bm25 score) with the source, run_id,
+            score, snippet and run details, plus test_name or job_id.
+        """
+        match = query if raw else self._match_expression(query)
+        if not match:
+            return {'query': query, 'offset': offset, 'limit': limit, 'has_more': False, 'results': []}
+        
+        source_filter = ''
+        params = [highlight[0], highlight[1], snippet_tokens, match]
+        if sources:
+            unknown = set(sources) - set(SEARCH_SOURCE_NAMES)
+            if unknown:
+                raise ValueError(f"Unknown search sources: {', '.join(sorted(unknown))}")
+            source_filter = f" AND source IN ({','.join('?' * len(sources))})"
+            params.extend(sources)
+        # One extra row tells whether there is another page
+        params.extend([limit + 1, offset, match])
+        
+        sql = FAILURE_SEARCH_QUERY.format(source_filter=source_filter, sources=SEARCH_SOURCES)
+        results = self._read(sql, params)
+        return {
+            'query': query,
+            'offset': offset,
+            'limit': limit,
+            'has_more': len(results) > limit,
+            'results': results[:limit]
+        }
+
+    def _match_expression(self, query: str) -> str:
+        """Quote each word of a plain query so punctuation in paths and ids is not FTS5 syntax."""
+        return ' '.join('"' + word.replace('"', '""') + '"' for word in (query or '').split())
+
+    def _log_snippet_rows(self, runs: List[Dict]) -> Dict[str, List[tuple]]:
+        """Snippet rows keyed by run id, for runs that carry log snippets."""
+        snippets = {}
+        for run_data in runs:
+            if 'log_snippets' not in run_data:
+                continue
+            run_id = str(run_data['run_id'])
+            snippets[run_id] = [
+                (run_id, str(snippet['job_id']) if snippet.get('job_id') is not None else None, snippet['content'])
+                for snippet in run_data['log_snippets'] or []
+                if snippet.get('content')
+            ]
+        return snippets
+
+    def _pipeline_run_row(self, run_data: Dict) -> tuple:
+        return (
+            run_data['run_id'],
+            run_data['workflow_name'],
+            run_data['status'],
+            run_data['conclusion'],
+            run_data['started_at'],
+            run_data['completed_at'],
+            run_data['duration'],
+            run_data['repository'],
+            run_data['branch'],
+            run_data['commit_sha'],
+            run_data.get('failure_reason'),
+            run_data.get('fingerprint') or failure_fingerprint(run_data.get('failure_reason'))
+        )
+
+    def _test_result_row(self, test_data: Dict) -> tuple:
+        return (
+            test_data['run_id'],
+            test_data['test_name'],
+            test_data['status'],
+            test_data['duration'],
+            test_data.get('failure_message'),
+            test_data.get('error_type'),
+            test_data.get('stack_trace'),
+            test_data.get('retry_count', 0),
+            test_data.get('fingerprint') or failure_fingerprint(
+                test_data.get('failure_message'), test_data.get('stack_trace')
+            )
+        )
+
+    def _error_pattern_row(self, pattern_data: Dict) -> tuple:
+        return (
+            pattern_data['pattern'],
+            pattern_data['error_type'],
+            pattern_data['frequency'],
+            pattern_data['last_seen'],
+            pattern_data['suggested_fix']
+        )
+
+    def _analysis_row(self, analysis_type: str, analysis_data: Dict) -> tuple:
+        failure_id = analysis_data.get('failure_id', analysis_data.get('run_id'))
+        return (
+            analysis_type,
+            str(failure_id) if failure_id is not None else None,
+            json.dumps(analysis_data),
+            analysis_data.get('timestamp', datetime.now().isoformat()),
+            analysis_data.get('workflow_name'),
+            analysis_data.get('failure_reason'),
+            analysis_data.get('fingerprint')
+        )
 
     def dict_factory(self, cursor, row):
         """Convert database row to dictionary."""
         d = {}
         for idx, col in enumerate(cursor.description):
             d[col[0]] = row[idx]
-        return d
\ No newline at end of file
+        return d
+
+class WriteBatch:
+    """Unit of work that streams rows into the database in batched transactions.
+
+    Rows are buffered per table and written with executemany; everything
+    buffered is committed every commit_every rows and when the block exits.
+    If the block raises, rows not yet committed are discarded.
+    """
+
+    def __init__(self, db: DatabaseManager, commit_every: int = 500):
+        self.db = db
+        self.commit_every = commit_every
+        self.committed = 0
+        self._runs = []
+        self._tests = []
+        self._patterns = []
+        self._snippets = {}
+
+    def __enter__(self) -> 'WriteBatch':
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.flush()
+        else:
+            self._runs, self._tests, self._patterns, self._snippets = [], [], [], {}
+        return False
+
+    def add_pipeline_run(self, run_data: Dict):
+        self._runs.append(self.db._pipeline_run_row(run_data))
+        self._snippets.update(self.db._log_snippet_rows([run_data]))
+        self._maybe_flush()
+
+    def add_test_result(self, test_data: Dict):
+        self._tests.append(self.db._test_result_row(test_data))
+        self._maybe_flush()
+
+    def add_error_pattern(self, pattern_data: Dict):
+        self._patterns.append(self.db._error_pattern_row(pattern_data))
+        self._maybe_flush()
+
+    def pending(self) -> int:
+        return len(self._runs) + len(self._tests) + len(self._patterns)
+
+    def flush(self):
+        """Write and commit everything buffered in one transaction."""
+        if not self.pending():
+            return
+        runs, tests, patterns, snippets = self._runs, self._tests, self._patterns, self._snippets
+        
+        def write(conn):
+            # Runs first so test results never reference a missing run
+            self.db._insert_pipeline_runs(conn, runs, snippets)
+            conn.executemany(TEST_RESULT_INSERT, tests)
+            conn.executemany(ERROR_PATTERN_INSERT, patterns)
+        
+        self.db._pool.write(write)
+        self.committed += self.pending()
+        self._runs, self._tests, self._patterns, self._snippets = [], [], [], {}
+
+    def _maybe_flush(self):
+        if self.pending() >= self.commit_every:
+            self.flush()
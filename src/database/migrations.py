@@ -0,0 +1,480 @@
+# src/database/migrations.py
+
+import sqlite3
+from typing import Callable, List, Tuple
+
+from src.analyzers.fingerprint import failure_fingerprint
+from src.database.rollups import apply_pipeline_runs
+
+# Every migration must be safe to run on a database created before schema
+# versioning existed (user_version 0 with some tables already present), so
+# DDL uses IF NOT EXISTS and checks existing columns before altering.
+
+def _initial_schema(c: sqlite3.Cursor):
+    """Pipeline runs, test results and error patterns."""
+    c.execute('''
+        CREATE TABLE IF NOT EXISTS pipeline_runs (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            run_id TEXT UNIQUE,
+            workflow_name TEXT,
+            status TEXT,
+            conclusion TEXT,
+            started_at TIMESTAMP,
+            completed_at TIMESTAMP,
+            duration INTEGER,
+            repository TEXT,
+            branch TEXT,
+            commit_sha TEXT,
+            failure_reason TEXT,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    ''')
+
+    c.execute('''
+        CREATE TABLE IF NOT EXISTS test_results (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            run_id TEXT,
+            test_name TEXT,
+            status TEXT,
+            duration REAL,
+            failure_message TEXT,
+            error_type TEXT,
+            stack_trace TEXT,
+            retry_count INTEGER DEFAULT 0,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            FOREIGN KEY (run_id) REFERENCES pipeline_runs(run_id)
+        )
+    ''')
+
+    c.execute('''
+        CREATE TABLE IF NOT EXISTS error_patterns (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            pattern TEXT,
+            error_type TEXT,
+            frequency INTEGER,
+            last_seen TIMESTAMP,
+            suggested_fix TEXT,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    ''')
+
+def _sync_cursors(c: sqlite3.Cursor):
+    """Incremental sync cursors, one per repository and workflow."""
+    c.execute('''
+        CREATE TABLE IF NOT EXISTS sync_cursors (
+            repository TEXT,
+            workflow_name TEXT,
+            last_created_at TIMESTAMP,
+            last_run_id TEXT,
+            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            PRIMARY KEY (repository, workflow_name)
+        )
+    ''')
+
+def _append_only_analysis_results(c: sqlite3.Cursor):
+    """Append-only analysis results, converting the old (data, created_at) layout."""
+    columns = [row[1] for row in c.execute('PRAGMA table_info(analysis_results)')]
+    legacy = bool(columns) and 'analysis_data' not in columns
+    if legacy:
+        c.execute('ALTER TABLE analysis_results RENAME TO analysis_results_legacy')
+
+    c.execute('''
+        CREATE TABLE IF NOT EXISTS analysis_results (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            analysis_type TEXT NOT NULL,
+            failure_id TEXT,
+            analysis_data TEXT NOT NULL,
+            timestamp TEXT NOT NULL,
+            workflow_name TEXT,
+            failure_reason TEXT
+        )
+    ''')
+
+    if legacy:
+        c.execute('''
+            INSERT INTO analysis_results (analysis_type, analysis_data, timestamp)
+            SELECT COALESCE(analysis_type, 'unknown'), COALESCE(data, '{}'),
+                   COALESCE(created_at, CURRENT_TIMESTAMP)
+            FROM analysis_results_legacy
+        ''')
+        c.execute('DROP TABLE analysis_results_legacy')
+
+    c.execute('''
+        CREATE INDEX IF NOT EXISTS idx_analysis_results_type_failure
+        ON analysis_results(analysis_type, failure_id, timestamp)
+    ''')
+    c.execute('''
+        CREATE INDEX IF NOT EXISTS idx_analysis_results_failure
+        ON analysis_results(failure_id, timestamp)
+    ''')
+    c.execute('''
+        CREATE INDEX IF NOT EXISTS idx_analysis_results_timestamp
+        ON analysis_results(timestamp)
+    ''')
+
+def _hot_path_indexes(c: sqlite3.Cursor):
+    """Indexes behind the recent-failure, failed-test and pattern queries."""
+    # Recent failures: WHERE conclusion = ? ORDER BY started_at DESC
+    c.execute('''
+        CREATE INDEX IF NOT EXISTS idx_pipeline_runs_conclusion_started
+        ON pipeline_runs(conclusion, started_at)
+    ''')
+    # Latest runs: ORDER BY started_at DESC
+    c.execute('''
+        CREATE INDEX IF NOT EXISTS idx_pipeline_runs_started
+        ON pipeline_runs(started_at)
+    ''')
+    # Failed tests: WHERE status = ? ORDER BY created_at DESC, joined on run_id
+    c.execute('''
+        CREATE INDEX IF NOT EXISTS idx_test_results_status_created
+        ON test_results(status, created_at, run_id)
+    ''')
+    c.execute('''
+        CREATE INDEX IF NOT EXISTS idx_test_results_run
+        ON test_results(run_id)
+    ''')
+    # Patterns by frequency: ORDER BY frequency DESC
+    c.execute('''
+        CREATE INDEX IF NOT EXISTS idx_error_patterns_frequency
+        ON error_patterns(frequency)
+    ''')
+    c.execute('''
+        CREATE INDEX IF NOT EXISTS idx_error_patterns_pattern
+        ON error_patterns(pattern)
+    ''')
+
+def _test_flakiness(c: sqlite3.Cursor):
+    """Rolling per-test flakiness counters and the watermark they were built to."""
+    c.execute('''
+        CREATE TABLE IF NOT EXISTS test_flakiness (
+            test_name TEXT PRIMARY KEY,
+            runs INTEGER DEFAULT 0,
+            failures INTEGER DEFAULT 0,
+            flips INTEGER DEFAULT 0,
+            same_commit_flips INTEGER DEFAULT 0,
+            retry_passes INTEGER DEFAULT 0,
+            flake_score REAL DEFAULT 0,
+            last_status TEXT,
+            last_commit TEXT,
+            last_seen TIMESTAMP,
+            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    ''')
+    c.execute('''
+        CREATE INDEX IF NOT EXISTS idx_test_flakiness_score
+        ON test_flakiness(flake_score)
+    ''')
+
+    # Small key/value store for incremental engines to keep their progress
+    c.execute('''
+        CREATE TABLE IF NOT EXISTS engine_state (
+            name TEXT PRIMARY KEY,
+            value TEXT,
+            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    ''')
+
+def _add_column(c: sqlite3.Cursor, table: str, column: str, definition: str):
+    """Add a column unless a pre-versioning database already has it."""
+    columns = [row[1] for row in c.execute(f'PRAGMA table_info({table})')]
+    if column not in columns:
+        c.execute(f'ALTER TABLE {table} ADD COLUMN {column} {definition}')
+
+def _failure_fingerprints(c: sqlite3.Cursor):
+    """Signature hashes on runs, test results and analyses, backfilled for existing rows."""
+    _add_column(c, 'pipeline_runs', 'fingerprint', 'TEXT')
+    _add_column(c, 'test_results', 'fingerprint', 'TEXT')
+    _add_column(c, 'analysis_results', 'fingerprint', 'TEXT')
+
+    c.connection.create_function('failure_fingerprint', -1, failure_fingerprint, deterministic=True)
+    c.execute('''
+        UPDATE pipeline_runs SET fingerprint = failure_fingerprint(failure_reason)
+        WHERE failure_reason IS NOT NULL
+    ''')
+    c.execute('''
+        UPDATE test_results SET fingerprint = failure_fingerprint(failure_message, stack_trace)
+        WHERE failure_message IS NOT NULL OR stack_trace IS NOT NULL
+    ''')
+
+    c.execute('''
+        CREATE INDEX IF NOT EXISTS idx_pipeline_runs_fingerprint
+        ON pipeline_runs(fingerprint, started_at)
+    ''')
+    c.execute('''
+        CREATE INDEX IF NOT EXISTS idx_test_results_fingerprint
+        ON test_results(fingerprint)
+    ''')
+    c.execute('''
+        CREATE INDEX IF NOT EXISTS idx_analysis_results_fingerprint
+        ON analysis_results(analysis_type, fingerprint, timestamp)
+    ''')
+
+def _pipeline_rollups(c: sqlite3.Cursor):
+    """Hourly and daily run rollups with duration sketches, backfilled from existing runs."""
+    c.execute('''
+        CREATE TABLE IF NOT EXISTS pipeline_rollups (
+            granularity TEXT NOT NULL,
+            bucket_start TEXT NOT NULL,
+            repository TEXT NOT NULL,
+            workflow_name TEXT NOT NULL,
+            branch TEXT NOT NULL,
+            runs INTEGER DEFAULT 0,
+            successes INTEGER DEFAULT 0,
+            failures INTEGER DEFAULT 0,
+            duration_sum REAL DEFAULT 0,
+            recoveries INTEGER DEFAULT 0,
+            recovery_seconds REAL DEFAULT 0,
+            duration_sketch TEXT,
+            PRIMARY KEY (granularity, bucket_start, repository, workflow_name, branch)
+        )
+    ''')
+    # Time-range reads across every workflow
+    c.execute('''
+        CREATE INDEX IF NOT EXISTS idx_pipeline_rollups_bucket
+        ON pipeline_rollups(granularity, bucket_start)
+    ''')
+
+    # What each run contributed, so re-stored runs are not counted twice
+    c.execute('''
+        CREATE TABLE IF NOT EXISTS rollup_applied (
+            run_id TEXT PRIMARY KEY,
+            repository TEXT,
+            workflow_name TEXT,
+            branch TEXT,
+            started_at TIMESTAMP,
+            completed_at TIMESTAMP,
+            conclusion TEXT,
+            duration INTEGER
+        )
+    ''')
+
+    # Open failure streak per repository, workflow and branch
+    c.execute('''
+        CREATE TABLE IF NOT EXISTS rollup_recovery (
+            repository TEXT,
+            workflow_name TEXT,
+            branch TEXT,
+            failing_since TIMESTAMP,
+            last_started_at TIMESTAMP,
+            last_run_id TEXT,
+            PRIMARY KEY (repository, workflow_name, branch)
+        )
+    ''')
+
+    columns = ['run_id', 'workflow_name', 'conclusion', 'started_at', 'completed_at',
+               'duration', 'repository', 'branch']
+    rows = c.execute(f'''
+        SELECT {', '.join(columns)} FROM pipeline_runs
+        WHERE conclusion IS NOT NULL AND started_at IS NOT NULL
+        ORDER BY started_at
+    ''')
+    while True:
+        chunk = rows.fetchmany(10000)
+        if not chunk:
+            break
+        apply_pipeline_runs(c.connection, [dict(zip(columns, row)) for row in chunk])
+
+# failure_search rowids are the source row's id times SEARCH_SOURCES plus
+# the source's offset, so each source row maps to exactly one index row
+SEARCH_SOURCES = 4
+SEARCH_RUN, SEARCH_TEST, SEARCH_LOG = 0, 1, 2
+
+def _failure_search(c: sqlite3.Cursor):
+    """Full-text index over failure reasons, test failures and log snippets, kept in sync by triggers."""
+    c.execute('''
+        CREATE TABLE IF NOT EXISTS log_snippets (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            run_id TEXT,
+            job_id TEXT,
+            content TEXT,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    ''')
+    c.execute('CREATE INDEX IF NOT EXISTS idx_log_snippets_run_id ON log_snippets(run_id)')
+
+    c.execute('''
+        CREATE VIRTUAL TABLE IF NOT EXISTS failure_search USING fts5(
+            body,
+            source UNINDEXED,
+            run_id UNINDEXED,
+            tokenize = 'porter unicode61'
+        )
+    ''')
+
+    run_row = f'NEW.id * {SEARCH_SOURCES} + {SEARCH_RUN}, NEW.failure_reason, \'run\', NEW.run_id'
+    test_body = "TRIM(COALESCE(NEW.failure_message, '') || char(10) || COALESCE(NEW.stack_trace, ''))"
+    test_row = f"NEW.id * {SEARCH_SOURCES} + {SEARCH_TEST}, {test_body}, 'test', NEW.run_id"
+    log_row = f"NEW.id * {SEARCH_SOURCES} + {SEARCH_LOG}, NEW.content, 'log', NEW.run_id"
+    for statement in [
+        # INSERT OR REPLACE does not fire delete triggers, so drop the
+        # replaced run's entry before the new row takes its place
+        f'''CREATE TRIGGER IF NOT EXISTS pipeline_runs_search_replace BEFORE INSERT ON pipeline_runs BEGIN
+            DELETE FROM failure_search WHERE rowid =
+                (SELECT id * {SEARCH_SOURCES} + {SEARCH_RUN} FROM pipeline_runs WHERE run_id = NEW.run_id);
+        END''',
+        f'''CREATE TRIGGER IF NOT EXISTS pipeline_runs_search_insert AFTER INSERT ON pipeline_runs
+            WHEN NEW.failure_reason IS NOT NULL BEGIN
+            INSERT INTO failure_search (rowid, body, source, run_id) VALUES ({run_row});
+        END''',
+        f'''CREATE TRIGGER IF NOT EXISTS pipeline_runs_search_update AFTER UPDATE OF failure_reason, run_id
+            ON pipeline_runs BEGIN
+            DELETE FROM failure_search WHERE rowid = OLD.id * {SEARCH_SOURCES} + {SEARCH_RUN};
+            INSERT INTO failure_search (rowid, body, source, run_id)
+                SELECT {run_row} WHERE NEW.failure_reason IS NOT NULL;
+        END''',
+        f'''CREATE TRIGGER IF NOT EXISTS pipeline_runs_search_delete AFTER DELETE ON pipeline_runs BEGIN
+            DELETE FROM failure_search WHERE rowid = OLD.id * {SEARCH_SOURCES} + {SEARCH_RUN};
+        END''',
+        f'''CREATE TRIGGER IF NOT EXISTS test_results_search_insert AFTER INSERT ON test_results
+            WHEN NEW.failure_message IS NOT NULL OR NEW.stack_trace IS NOT NULL BEGIN
+            INSERT INTO failure_search (rowid, body, source, run_id) VALUES ({test_row});
+        END''',
+        f'''CREATE TRIGGER IF NOT EXISTS test_results_search_update
+            AFTER UPDATE OF failure_message, stack_trace, run_id ON test_results BEGIN
+            DELETE FROM failure_search WHERE rowid = OLD.id * {SEARCH_SOURCES} + {SEARCH_TEST};
+            INSERT INTO failure_search (rowid, body, source, run_id)
+                SELECT {test_row} WHERE NEW.failure_message IS NOT NULL OR NEW.stack_trace IS NOT NULL;
+        END''',
+        f'''CREATE TRIGGER IF NOT EXISTS test_results_search_delete AFTER DELETE ON test_results BEGIN
+            DELETE FROM failure_search WHERE rowid = OLD.id * {SEARCH_SOURCES} + {SEARCH_TEST};
+        END''',
+        f'''CREATE TRIGGER IF NOT EXISTS log_snippets_search_insert AFTER INSERT ON log_snippets
+            WHEN NEW.content IS NOT NULL BEGIN
+            INSERT INTO failure_search (rowid, body, source, run_id) VALUES ({log_row});
+        END''',
+        f'''CREATE TRIGGER IF NOT EXISTS log_snippets_search_delete AFTER DELETE ON log_snippets BEGIN
+            DELETE FROM failure_search WHERE rowid = OLD.id * {SEARCH_SOURCES} + {SEARCH_LOG};
+        END'''
+    ]:
+        c.execute(statement)
+
+    # Backfill from whatever is already stored, then merge the index segments
+    c.execute('DELETE FROM failure_search')
+    c.execute(f'''
+        INSERT INTO failure_search (rowid, body, source, run_id)
+        SELECT id * {SEARCH_SOURCES} + {SEARCH_RUN}, failure_reason, 'run', run_id FROM pipeline_runs
+        WHERE failure_reason IS NOT NULL
+    ''')
+    c.execute(f'''
+        INSERT INTO failure_search (rowid, body, source, run_id)
+        SELECT id * {SEARCH_SOURCES} + {SEARCH_TEST},
+               TRIM(COALESCE(failure_message, '') || char(10) || COALESCE(stack_trace, '')), 'test', run_id
+        FROM test_results
+        WHERE failure_message IS NOT NULL OR stack_trace IS NOT NULL
+    ''')
+    c.execute("INSERT INTO failure_search (failure_search) VALUES ('optimize')")
+
+def _failure_clusters(c: sqlite3.Cursor):
+    """Near-duplicate clusters of failure fingerprints and their LSH buckets."""
+    c.execute('''
+        CREATE TABLE IF NOT EXISTS failure_clusters (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            label TEXT,
+            size INTEGER DEFAULT 0,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    ''')
+
+    # Cluster and MinHash signature of each distinct fingerprint
+    c.execute('''
+        CREATE TABLE IF NOT EXISTS fingerprint_clusters (
+            fingerprint TEXT PRIMARY KEY,
+            cluster_id INTEGER,
+            signature BLOB
+        )
+    ''')
+    c.execute('''
+        CREATE INDEX IF NOT EXISTS idx_fingerprint_clusters_cluster
+        ON fingerprint_clusters(cluster_id)
+    ''')
+
+    # One member per cluster in each band bucket is enough to find the cluster
+    c.execute('''
+        CREATE TABLE IF NOT EXISTS cluster_lsh_buckets (
+            band INTEGER,
+            bucket INTEGER,
+            cluster_id INTEGER,
+            fingerprint TEXT,
+            PRIMARY KEY (band, bucket, cluster_id)
+        ) WITHOUT ROWID
+    ''')
+
+def _refingerprint_failures(c: sqlite3.Cursor):
+    """Recompute fingerprints now that exit codes, ports and versions are kept, and recluster."""
+    c.connection.create_function('failure_fingerprint', -1, failure_fingerprint, deterministic=True)
+    c.execute('''
+        UPDATE pipeline_runs SET fingerprint = failure_fingerprint(failure_reason)
+        WHERE failure_reason IS NOT NULL
+    ''')
+    c.execute('''
+        UPDATE test_results SET fingerprint = failure_fingerprint(failure_message, stack_trace)
+        WHERE failure_message IS NOT NULL OR stack_trace IS NOT NULL
+    ''')
+
+    # Clusters are keyed by fingerprint; the next update rebuilds them from the start
+    c.execute('DELETE FROM cluster_lsh_buckets')
+    c.execute('DELETE FROM fingerprint_clusters')
+    c.execute('DELETE FROM failure_clusters')
+    c.execute("DELETE FROM engine_state WHERE name IN ('clusters_last_run_id', 'clusters_last_result_id')")
+
+def _sync_cursor_updated_at(c: sqlite3.Cursor):
+    """Track sync cursors by run updated_at, starting from the old created_at marks."""
+    _add_column(c, 'sync_cursors', 'last_updated_at', 'TIMESTAMP')
+    # A run changed since last_created_at was also updated after it
+    c.execute('UPDATE sync_cursors SET last_updated_at = last_created_at WHERE last_updated_at IS NULL')
+
+# Ordered (version, migration) pairs. Append new migrations with the next
+# version number; never edit or reorder ones that have shipped.
+MIGRATIONS: List[Tuple[int, Callable[[sqlite3.Cursor], None]]] = [
+    (1, _initial_schema),
+    (2, _sync_cursors),
+    (3, _append_only_analysis_results),
+    (4, _hot_path_indexes),
+    (5, _test_flakiness),
+    (6, _failure_fingerprints),
+    (7, _pipeline_rollups),
+    (8, _failure_search),
+    (9, _failure_clusters),
+    (10, _refingerprint_failures),
+    (11, _sync_cursor_updated_at)
+]
+
+LATEST_VERSION = MIGRATIONS[-1][0]
+
+def get_version(conn: sqlite3.Connection) -> int:
+    """Get the schema version recorded in PRAGMA user_version."""
+    return conn.execute('PRAGMA user_version').fetchone()[0]
+
+def migrate(conn: sqlite3.Connection) -> int:
+    """Apply pending migrations in one transaction and return the new version.
+
+    When the database is already current this is a single PRAGMA read.
+    """
+    if get_version(conn) >= LATEST_VERSION:
+        return get_version(conn)
+
+    # Journal mode is persistent and cannot change inside a transaction
+    conn.execute('PRAGMA journal_mode = WAL')
+
+    previous_isolation = conn.isolation_level
+    conn.isolation_level = None
+    try:
+        conn.execute('BEGIN IMMEDIATE')
+        try:
+            # Re-read under the write lock in case another process just migrated
+            version = get_version(conn)
+            c = conn.cursor()
+            for target, migration in MIGRATIONS:
+                if target > version:
+                    migration(c)
+                    version = target
+            c.execute(f'PRAGMA user_version = {version}')
+            conn.execute('COMMIT')
+        except Exception:
+            conn.execute('ROLLBACK')
+            raise
+    finally:
+        conn.isolation_level = previous_isolation
+
+    return version
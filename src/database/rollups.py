@@ -0,0 +1,224 @@
+# src/database/rollups.py
+
+import sqlite3
+from datetime import datetime, timezone
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+from src.analyzers.ddsketch import DDSketch
+
+# Every run is counted in one bucket of each granularity
+GRANULARITIES = ('hour', 'day')
+
+SKETCH_ACCURACY = 0.01
+
+ROLLUP_COLUMNS = ('runs', 'successes', 'failures', 'duration_sum', 'recoveries', 'recovery_seconds')
+
+def bucket_start(timestamp: str, granularity: str) -> str:
+    """The UTC bucket an ISO timestamp falls in, e.g. '2024-01-01T05:00:00' or '2024-01-01'."""
+    parsed = _parse_time(timestamp)
+    if parsed is None:
+        # Not a timestamp fromisoformat understands; bucket on its text
+        return timestamp[:13] + ':00:00' if granularity == 'hour' else timestamp[:10]
+    if granularity == 'hour':
+        return parsed.strftime('%Y-%m-%dT%H:00:00')
+    return parsed.strftime('%Y-%m-%d')
+
+def _parse_time(timestamp: str) -> Optional[datetime]:
+    """Parse an ISO timestamp as naive UTC; GitHub's 'Z' suffix is accepted on any Python 3."""
+    try:
+        parsed = datetime.fromisoformat(timestamp.replace('Z', '+00:00'))
+    except (AttributeError, TypeError, ValueError):
+        return None
+    return parsed.astimezone(timezone.utc).replace(tzinfo=None) if parsed.tzinfo else parsed
+
+def _contribution(run: Dict) -> Tuple:
+    """What a run adds to the rollups, as stored in rollup_applied."""
+    return (
+        run.get('repository') or '',
+        run.get('workflow_name') or '',
+        run.get('branch') or '',
+        run['started_at'],
+        run.get('completed_at'),
+        run['conclusion'],
+        run.get('duration')
+    )
+
+class _Deltas:
+    """Pending changes to rollup rows, keyed by (granularity, bucket, repository, workflow, branch)."""
+
+    def __init__(self):
+        self.counters: Dict[Tuple, Dict[str, float]] = {}
+        self.durations: Dict[Tuple, List[Tuple[float, int]]] = {}
+
+    def add(self, contribution: Tuple, sign: int):
+        repository, workflow_name, branch, started_at, _, conclusion, duration = contribution
+        for key in self._keys(repository, workflow_name, branch, started_at):
+            counters = self._counters(key)
+            counters['runs'] += sign
+            if conclusion == 'success':
+                counters['successes'] += sign
+            elif conclusion == 'failure':
+                counters['failures'] += sign
+            if duration is not None:
+                counters['duration_sum'] += sign * duration
+                self.durations.setdefault(key, []).append((duration, sign))
+
+    def add_recovery(self, repository: str, workflow_name: str, branch: str, started_at: str, seconds: float):
+        for key in self._keys(repository, workflow_name, branch, started_at):
+            counters = self._counters(key)
+            counters['recoveries'] += 1
+            counters['recovery_seconds'] += seconds
+
+    def _keys(self, repository, workflow_name, branch, started_at):
+        return [(granularity, bucket_start(started_at, granularity), repository, workflow_name, branch)
+                for granularity in GRANULARITIES]
+
+    def _counters(self, key: Tuple) -> Dict[str, float]:
+        if key not in self.counters:
+            self.counters[key] = {column: 0 for column in ROLLUP_COLUMNS}
+        return self.counters[key]
+
+def apply_pipeline_runs(conn: sqlite3.Connection, runs: Iterable[Dict]):
+    """Fold stored pipeline runs into the hourly and daily rollups.
+
+    Call inside the transaction that stores the runs. Each run's
+    contribution is recorded in rollup_applied, so storing the same run
+    again changes nothing, and a run whose conclusion or duration changed
+    has its old contribution taken back before the new one is added. Runs
+    without a conclusion yet are left until they finish.
+
+    Recovery time (first failure to the next success on the same
+    repository, workflow and branch) needs runs in time order; runs older
+    than the last one seen for their key still count towards totals and
+    durations but not towards recovery.
+    """
+    runs = sorted((run for run in runs if run.get('conclusion') and run.get('started_at')),
+                  key=lambda run: run['started_at'])
+    if not runs:
+        return
+
+    previous = _load_applied(conn, [str(run['run_id']) for run in runs])
+    deltas = _Deltas()
+    recovery: Dict[Tuple, Dict] = {}
+    applied = []
+    for run in runs:
+        run_id = str(run['run_id'])
+        contribution = _contribution(run)
+        old = previous.get(run_id)
+        if old == contribution:
+            continue
+        if old:
+            deltas.add(old, -1)
+        deltas.add(contribution, 1)
+        _advance_recovery(conn, recovery, deltas, run_id, contribution)
+        previous[run_id] = contribution
+        applied.append((run_id,) + contribution)
+
+    _write_deltas(conn, deltas)
+    conn.executemany('''
+        INSERT OR REPLACE INTO rollup_applied (
+            run_id, repository, workflow_name, branch, started_at, completed_at, conclusion, duration
+        ) VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+    ''', applied)
+    conn.executemany('''
+        INSERT OR REPLACE INTO rollup_recovery (
+            repository, workflow_name, branch, failing_since, last_started_at, last_run_id
+        ) VALUES (?, ?, ?, ?, ?, ?)
+    ''', [key + (state['failing_since'], state['last_started_at'], state['last_run_id'])
+          for key, state in recovery.items()])
+
+def _load_applied(conn: sqlite3.Connection, run_ids: List[str]) -> Dict[str, Tuple]:
+    applied = {}
+    for i in range(0, len(run_ids), 500):
+        chunk = run_ids[i:i + 500]
+        for row in conn.execute(f'''
+            SELECT run_id, repository, workflow_name, branch, started_at, completed_at, conclusion, duration
+            FROM rollup_applied WHERE run_id IN ({','.join('?' * len(chunk))})
+        ''', chunk):
+            applied[row[0]] = tuple(row[1:])
+    return applied
+
+def _advance_recovery(conn: sqlite3.Connection, recovery: Dict[Tuple, Dict], deltas: _Deltas,
+                      run_id: str, contribution: Tuple):
+    """Track open failure streaks and record a recovery when a success closes one."""
+    repository, workflow_name, branch, started_at, completed_at, conclusion, _ = contribution
+    key = (repository, workflow_name, branch)
+    if key not in recovery:
+        row = conn.execute('''
+            SELECT failing_since, last_started_at, last_run_id FROM rollup_recovery
+            WHERE repository = ? AND workflow_name = ? AND branch = ?
+        ''', key).fetchone()
+        recovery[key] = {
+            'failing_since': row[0] if row else None,
+            'last_started_at': row[1] if row else None,
+            'last_run_id': row[2] if row else None
+        }
+    state = recovery[key]
+
+    if state['last_started_at'] and started_at < state['last_started_at'] and run_id != state['last_run_id']:
+        # Arrived out of order; the streak has moved on
+        return
+
+    finished_at = completed_at or started_at
+    if conclusion == 'failure':
+        if not state['failing_since']:
+            state['failing_since'] = finished_at
+    elif conclusion == 'success' and state['failing_since']:
+        failed_at, recovered_at = _parse_time(state['failing_since']), _parse_time(finished_at)
+        if failed_at and recovered_at:
+            deltas.add_recovery(repository, workflow_name, branch, started_at,
+                                max(0.0, (recovered_at - failed_at).total_seconds()))
+        state['failing_since'] = None
+    state['last_started_at'] = started_at
+    state['last_run_id'] = run_id
+
+def _write_deltas(conn: sqlite3.Connection, deltas: _Deltas):
+    for key, counters in deltas.counters.items():
+        row = conn.execute(f'''
+            SELECT {', '.join(ROLLUP_COLUMNS)}, duration_sketch FROM pipeline_rollups
+            WHERE granularity = ? AND bucket_start = ? AND repository = ? AND workflow_name = ? AND branch = ?
+        ''', key).fetchone()
+        totals = dict(zip(ROLLUP_COLUMNS, row[:-1])) if row else {column: 0 for column in ROLLUP_COLUMNS}
+        sketch = DDSketch.from_json(row[-1]) if row and row[-1] else DDSketch(SKETCH_ACCURACY)
+        for column in ROLLUP_COLUMNS:
+            totals[column] += counters[column]
+        for duration, sign in deltas.durations.get(key, []):
+            sketch.add(duration, sign)
+
+        conn.execute(f'''
+            INSERT OR REPLACE INTO pipeline_rollups (
+                granularity, bucket_start, repository, workflow_name, branch,
+                {', '.join(ROLLUP_COLUMNS)}, duration_sketch
+            ) VALUES (?, ?, ?, ?, ?, {', '.join('?' * len(ROLLUP_COLUMNS))}, ?)
+        ''', key + tuple(totals[column] for column in ROLLUP_COLUMNS) + (sketch.to_json(),))
+
+def summarize(rows: Iterable[Dict], group_by: Sequence[str] = ('workflow_name', 'branch')) -> List[Dict]:
+    """Merge rollup rows into one summary per group_by key.
+
+    Each summary has the run counts, failure_rate, p50/p95 duration from
+    the merged sketches, and mttr_seconds (mean time to recovery) when any
+    failure streak ended in the period.
+    """
+    groups: Dict[Tuple, Dict] = {}
+    for row in rows:
+        key = tuple(row[field] for field in group_by)
+        group = groups.get(key)
+        if group is None:
+            group = groups[key] = {field: row[field] for field in group_by}
+            group.update({column: 0 for column in ROLLUP_COLUMNS})
+            group['_sketch'] = DDSketch(SKETCH_ACCURACY)
+        for column in ROLLUP_COLUMNS:
+            group[column] += row[column] or 0
+        if row['duration_sketch']:
+            group['_sketch'].merge(DDSketch.from_json(row['duration_sketch']))
+
+    summaries = []
+    for group in groups.values():
+        sketch = group.pop('_sketch')
+        decided = group['successes'] + group['failures']
+        group['failure_rate'] = group['failures'] / decided if decided else None
+        group['p50_duration'] = sketch.quantile(0.5)
+        group['p95_duration'] = sketch.quantile(0.95)
+        group['mttr_seconds'] = group['recovery_seconds'] / group['recoveries'] if group['recoveries'] else None
+        summaries.append(group)
+    return summaries
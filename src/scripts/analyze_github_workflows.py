@@ -5,67 +5,71 @@ import sys
 from pathlib import Path
 from typing import List, Dict
 import json
-import yaml
 from datetime import datetime, timedelta
-import requests
 
 # Add the project root to Python path
 sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
 
+from src.analyzers.fingerprint import ANALYSIS_FIELDS, group_by_fingerprint
+from src.analyzers.llm_cache import get_default_cache
 from src.analyzers.pipeline_analyzer import PipelineAnalyzer
+from src.analyzers.workflow_catalog import WorkflowCatalog
 from src.database.db_manager import DatabaseManager
 from src.collectors.github_collector import GitHubCollector
 
 class GitHubWorkflowAnalyzer:
-    def __init__(self):
-        # Get GitHub credentials from environment variables
-        token = os.getenv('GITHUB_TOKEN')
-        owner = os.getenv('GITHUB_OWNER')
-        repo = os.getenv('GITHUB_REPO')
-        
-        if not all([token, owner, repo]):
-            raise ValueError("Missing GitHub credentials. Please set GITHUB_TOKEN, GITHUB_OWNER, and GITHUB_REPO in .env file")
+    # A failure signature analyzed within this window is not analyzed again
+    ANALYSIS_WINDOW = timedelta(hours=24)
+
+    def __init__(self, db: DatabaseManager = None, github_collector: GitHubCollector = None):
+        """Pass db and github_collector to share warm ones, e.g. from the daemon."""
+        if github_collector is None:
+            # Get GitHub credentials from environment variables
+            token = os.getenv('GITHUB_TOKEN')
+            owner = os.getenv('GITHUB_OWNER')
+            repo = os.getenv('GITHUB_REPO')
+            
+            if not all([token, owner, repo]):
+                raise ValueError("Missing GitHub credentials. Please set GITHUB_TOKEN, GITHUB_OWNER, and GITHUB_REPO in .env file")
+            
+            github_collector = GitHubCollector(token=token, owner=owner, repo=repo)
         
-        self.github_collector = GitHubCollector(token=token, owner=owner, repo=repo)
-        self.pipeline_analyzer = PipelineAnalyzer()
-        self.db = DatabaseManager()
+        self.github_collector = github_collector
+        self.pipeline_analyzer = PipelineAnalyzer(cache=get_default_cache())
+        self.db = db or DatabaseManager()
+        self.catalog = WorkflowCatalog(self.github_collector)
+        self._pending_analyses = []
 
     def analyze_failed_workflows(self, days_back: int = 7):
         """Analyze all failed workflows from the last N days."""
-        # Get all workflow files first
-        workflow_files = self._get_workflow_files()
+        # Fetch and parse only the workflow files that changed since the last pass
+        self.catalog.refresh()
         
         # Get failed workflow runs
         failed_runs = self._get_failed_workflows(days_back)
         
-        print(f"\nFound {len(workflow_files)} workflow files")
-        print(f"Analyzing {len(failed_runs)} failed workflows")
+        # Runs of the same workflow failing the same way share one analysis
+        signatures = group_by_fingerprint(failed_runs, *ANALYSIS_FIELDS)
+        window_start = (datetime.now() - self.ANALYSIS_WINDOW).isoformat()
+        
+        print(f"\nFound {len(self.catalog)} workflow files")
+        print(f"Analyzing {len(failed_runs)} failed workflows ({len(signatures)} distinct failures)")
         print("=" * 50)
         
-        for run in failed_runs:
-            self._analyze_single_workflow(run, workflow_files)
-
-    def _get_workflow_files(self) -> Dict[str, str]:
-        """Get all workflow YAML files from GitHub."""
-        try:
-            # Get the contents of the .github/workflows directory
-            url = f"https://api.github.com/repos/{self.github_collector.owner}/{self.github_collector.repo}/contents/.github/workflows"
-            response = requests.get(url, headers=self.github_collector.headers)
-            response.raise_for_status()
-            
-            workflow_files = {}
-            for file in response.json():
-                if file['name'].endswith(('.yml', '.yaml')):
-                    # Get the file content
-                    content = self.github_collector.get_file_content(file['path'])
-                    if content:
-                        workflow_files[file['name']] = content
-            
-            return workflow_files
-            
-        except Exception as e:
-            print(f"Error getting workflow files: {str(e)}")
-            return {}
+        for signature, group in signatures.items():
+            previous = self.db.get_recent_analysis_by_fingerprint(
+                signature, 'github_workflow_analysis', window_start
+            )
+            if previous:
+                print(f"\nReusing earlier analysis of {group[0]['workflow_name']} for {len(group)} runs")
+                for run in group:
+                    self._store_analysis(run, previous['analysis_data']['analysis'], signature)
+                continue
+            self._analyze_single_workflow(group[0], group, signature)
+        
+        # Store all analyses from this pass in one batch
+        self.db.store_analysis_results('github_workflow_analysis', self._pending_analyses)
+        self._pending_analyses = []
 
     def _get_failed_workflows(self, days_back: int) -> List[Dict]:
         """Get all failed workflow runs from GitHub."""
@@ -78,46 +82,43 @@ class GitHubWorkflowAnalyzer:
         # Filter for failed runs
         return [run for run in runs if run['conclusion'] == 'failure']
 
-    def _analyze_single_workflow(self, run: Dict, workflow_files: Dict[str, str]):
-        """Analyze a single failed workflow run."""
+    def _analyze_single_workflow(self, run: Dict, group: List[Dict] = None, signature: str = None):
+        """Analyze a single failed workflow run.
+        
+        The analysis is stored for every run in group, the runs sharing
+        this run's failure signature.
+        """
+        group = group or [run]
         print(f"\nAnalyzing workflow: {run['workflow_name']}")
-        print(f"Run ID: {run['run_id']}")
+        print(f"Run ID: {run['run_id']}" + (f" (+{len(group) - 1} with the same failure)" if len(group) > 1 else ""))
         print(f"Failure Reason: {run['failure_reason']}")
         
         try:
             # Find the matching workflow file
-            workflow_content = None
-            for filename, content in workflow_files.items():
-                # Try to match the workflow name with the file content
-                try:
-                    workflow_yaml = yaml.safe_load(content)
-                    if workflow_yaml.get('name') == run['workflow_name']:
-                        workflow_content = content
-                        break
-                except yaml.YAMLError:
-                    continue
-            
-            if not workflow_content:
+            workflow = self.catalog.get_by_name(run['workflow_name'])
+            if not workflow:
                 print(f"Could not find workflow file for: {run['workflow_name']}")
                 return
             
             # Analyze the workflow
             analysis = self.pipeline_analyzer.analyze_pipeline(
-                workflow_content,
+                workflow.content,
                 {
                     'failure_reason': run['failure_reason'],
                     'workflow_name': run['workflow_name'],
                     'run_id': run['run_id'],
                     'started_at': run['started_at'],
                     'duration': run['duration']
-                }
+                },
+                workflow=workflow
             )
             
             # Print the analysis
             self._print_analysis(analysis)
             
             # Store the analysis
-            self._store_analysis(run, analysis)
+            for member in group:
+                self._store_analysis(member, analysis, signature)
             
         except Exception as e:
             print(f"Error analyzing workflow: {str(e)}")
@@ -139,17 +140,19 @@ class GitHubWorkflowAnalyzer:
             for suggestion in analysis['suggestions']:
                 print(f"- {suggestion}")
 
-    def _store_analysis(self, run: Dict, analysis: Dict):
-        """Store the analysis results in the database."""
+    def _store_analysis(self, run: Dict, analysis: Dict, signature: str = None):
+        """Queue the analysis results for the end-of-pass batch insert."""
         analysis_data = {
             'run_id': run['run_id'],
             'workflow_name': run['workflow_name'],
             'failure_reason': run['failure_reason'],
             'analysis': analysis,
+            # Errors and canned suggestions are never reused by signature
+            'fingerprint': None if analysis.get('error') or analysis.get('fallback') else signature,
             'timestamp': datetime.now().isoformat()
         }
         
-        self.db.store_analysis_result('github_workflow_analysis', analysis_data)
+        self._pending_analyses.append(analysis_data)
 
 def main():
     # Load environment variables
@@ -162,6 +165,10 @@ def main():
         
         # Analyze failed workflows from the last 7 days
         analyzer.analyze_failed_workflows(days_back=7)
+        
+        stats = analyzer.github_collector.http.get_stats()
+        print(f"\nGitHub API: {stats['requests']} requests, {stats['bytes']} bytes, "
+              f"{stats['retries']} retries, {stats['elapsed']:.1f}s")
     except ValueError as e:
         print(f"Error: {str(e)}")
         print("\nPlease make sure your .env file contains the following variables:")
@@ -7,12 +7,13 @@ from pathlib import Path
 # Add the project root to Python path
 sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
 
+from src.analyzers.llm_cache import get_default_cache
 from src.analyzers.pipeline_analyzer import PipelineAnalyzer
 from src.database.db_manager import DatabaseManager
 
 def analyze_pipeline(pipeline_path: str, failure_data: dict):
     """Analyze a pipeline file and store the results."""
-    analyzer = PipelineAnalyzer()
+    analyzer = PipelineAnalyzer(cache=get_default_cache())
     db = DatabaseManager()
     
     # Analyze the pipeline
@@ -2,40 +2,48 @@
 
 import os
 import sys
+from typing import Dict, List
 
 # Add the project root to Python path
 sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
 
 from dotenv import load_dotenv
+from src.analyzers.failure_classifier import FailureClassifier
 from src.collectors.github_collector import GitHubCollector
 from src.database.db_manager import DatabaseManager
 
-def collect_github_data():
-    # Load environment variables
-    load_dotenv()
-    
-    # Initialize collector and database
-    collector = GitHubCollector(
+def create_collector(classifier: FailureClassifier) -> GitHubCollector:
+    """Build a collector from the GITHUB_* and COLLECTOR_* environment variables."""
+    return GitHubCollector(
         token=os.getenv("GITHUB_TOKEN"),
         owner=os.getenv("GITHUB_OWNER"),
-        repo=os.getenv("GITHUB_REPO")
+        repo=os.getenv("GITHUB_REPO"),
+        max_workers=int(os.getenv("COLLECTOR_MAX_WORKERS", "8")),
+        log_tail_kb=int(os.getenv("COLLECTOR_LOG_TAIL_KB", "64")),
+        rerun_window_hours=int(os.getenv("COLLECTOR_RERUN_WINDOW_HOURS", "24")),
+        classifier=classifier
     )
-    db = DatabaseManager()
-    
-    # Get all workflow runs
-    runs = collector.get_workflow_runs()
+
+def collect_runs(db: DatabaseManager, collector: GitHubCollector, full_sync: bool = False,
+                 verbose: bool = True) -> List[Dict]:
+    """Collect and store workflow runs, returning the runs stored."""
+    if full_sync:
+        runs = collector.get_workflow_runs(all_pages=True)
+        print(f"Found {len(runs)} workflow runs")
+        db.store_pipeline_runs(runs)
+    else:
+        runs = collector.sync_workflow_runs(db)
+        print(f"Synced {len(runs)} new or changed workflow runs")
     
-    print(f"Found {len(runs)} workflow runs")
+    if not verbose:
+        return runs
     
-    # Store runs in database
     for run in runs:
         print(f"\nProcessing run {run['run_id']} - {run['workflow_name']}")
         print(f"Status: {run['status']}")
         print(f"Conclusion: {run['conclusion']}")
         print(f"Duration: {run['duration']} seconds")
         
-        db.store_pipeline_run(run)
-        
         # If the run failed, get more details
         if run['conclusion'] == 'failure':
             print(f"Failure Reason: {run['failure_reason']}")
@@ -44,6 +52,26 @@ def collect_github_data():
                 if job['conclusion'] == 'failure':
                     print(f"Failed Job: {job['name']}")
                     print(f"Job Failure Reason: {job.get('failure_reason', 'Unknown reason')}")
+    return runs
+
+def collect_github_data():
+    # Load environment variables
+    load_dotenv()
+    
+    # Initialize database, classifier and collector
+    db = DatabaseManager()
+    classifier = FailureClassifier.from_database(db, FailureClassifier.LOG_PATTERNS)
+    collector = create_collector(classifier)
+    
+    # Pass --full to re-collect every run instead of syncing new and changed ones
+    collect_runs(db, collector, full_sync='--full' in sys.argv)
+    
+    # Write pattern hit counts back in one batch
+    classifier.flush(db)
+    
+    stats = collector.http.get_stats()
+    print(f"\nGitHub API: {stats['requests']} requests, {stats['bytes']} bytes, "
+          f"{stats['retries']} retries, {stats['elapsed']:.1f}s")
 
 if __name__ == "__main__":
     collect_github_data()
\ No newline at end of file
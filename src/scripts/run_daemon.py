@@ -0,0 +1,251 @@
+# src/scripts/run_daemon.py
+
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, List
+import random
+import signal
+import sys
+import os
+import threading
+import time
+
+# Add the project root to Python path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+import schedule
+from dotenv import load_dotenv
+
+from src.analyzers.analyze_with_gpt import analyze_recent_failures, create_executor, print_llm_stats
+from src.analyzers.failure_classifier import FailureClassifier
+from src.analyzers.failure_clusters import FailureClusterer
+from src.analyzers.flaky_test_detector import FlakyTestDetector
+from src.analyzers.gpt_analyzer import GPTAnalyzer
+from src.analyzers.llm_cache import get_default_cache
+from src.database.db_manager import DatabaseManager
+from src.scripts.analyze_github_workflows import GitHubWorkflowAnalyzer
+from src.scripts.collect_github_data import collect_runs, create_collector
+
+class ScheduledJob:
+    """A daemon job that never overlaps itself and backs off after failures.
+
+    A tick that arrives while the previous run is still going is skipped.
+    After n failures in a row, ticks are skipped until
+    min(max_backoff, backoff * 2 ** (n - 1)) seconds (with up to half of
+    it taken off at random) have passed, so a failing dependency is not
+    hammered at the job's normal rate.
+    """
+
+    def __init__(self, name: str, fn: Callable[[], None], backoff: float = 60.0, max_backoff: float = 3600.0):
+        self.name = name
+        self.fn = fn
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.failures = 0
+        self.retry_at = 0.0
+        self._running = threading.Lock()
+
+        self.stats = {
+            'runs': 0,
+            'errors': 0,
+            'skipped_overlap': 0,
+            'skipped_backoff': 0,
+            'seconds': 0.0
+        }
+
+    def try_start(self) -> bool:
+        """Claim the job for one run; False if it is running or backing off."""
+        if time.monotonic() < self.retry_at:
+            self.stats['skipped_backoff'] += 1
+            return False
+        if not self._running.acquire(blocking=False):
+            self.stats['skipped_overlap'] += 1
+            print(f"[{self.name}] previous run still in progress, skipping this tick")
+            return False
+        return True
+
+    def cancel_start(self):
+        """Give back a claim from try_start() without running."""
+        self._running.release()
+
+    def run(self):
+        """Run once; call only after try_start() returned True."""
+        started = time.monotonic()
+        try:
+            self.fn()
+            self.failures = 0
+            self.retry_at = 0.0
+        except Exception as e:
+            self.failures += 1
+            self.stats['errors'] += 1
+            delay = min(self.max_backoff, self.backoff * 2 ** (self.failures - 1))
+            delay *= random.uniform(0.5, 1.0)
+            self.retry_at = time.monotonic() + delay
+            print(f"[{self.name}] failed ({self.failures} in a row): {str(e)}; next attempt in {delay:.0f}s or later")
+        finally:
+            self.stats['runs'] += 1
+            self.stats['seconds'] += time.monotonic() - started
+            self._running.release()
+
+    def wait_idle(self, timeout: float = None) -> bool:
+        """Wait for a running instance to finish."""
+        if self._running.acquire(timeout=-1 if timeout is None else timeout):
+            self._running.release()
+            return True
+        return False
+
+class CIInsightsDaemon:
+    """Runs collection, classification and analysis on schedules in one process.
+
+    The database pool, HTTP session with its ETag cache, failure
+    classifier, workflow catalog, LLM executor and LLM cache are created
+    once and stay warm between runs. Each job runs on its own worker
+    thread, so a slow analysis never delays collection. SIGTERM or SIGINT
+    stops scheduling, lets running jobs finish and their batches flush,
+    then closes the database; a second signal exits at once.
+    """
+
+    def __init__(self, db: DatabaseManager = None, jitter: int = 30, backoff: float = 60.0,
+                 max_backoff: float = 3600.0):
+        self.db = db or DatabaseManager()
+        self.jitter = jitter
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.scheduler = schedule.Scheduler()
+        self.jobs: List[ScheduledJob] = []
+        self._stop = threading.Event()
+        self._workers = None
+
+        self.classifier = FailureClassifier.from_database(self.db, FailureClassifier.LOG_PATTERNS)
+        self.flaky_detector = FlakyTestDetector(self.db)
+        self.clusterer = FailureClusterer(self.db)
+        has_github = all(os.getenv(name) for name in ('GITHUB_TOKEN', 'GITHUB_OWNER', 'GITHUB_REPO'))
+        has_openai = bool(os.getenv('OPENAI_API_KEY'))
+        self.collector = create_collector(self.classifier) if has_github else None
+        self.gpt_analyzer = GPTAnalyzer(cache=get_default_cache(), executor=create_executor()) if has_openai else None
+        self.workflow_analyzer = GitHubWorkflowAnalyzer(self.db, self.collector) if has_github and has_openai else None
+
+    def add_job(self, name: str, fn: Callable[[], None], interval: int):
+        """Schedule fn every interval seconds plus up to the daemon's jitter."""
+        if interval <= 0:
+            print(f"[{name}] disabled")
+            return
+        job = ScheduledJob(name, fn, self.backoff, self.max_backoff)
+        self.jobs.append(job)
+        self.scheduler.every(interval).to(interval + self.jitter).seconds.do(self._dispatch, job)
+        print(f"[{name}] every {interval}s" + (f" (+0-{self.jitter}s jitter)" if self.jitter else ""))
+
+    def add_default_jobs(self, intervals: Dict[str, int]):
+        """Schedule the standard jobs; jobs missing credentials are left out."""
+        if self.collector:
+            self.add_job('collect', self.collect, intervals['collect'])
+        else:
+            print("[collect] skipped: set GITHUB_TOKEN, GITHUB_OWNER and GITHUB_REPO to collect runs")
+        self.add_job('classify', self.classify, intervals['classify'])
+        if self.gpt_analyzer:
+            self.add_job('analyze', self.analyze, intervals['analyze'])
+        else:
+            print("[analyze] skipped: set OPENAI_API_KEY to analyze failures")
+        if self.workflow_analyzer:
+            self.add_job('workflows', self.analyze_workflows, intervals['workflows'])
+        else:
+            print("[workflows] skipped: needs both GitHub credentials and OPENAI_API_KEY")
+
+    def collect(self):
+        collect_runs(self.db, self.collector, verbose=False)
+        self.classifier.flush(self.db)
+
+    def classify(self):
+        self.classifier.flush(self.db)
+        results = self.flaky_detector.update()
+        signatures = self.clusterer.update()
+        print(f"[classify] {results} test results folded into flakiness, {signatures} new failure signatures clustered")
+
+    def analyze(self):
+        self.clusterer.update()
+        analyze_recent_failures(self.db, self.gpt_analyzer)
+
+    def analyze_workflows(self):
+        self.workflow_analyzer.analyze_failed_workflows(days_back=7)
+
+    def run(self, poll_interval: float = 1.0):
+        """Run until SIGTERM or SIGINT, starting every job once right away."""
+        previous = {sig: signal.signal(sig, self._handle_signal) for sig in (signal.SIGTERM, signal.SIGINT)}
+        self._workers = ThreadPoolExecutor(max_workers=max(1, len(self.jobs)), thread_name_prefix='daemon-job')
+        try:
+            for job in self.jobs:
+                self._dispatch(job)
+            while not self._stop.wait(poll_interval):
+                self.scheduler.run_pending()
+        finally:
+            self.shutdown()
+            for sig, handler in previous.items():
+                signal.signal(sig, handler)
+
+    def stop(self):
+        self._stop.set()
+
+    def shutdown(self):
+        """Wait for running jobs, flush pending writes and close the database."""
+        self._stop.set()
+        self.scheduler.clear()
+        if self._workers:
+            running = [job.name for job in self.jobs if not job.wait_idle(timeout=0)]
+            if running:
+                print(f"Waiting for {', '.join(running)} to finish...")
+            self._workers.shutdown(wait=True)
+            self._workers = None
+        self.classifier.flush(self.db)
+        self.db.close()
+        self.print_stats()
+
+    def print_stats(self):
+        print("\nDaemon jobs:")
+        for job in self.jobs:
+            stats = job.stats
+            print(f"  {job.name}: {stats['runs']} runs, {stats['errors']} errors, "
+                  f"{stats['skipped_overlap']} skipped while running, {stats['skipped_backoff']} skipped backing off, "
+                  f"{stats['seconds']:.1f}s busy")
+        if self.collector:
+            stats = self.collector.http.get_stats()
+            print(f"GitHub API: {stats['requests']} requests, {stats['bytes']} bytes, "
+                  f"{stats['retries']} retries, {stats['elapsed']:.1f}s")
+        if self.gpt_analyzer:
+            print_llm_stats(self.gpt_analyzer)
+
+    def _dispatch(self, job: ScheduledJob):
+        """Hand a due job to a worker thread unless it is still running or backing off."""
+        if self._stop.is_set() or not job.try_start():
+            return
+        try:
+            self._workers.submit(job.run)
+        except RuntimeError:
+            # The worker pool is shutting down
+            job.cancel_start()
+
+    def _handle_signal(self, signum, frame):
+        print(f"\nReceived {signal.Signals(signum).name}, finishing running jobs before exit "
+              f"(send it again to exit immediately)")
+        self._stop.set()
+        signal.signal(signum, signal.SIG_DFL)
+
+def main():
+    # Load environment variables once for the life of the process
+    load_dotenv()
+
+    daemon = CIInsightsDaemon(
+        jitter=int(os.getenv('DAEMON_JITTER_SECONDS', '30')),
+        backoff=float(os.getenv('DAEMON_BACKOFF_SECONDS', '60')),
+        max_backoff=float(os.getenv('DAEMON_MAX_BACKOFF_SECONDS', '3600'))
+    )
+    # An interval of 0 disables a job
+    daemon.add_default_jobs({
+        'collect': int(os.getenv('DAEMON_COLLECT_INTERVAL', '300')),
+        'classify': int(os.getenv('DAEMON_CLASSIFY_INTERVAL', '600')),
+        'analyze': int(os.getenv('DAEMON_ANALYZE_INTERVAL', '3600')),
+        'workflows': int(os.getenv('DAEMON_WORKFLOWS_INTERVAL', '3600'))
+    })
+    print("CI insights daemon started; press Ctrl+C or send SIGTERM to stop")
+    daemon.run()
+
+if __name__ == "__main__":
+    main()
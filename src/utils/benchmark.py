@@ -0,0 +1,168 @@
+# src/utils/benchmark.py
+
+from datetime import datetime
+from typing import Callable, Dict, List
+import argparse
+import json
+import platform
+import sqlite3
+import statistics
+import sys
+import os
+import time
+
+# Add the project root to Python path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from src.analyzers.failure_classifier import FailureClassifier
+from src.analyzers.failure_clusters import FailureClusterer
+from src.analyzers.fingerprint import failure_fingerprint
+from src.analyzers.flaky_test_detector import FlakyTestDetector
+from src.analyzers.gpt_analyzer import GPTAnalyzer
+from src.database.db_manager import DatabaseManager
+from src.utils.synthetic_data import SyntheticDataGenerator, populate
+from src.utils.view_data import ERROR_PATTERNS_QUERY, FAILED_TESTS_QUERY, RECENT_RUNS_QUERY
+
+DEFAULT_SIZES = [10000, 1000000, 10000000]
+
+class _StubChatClient:
+    """Answers every chat completion instantly, so only local overhead is measured."""
+
+    class _Response:
+        def __init__(self, content: str):
+            message = type('Message', (), {'content': content})()
+            self.choices = [type('Choice', (), {'message': message})()]
+            self.usage = None
+
+    def __init__(self):
+        self.chat = self
+        self.completions = self
+
+    def create(self, **request):
+        return self._Response("- Root cause: stub\n- Fix: stub")
+
+def _median_seconds(fn: Callable, repeats: int) -> float:
+    timings = []
+    for _ in range(repeats):
+        started = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - started)
+    return statistics.median(timings)
+
+def _remove_db(path: str):
+    for suffix in ('', '-wal', '-shm'):
+        if os.path.exists(path + suffix):
+            os.remove(path + suffix)
+
+def benchmark_size(size: int, db_dir: str, seed: int = 0, repeats: int = 5,
+                   tests_per_run: int = 20) -> List[Dict]:
+    """Run every benchmark against a fresh database of about size rows."""
+    results = []
+
+    def record(name: str, value: float, unit: str, **extra):
+        results.append({'size': size, 'name': name, 'value': round(value, 6), 'unit': unit, **extra})
+        print(f"  {name:<32} {value:>14,.3f} {unit}")
+
+    db_path = os.path.join(db_dir, f'benchmark_{size}.db')
+    _remove_db(db_path)
+    db = DatabaseManager(db_path)
+    try:
+        # Insert throughput
+        num_runs = max(1, size // (tests_per_run + 1))
+        generator = SyntheticDataGenerator(seed=seed, tests_per_run=tests_per_run)
+        counts = populate(db, generator, num_runs)
+        rows = counts['runs'] + counts['test_results']
+        record('insert_throughput', rows / counts['seconds'], 'rows/s', rows=rows)
+
+        # view_data queries, on a plain connection as view_data runs them
+        conn = db.get_connection()
+        try:
+            for name, sql in [('query_recent_runs', RECENT_RUNS_QUERY),
+                              ('query_failed_tests', FAILED_TESTS_QUERY),
+                              ('query_error_patterns', ERROR_PATTERNS_QUERY)]:
+                record(name, _median_seconds(lambda: conn.execute(sql).fetchall(), repeats) * 1000, 'ms')
+        finally:
+            conn.close()
+
+        # Full-text search: a rare term, a common one and the next page of the common one
+        for name, kwargs in [('search_rare_term', {'query': 'OOMKilled'}),
+                             ('search_common_term', {'query': 'AssertionError'}),
+                             ('search_common_term_page_5', {'query': 'AssertionError', 'offset': 80})]:
+            record(name, _median_seconds(lambda: db.search_failures(**kwargs), repeats) * 1000, 'ms')
+
+        # Flakiness: full fold, then the no-op incremental update and the top-N read
+        detector = FlakyTestDetector(db)
+        started = time.perf_counter()
+        detector.update()
+        record('flaky_full_update', time.perf_counter() - started, 's')
+        record('flaky_incremental_update', _median_seconds(detector.update, repeats) * 1000, 'ms')
+        record('query_top_flaky_tests', _median_seconds(lambda: detector.get_top_flaky_tests(5), repeats) * 1000, 'ms')
+
+        # Classification and fingerprinting over a sample of stored failure text
+        reasons = [row['text'] for row in db.get_failure_texts_after('run', 0, limit=10000)]
+        traces = [(row['failure_message'], row['stack_trace']) for row in db.get_failed_test_traces(limit=10000)]
+
+        classifier = FailureClassifier(FailureClassifier.LOG_PATTERNS)
+        texts = reasons + [trace for _, trace in traces]
+        if texts:
+            seconds = _median_seconds(lambda: [classifier.classify(text, record=False) for text in texts], repeats)
+            record('classify_throughput', len(texts) / seconds, 'texts/s')
+        if traces:
+            seconds = _median_seconds(lambda: [failure_fingerprint(m, t) for m, t in traces], repeats)
+            record('fingerprint_throughput', len(traces) / seconds, 'texts/s')
+
+        # Near-duplicate clustering: every stored failure signature, then the no-op update
+        clusterer = FailureClusterer(db)
+        started = time.perf_counter()
+        clustered = clusterer.update()
+        seconds = time.perf_counter() - started
+        if clustered:
+            record('cluster_throughput', clustered / seconds, 'signatures/s', signatures=clustered)
+        record('cluster_incremental_update', _median_seconds(clusterer.update, repeats) * 1000, 'ms')
+
+        # Analysis pipeline with a stub model: query, grouping, prompts and bookkeeping
+        analyzer = GPTAnalyzer(client=_StubChatClient(), cache=None)
+
+        def analysis_pass():
+            failures = db.get_recent_failures(limit=100)
+            analyzer.analyze_failures(failures)
+            analyzer.analyze_failure_patterns(failures)
+
+        record('analysis_pipeline_latency', _median_seconds(analysis_pass, repeats) * 1000, 'ms')
+    finally:
+        db.close()
+        _remove_db(db_path)
+
+    return results
+
+def run_benchmarks(sizes: List[int], db_dir: str, seed: int = 0, repeats: int = 5) -> Dict:
+    report = {
+        'timestamp': datetime.now().isoformat(),
+        'python': platform.python_version(),
+        'sqlite': sqlite3.sqlite_version,
+        'platform': platform.platform(),
+        'seed': seed,
+        'results': []
+    }
+    for size in sizes:
+        print(f"\n=== {size:,} rows ===")
+        report['results'].extend(benchmark_size(size, db_dir, seed, repeats))
+    return report
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark storage, queries and analysis on synthetic data")
+    parser.add_argument('--sizes', type=int, nargs='+', default=DEFAULT_SIZES,
+                        help="Approximate row counts to benchmark at")
+    parser.add_argument('--output', default='benchmark_results.json', help="Where to write the JSON report")
+    parser.add_argument('--db-dir', default='.', help="Directory for the temporary benchmark databases")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--repeats', type=int, default=5)
+    args = parser.parse_args()
+
+    report = run_benchmarks(args.sizes, args.db_dir, args.seed, args.repeats)
+    with open(args.output, 'w') as f:
+        json.dump(report, f, indent=2)
+    print(f"\nResults written to {args.output}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,13 @@
+# src/utils/paths.py
+
+import os
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+def project_path(path: str) -> str:
+    """Resolve a relative path against the project root, so scripts share files wherever they run from."""
+    return path if os.path.isabs(path) else os.path.join(PROJECT_ROOT, path)
+
+DEFAULT_DB_PATH = project_path('ci_insights.db')
+DEFAULT_LLM_CACHE_PATH = project_path('llm_cache.db')
+DEFAULT_HTTP_CACHE_PATH = project_path('http_cache.db')
@@ -0,0 +1,225 @@
+# src/utils/synthetic_data.py
+
+from datetime import datetime, timedelta
+from typing import Dict, Iterator, List, Tuple
+import argparse
+import random
+import sys
+import os
+import time
+
+# Add the project root to Python path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from src.database.db_manager import DatabaseManager
+from src.utils.seed_data import FAILURE_REASONS, TESTS, WORKFLOWS
+from src.utils.paths import DEFAULT_DB_PATH
+
+# Failure reasons with the run-specific details real logs carry, so that
+# fingerprinting has something to normalize away
+REASON_TEMPLATES = FAILURE_REASONS + [
+    "Process completed with exit code {code}",
+    "Error: connect ECONNREFUSED 10.0.{a}.{b}:{port}",
+    "Test failure in step: Run tests",
+    "Build failure in step: Build {module}",
+    "TimeoutError: job {job} exceeded {minutes} minutes",
+    "FAILED tests/test_{module}.py::test_{module}_{n} - AssertionError",
+    "Cannot find module '/tmp/build-{hex}/node_modules/{module}'",
+    "OOMKilled: container {hex} used {mb}Mi"
+]
+
+ERROR_TYPES = ['AssertionError', 'TimeoutError', 'ConnectionError', 'KeyError', 'ValueError']
+
+MODULES = ['auth', 'payments', 'api', 'db', 'frontend', 'search', 'billing', 'notifications', 'cache', 'jobs']
+
+class SyntheticDataGenerator:
+    """Seeded generator of realistic pipeline runs and test results at any scale.
+
+    - Failures are bursty: each workflow switches between a healthy state
+      and an incident state in which most of its runs fail.
+    - A fraction of tests are flaky and fail at random, often passing on
+      retry, regardless of the workflow's state.
+    - Runs are re-run on the same commit now and then, so flips on one
+      commit show up.
+    - Durations are log-normal and stack traces vary from a few frames to
+      a few hundred.
+    - Failure reasons are drawn Zipf-like from templates with
+      run-specific ids, paths and numbers.
+
+    The same seed always produces the same data.
+    """
+
+    def __init__(self, seed: int = 0, num_workflows: int = 20, num_tests: int = 2000,
+                 tests_per_run: int = 20, flaky_fraction: float = 0.05,
+                 start: datetime = None, runs_per_hour: float = 60.0):
+        self.rng = random.Random(seed)
+        self.tests_per_run = tests_per_run
+        self.start = start or datetime(2024, 1, 1)
+        self.mean_gap = 3600.0 / runs_per_hour
+
+        self.workflows = [
+            WORKFLOWS[i] if i < len(WORKFLOWS) else f"{WORKFLOWS[i % len(WORKFLOWS)]} {i // len(WORKFLOWS)}"
+            for i in range(num_workflows)
+        ]
+        self.tests = [
+            TESTS[i] if i < len(TESTS) else f"test_{MODULES[i % len(MODULES)]}_{i}"
+            for i in range(num_tests)
+        ]
+        # Each workflow runs its own slice of the test suite
+        self.workflow_tests = {
+            workflow: self.rng.sample(self.tests, min(len(self.tests), tests_per_run * 3))
+            for workflow in self.workflows
+        }
+        self.flaky_tests = {
+            test: self.rng.uniform(0.05, 0.3)
+            for test in self.rng.sample(self.tests, int(len(self.tests) * flaky_fraction))
+        }
+        self.reason_weights = [1.0 / (rank + 1) for rank in range(len(REASON_TEMPLATES))]
+
+        self._in_incident = {workflow: False for workflow in self.workflows}
+        self._incident_reason = {}
+        self._last_commit = {workflow: None for workflow in self.workflows}
+
+    def generate(self, num_runs: int) -> Iterator[Tuple[Dict, List[Dict]]]:
+        """Yield (pipeline_run, test_results) pairs in start-time order."""
+        rng = self.rng
+        clock = self.start
+        for i in range(num_runs):
+            clock += timedelta(seconds=rng.expovariate(1.0 / self.mean_gap))
+            workflow = rng.choice(self.workflows)
+
+            # Two-state incident model: incidents are rare, short and fail most runs
+            if self._in_incident[workflow]:
+                if rng.random() < 0.2:
+                    self._in_incident[workflow] = False
+            elif rng.random() < 0.02:
+                self._in_incident[workflow] = True
+                self._incident_reason[workflow] = self._failure_reason()
+
+            # Re-run the previous commit now and then
+            if self._last_commit[workflow] and rng.random() < 0.15:
+                commit_sha = self._last_commit[workflow]
+            else:
+                commit_sha = '%040x' % rng.getrandbits(160)
+            self._last_commit[workflow] = commit_sha
+
+            run_id = f"syn_{i}"
+            results = self._test_results(run_id, workflow)
+            test_failed = any(result['status'] == 'failed' for result in results)
+
+            if self._in_incident[workflow] and rng.random() < 0.8:
+                failure_reason = self._incident_reason[workflow]
+            elif test_failed:
+                failure_reason = "Test failure in step: Run tests"
+            elif rng.random() < 0.03:
+                failure_reason = self._failure_reason()
+            else:
+                failure_reason = None
+
+            duration = int(min(rng.lognormvariate(6.5, 0.6), 6 * 3600))
+            yield {
+                'run_id': run_id,
+                'workflow_name': workflow,
+                'status': 'completed',
+                'conclusion': 'failure' if failure_reason else 'success',
+                'started_at': clock.isoformat(),
+                'completed_at': (clock + timedelta(seconds=duration)).isoformat(),
+                'duration': duration,
+                'repository': 'example/ci-failure-insights',
+                'branch': rng.choices(['main', 'develop', 'feature/new-feature'], weights=[6, 3, 1])[0],
+                'commit_sha': commit_sha,
+                'failure_reason': failure_reason
+            }, results
+
+    def _test_results(self, run_id: str, workflow: str) -> List[Dict]:
+        rng = self.rng
+        count = max(1, int(rng.gauss(self.tests_per_run, self.tests_per_run / 4)))
+        pool = self.workflow_tests[workflow]
+        results = []
+        for test_name in rng.sample(pool, min(count, len(pool))):
+            flake_rate = self.flaky_tests.get(test_name)
+            if flake_rate is not None and rng.random() < flake_rate:
+                # Flaky: usually passes on a retry
+                failed = rng.random() < 0.3
+                retries = rng.randint(1, 2)
+            elif self._in_incident[workflow] and rng.random() < 0.1:
+                failed, retries = True, rng.randint(0, 2)
+            else:
+                failed, retries = False, 0
+
+            if failed:
+                error_type = rng.choice(ERROR_TYPES)
+                failure_message = f"{error_type}: expected {rng.randint(0, 999)} but got {rng.randint(0, 999)}"
+                stack_trace = self._stack_trace(test_name, error_type)
+            else:
+                error_type = failure_message = stack_trace = None
+
+            results.append({
+                'run_id': run_id,
+                'test_name': test_name,
+                'status': 'failed' if failed else 'passed',
+                'duration': round(rng.lognormvariate(-0.5, 1.0), 3),
+                'failure_message': failure_message,
+                'error_type': error_type,
+                'stack_trace': stack_trace,
+                'retry_count': retries
+            })
+        return results
+
+    def _failure_reason(self) -> str:
+        rng = self.rng
+        template = rng.choices(REASON_TEMPLATES, weights=self.reason_weights)[0]
+        return template.format(
+            code=rng.choice([1, 2, 137, 143]),
+            a=rng.randint(0, 255), b=rng.randint(0, 255), port=rng.choice([5432, 6379, 8080]),
+            module=rng.choice(MODULES), job=rng.randint(10 ** 9, 10 ** 10),
+            minutes=rng.choice([30, 60, 360]), n=rng.randint(1, 50),
+            hex='%012x' % rng.getrandbits(48), mb=rng.randint(512, 8192)
+        )
+
+    def _stack_trace(self, test_name: str, error_type: str) -> str:
+        rng = self.rng
+        depth = max(3, int(rng.lognormvariate(2.5, 0.9)))
+        frames = ["Traceback (most recent call last):"]
+        for _ in range(depth):
+            module = rng.choice(MODULES)
+            frames.append(f'  File "/home/runner/work/app/app/src/{module}/handlers.py", '
+                          f'line {rng.randint(1, 900)}, in {module}_{rng.randint(1, 40)}')
+            frames.append(f"    result = {module}.call(request, retries={rng.randint(0, 3)})")
+        frames.append(f'  File "tests/{test_name}.py", line {rng.randint(1, 300)}, in {test_name}')
+        frames.append("    assert result == expected")
+        frames.append(f"{error_type}: assertion failed")
+        return '\n'.join(frames)
+
+def populate(db: DatabaseManager, generator: SyntheticDataGenerator, num_runs: int,
+             commit_every: int = 10000) -> Dict:
+    """Write num_runs generated runs and their test results. Returns row counts and timing."""
+    started = time.perf_counter()
+    runs = tests = 0
+    with db.batch(commit_every=commit_every) as batch:
+        for run, results in generator.generate(num_runs):
+            batch.add_pipeline_run(run)
+            for result in results:
+                batch.add_test_result(result)
+            runs += 1
+            tests += len(results)
+    return {'runs': runs, 'test_results': tests, 'seconds': time.perf_counter() - started}
+
+def main():
+    parser = argparse.ArgumentParser(description="Fill a database with synthetic CI data")
+    parser.add_argument('runs', type=int, help="Number of pipeline runs to generate")
+    parser.add_argument('--db', default=DEFAULT_DB_PATH, help="Database path")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--tests-per-run', type=int, default=20)
+    args = parser.parse_args()
+
+    db = DatabaseManager(args.db)
+    generator = SyntheticDataGenerator(seed=args.seed, tests_per_run=args.tests_per_run)
+    counts = populate(db, generator, args.runs)
+    db.close()
+    rows = counts['runs'] + counts['test_results']
+    print(f"Wrote {counts['runs']} runs and {counts['test_results']} test results "
+          f"in {counts['seconds']:.1f}s ({rows / counts['seconds']:.0f} rows/s)")
+
+if __name__ == "__main__":
+    main()
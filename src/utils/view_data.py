@@ -6,8 +6,23 @@ import os
 # Add the project root to Python path
 sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
 
+from src.analyzers.failure_clusters import FailureClusterer
+from src.analyzers.flaky_test_detector import FlakyTestDetector
 from src.database.db_manager import DatabaseManager
 import json
+from datetime import datetime, timedelta
+
+RECENT_RUNS_QUERY = 'SELECT * FROM pipeline_runs ORDER BY started_at DESC LIMIT 5'
+
+FAILED_TESTS_QUERY = '''
+    SELECT tr.*, pr.workflow_name 
+    FROM test_results tr
+    JOIN pipeline_runs pr ON tr.run_id = pr.run_id
+    WHERE tr.status = 'failed'
+    ORDER BY tr.created_at DESC LIMIT 5
+'''
+
+ERROR_PATTERNS_QUERY = 'SELECT * FROM error_patterns ORDER BY frequency DESC'
 
 def view_data():
     db = DatabaseManager()
@@ -18,7 +33,7 @@ def view_data():
         c = conn.cursor()
         
         print("\n=== Pipeline Runs ===")
-        c.execute('SELECT * FROM pipeline_runs ORDER BY started_at DESC LIMIT 5')
+        c.execute(RECENT_RUNS_QUERY)
         runs = c.fetchall()
         for run in runs:
             print(f"\nRun ID: {run['run_id']}")
@@ -29,13 +44,7 @@ def view_data():
                 print(f"Failure Reason: {run['failure_reason']}")
         
         print("\n=== Test Results ===")
-        c.execute('''
-            SELECT tr.*, pr.workflow_name 
-            FROM test_results tr
-            JOIN pipeline_runs pr ON tr.run_id = pr.run_id
-            WHERE tr.status = 'failed'
-            ORDER BY tr.created_at DESC LIMIT 5
-        ''')
+        c.execute(FAILED_TESTS_QUERY)
         tests = c.fetchall()
         for test in tests:
             print(f"\nTest: {test['test_name']}")
@@ -44,13 +53,40 @@ def view_data():
             print(f"Message: {test['failure_message']}")
         
         print("\n=== Error Patterns ===")
-        c.execute('SELECT * FROM error_patterns ORDER BY frequency DESC')
+        c.execute(ERROR_PATTERNS_QUERY)
         patterns = c.fetchall()
         for pattern in patterns:
             print(f"\nPattern: {pattern['pattern']}")
             print(f"Type: {pattern['error_type']}")
             print(f"Frequency: {pattern['frequency']}")
             print(f"Suggested Fix: {pattern['suggested_fix']}")
+    
+    print("\n=== Workflow Health (last 7 days) ===")
+    since = (datetime.now() - timedelta(days=7)).strftime('%Y-%m-%d')
+    for summary in db.get_rollup_summary('day', since=since, group_by=('workflow_name',)):
+        print(f"\nWorkflow: {summary['workflow_name']}")
+        print(f"Runs: {summary['runs']} ({summary['failures']} failed)")
+        if summary['failure_rate'] is not None:
+            print(f"Failure Rate: {summary['failure_rate']:.1%}")
+        if summary['p50_duration'] is not None:
+            print(f"Duration p50/p95: {summary['p50_duration']:.0f}s / {summary['p95_duration']:.0f}s")
+        if summary['mttr_seconds'] is not None:
+            print(f"Mean Time to Recovery: {summary['mttr_seconds'] / 60:.1f} minutes")
+    
+    print("\n=== Flaky Tests ===")
+    detector = FlakyTestDetector(db)
+    detector.update()
+    for test in detector.get_top_flaky_tests(5):
+        print(f"\nTest: {test['test_name']}")
+        print(f"Flake Score: {test['flake_score']:.2f}")
+        print(f"Flips: {test['flips']} ({test['same_commit_flips']} on the same commit)")
+        print(f"Passed After Retry: {test['retry_passes']}")
+    
+    print("\n=== Failure Clusters ===")
+    FailureClusterer(db).update()
+    for cluster in db.get_failure_clusters(5):
+        print(f"\nCluster {cluster['id']}: {cluster['size']} distinct failure signatures")
+        print(f"Example: {cluster['label'].splitlines()[0] if cluster['label'] else ''}")
 
 if __name__ == "__main__":
     view_data()
\ No newline at end of file
@@ -0,0 +1,93 @@
+# tests/test_analysis_reuse.py
+
+import os
+import sys
+from types import SimpleNamespace
+
+# Add the project root to Python path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.analyzers.analyze_with_gpt import analyze_recent_failures
+from src.analyzers.gpt_analyzer import GPTAnalyzer
+from src.database.db_manager import DatabaseManager
+from src.scripts.analyze_github_workflows import GitHubWorkflowAnalyzer
+
+class SwitchableChatClient:
+    """Fails every request while down, otherwise answers and counts single-failure prompts."""
+
+    def __init__(self):
+        self.down = True
+        self.failure_prompts = 0
+        self.chat = SimpleNamespace(completions=self)
+
+    def create(self, **request):
+        if self.down:
+            raise ConnectionError('API unavailable')
+        if 'Pipeline Details' in request['messages'][-1]['content']:
+            self.failure_prompts += 1
+        return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content='real analysis'))])
+
+def store_failed_run(db: DatabaseManager, run_id: int, workflow_name: str, failure_reason: str):
+    db.store_pipeline_runs([{
+        'run_id': run_id,
+        'workflow_name': workflow_name,
+        'status': 'completed',
+        'conclusion': 'failure',
+        'started_at': f'2026-10-0{run_id}T10:00:00Z',
+        'completed_at': f'2026-10-0{run_id}T10:05:00Z',
+        'duration': 300,
+        'repository': 'owner/repo',
+        'branch': 'main',
+        'commit_sha': f'sha{run_id}',
+        'failure_reason': failure_reason
+    }])
+
+def test_fallback_analysis_is_not_reused(tmp_path):
+    db = DatabaseManager(str(tmp_path / 'ci.db'))
+    store_failed_run(db, 1, 'CI', 'Missing dependency')
+    client = SwitchableChatClient()
+    analyzer = GPTAnalyzer(client=client, cache=None)
+
+    analyze_recent_failures(db, analyzer)
+    first = db.get_latest_analysis(1, 'gpt_analysis')
+    assert first['analysis_data']['fallback'] is True
+    assert first['fingerprint'] is None
+
+    client.down = False
+    analyze_recent_failures(db, analyzer)
+    second = db.get_latest_analysis(1, 'gpt_analysis')
+
+    assert client.failure_prompts == 1
+    assert second['analysis_data']['analysis'] == 'real analysis'
+    assert second['fingerprint'] is not None
+    db.close()
+
+def test_workflow_errors_and_fallbacks_are_stored_without_a_signature(tmp_path, monkeypatch):
+    monkeypatch.setenv('OPENAI_API_KEY', 'test')
+    monkeypatch.setenv('LLM_CACHE_PATH', '')
+    db = DatabaseManager(str(tmp_path / 'ci.db'))
+    analyzer = GitHubWorkflowAnalyzer(db, github_collector=SimpleNamespace(max_workers=1))
+    run = {'run_id': 1, 'workflow_name': 'CI', 'failure_reason': 'Missing dependency'}
+
+    analyzer._store_analysis(run, {'error': 'Error analyzing pipeline'}, 'signature')
+    analyzer._store_analysis(run, {'suggestions': [], 'fallback': True}, 'signature')
+    analyzer._store_analysis(run, {'suggestions': ['Pin the version']}, 'signature')
+
+    assert [pending['fingerprint'] for pending in analyzer._pending_analyses] == [None, None, 'signature']
+    db.close()
+
+def test_generic_reasons_are_analyzed_per_workflow(tmp_path):
+    db = DatabaseManager(str(tmp_path / 'ci.db'))
+    store_failed_run(db, 1, 'CI', 'Test failure in step: Run tests')
+    store_failed_run(db, 2, 'Nightly', 'Test failure in step: Run tests')
+    store_failed_run(db, 3, 'CI', 'Test failure in step: Run tests')
+    client = SwitchableChatClient()
+    client.down = False
+
+    analyze_recent_failures(db, GPTAnalyzer(client=client, cache=None))
+
+    assert client.failure_prompts == 2
+    ci, nightly, ci_again = (db.get_latest_analysis(run_id, 'gpt_analysis') for run_id in (1, 2, 3))
+    assert ci['fingerprint'] == ci_again['fingerprint'] != nightly['fingerprint']
+    assert nightly['analysis_data']['workflow_name'] == 'Nightly'
+    db.close()
@@ -0,0 +1,107 @@
+# tests/test_failure_classifier.py
+
+import os
+import sys
+
+# Add the project root to Python path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.analyzers.failure_classifier import FailureClassifier
+from src.collectors.log_scanner import LogScanner
+
+LOG_SAMPLES = [
+    "",
+    "Run tests\nAssertionError: expected 3 but got 4",
+    "ModuleNotFoundError: No module named 'yaml'",
+    "Error: The operation was canceled.\nTimeout after 360 minutes",
+    "timeout-minutes: 30\nPermission denied (publickey)",
+    "connect_timeout=10s\nConnection refused",
+    "Read timeout on socket\nerror: failed to push",
+    "PERMISSION DENIED\nconnection refused",
+    "TIMEOUT exceeded",
+    "assertionerror raised by plugin",
+    "Connection refused\nTimeout\nAssertionError",
+    "Permission denied while ModuleNotFoundError was logged",
+    "TimeoutError: [Errno 110] Connection timed out",
+    "nothing interesting here"
+]
+
+REASON_SAMPLES = [
+    "",
+    "Test failure in step: Run tests",
+    "Build failure in step: Compile",
+    "Job timed out",
+    "TIMEOUT waiting for runner",
+    "Missing dependency",
+    "Permission error",
+    "Network connection failed",
+    "NETWORK unreachable",
+    "Failure in job: deploy",
+    "Timeout while building tests",
+    "dependency connection permission"
+]
+
+def baseline_log_reason(logs: str):
+    """The collector's original checks on a job log."""
+    if "AssertionError" in logs:
+        return "Test assertion failed"
+    elif "ModuleNotFoundError" in logs:
+        return "Missing dependency"
+    elif "Timeout" in logs:
+        return "Job timed out"
+    elif "Permission denied" in logs:
+        return "Permission error"
+    elif "Connection refused" in logs:
+        return "Network connection failed"
+    return None
+
+def baseline_category(failure_reason: str) -> str:
+    """GPTAnalyzer's original _categorize_failure checks."""
+    reason = failure_reason.lower()
+    if 'test' in reason:
+        return 'Test Failures'
+    elif 'build' in reason:
+        return 'Build Failures'
+    elif 'timeout' in reason:
+        return 'Timeout Issues'
+    elif 'dependency' in reason:
+        return 'Dependency Problems'
+    elif 'permission' in reason:
+        return 'Permission Issues'
+    elif 'network' in reason or 'connection' in reason:
+        return 'Network Problems'
+    else:
+        return 'Other Issues'
+
+def test_log_patterns_match_baseline_checks():
+    classifier = FailureClassifier(FailureClassifier.LOG_PATTERNS)
+    for logs in LOG_SAMPLES:
+        match = classifier.classify(logs, record=False)
+        assert (match['category'] if match else None) == baseline_log_reason(logs), logs
+
+def test_log_scanner_matches_baseline_checks():
+    for logs in LOG_SAMPLES:
+        scanner = LogScanner()
+        scanner.feed(logs.encode('utf-8'))
+        match = scanner.finish().best_match()
+        assert (match['category'] if match else None) == baseline_log_reason(logs), logs
+
+def test_category_patterns_match_baseline_checks():
+    classifier = FailureClassifier(FailureClassifier.CATEGORY_PATTERNS)
+    for reason in REASON_SAMPLES:
+        match = classifier.classify(reason, record=False)
+        assert (match['category'] if match else 'Other Issues') == baseline_category(reason), reason
+
+def test_config_text_is_not_a_timeout():
+    classifier = FailureClassifier(FailureClassifier.LOG_PATTERNS)
+    assert classifier.classify("timeout-minutes: 30", record=False) is None
+    assert classifier.classify("connect_timeout=10s\nPermission denied", record=False)['category'] == 'Permission error'
+
+def test_mixed_case_sensitivity_reports_overlapping_patterns():
+    classifier = FailureClassifier([
+        {'pattern': 'Timeout', 'category': 'cased'},
+        {'pattern': 'timeout', 'category': 'folded', 'ignore_case': True},
+        {'pattern': 'time', 'category': 'prefix', 'ignore_case': True}
+    ])
+    assert sorted(m['category'] for m in classifier.matches("a Timeout")) == ['cased', 'folded', 'prefix']
+    assert sorted(m['category'] for m in classifier.matches("a TIMEOUT")) == ['folded', 'prefix']
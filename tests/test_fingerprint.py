@@ -0,0 +1,47 @@
+# tests/test_fingerprint.py
+
+import os
+import sqlite3
+import sys
+
+# Add the project root to Python path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.analyzers.fingerprint import failure_fingerprint, normalize_failure_text
+from src.database.migrations import migrate
+
+def test_exit_codes_ports_and_versions_stay_distinct():
+    pairs = [
+        ("Process completed with exit code 1", "Process completed with exit code 137"),
+        ("connect ECONNREFUSED 10.0.1.2:5432", "connect ECONNREFUSED 10.0.1.2:6379"),
+        ("Python 3.8", "Python 3.12 not supported"),
+        ("npm ERR! node v16.20.0 is not supported", "npm ERR! node v18.17.1 is not supported")
+    ]
+    for first, second in pairs:
+        assert failure_fingerprint(first) != failure_fingerprint(second), (first, second)
+
+def test_volatile_parts_are_normalized():
+    pairs = [
+        ("Run #1234 failed at 2024-01-02T03:04:05Z", "Run #98765 failed at 2024-03-09T11:22:33Z"),
+        ("checkout of 3fa9c2e1b8d7 failed", "checkout of 9b1d4e77a0c2 failed"),
+        ("cannot write /tmp/pytest-of-runner/pytest-3/out.txt", "cannot write /tmp/pytest-of-runner/pytest-8/out.txt"),
+        ('File "app/db.py", line 42, in connect', 'File "app/db.py", line 57, in connect'),
+        ("at com.acme.Db.open(Db.java:120)", "at com.acme.Db.open(Db.java:131)"),
+        ("job 5501 timed out", "job 5502 timed out"),
+        ("segfault at 0x7ffd5e8a1b20", "segfault at 0x7ffc01a2b3c4")
+    ]
+    for first, second in pairs:
+        assert failure_fingerprint(first) == failure_fingerprint(second), (first, second)
+
+def test_line_numbers_need_a_source_file():
+    assert normalize_failure_text("main.go:12:5: undefined: foo") == "main.go:<n>: undefined: foo"
+    assert normalize_failure_text("dial tcp db.internal:5432") == "dial tcp db.internal:5432"
+
+def test_migration_recomputes_stored_fingerprints():
+    conn = sqlite3.connect(':memory:')
+    migrate(conn)
+    conn.execute("INSERT INTO pipeline_runs (run_id, failure_reason, fingerprint) VALUES ('1', 'exit code 137', 'stale')")
+    conn.execute('PRAGMA user_version = 9')
+    migrate(conn)
+    stored = conn.execute("SELECT fingerprint FROM pipeline_runs WHERE run_id = '1'").fetchone()[0]
+    assert stored == failure_fingerprint('exit code 137')
@@ -0,0 +1,149 @@
+# tests/test_github_collector.py
+
+import os
+import sys
+from urllib.parse import parse_qs, urlencode, urlsplit
+
+# Add the project root to Python path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.collectors.github_collector import GitHubCollector
+from src.database.db_manager import DatabaseManager
+
+class StubResponse:
+    def __init__(self, payload, next_url: str = None):
+        self.payload = payload
+        self.links = {'next': {'url': next_url}} if next_url else {}
+        self.status_code = 200
+
+    def raise_for_status(self):
+        pass
+
+    def json(self):
+        return self.payload
+
+class StubGitHub:
+    """Serves workflows, runs and jobs from dicts, honouring the created filter and paging."""
+
+    def __init__(self):
+        self.workflows = [{'id': 1, 'name': 'CI'}, {'id': 2, 'name': 'Deploy'}]
+        self.runs = {1: [], 2: []}
+        self.broken_jobs = set()
+        self.run_queries = {}
+        self.requests = 0
+
+    def get(self, url, params=None, **kwargs):
+        self.requests += 1
+        if url.endswith('/actions/workflows'):
+            return StubResponse({'workflows': self.workflows})
+        if '/actions/workflows/' in url:
+            base, query = url.split('?')[0], parse_qs(urlsplit(url).query)
+            params = dict(params or {}, **{name: values[0] for name, values in query.items()})
+            workflow_id = int(base.split('/actions/workflows/')[1].split('/')[0])
+            created = params.get('created', '>=').lstrip('>=')
+            per_page, page = int(params.get('per_page', 30)), int(params.get('page', 1))
+            self.run_queries[workflow_id] = created
+            runs = sorted((run for run in self.runs[workflow_id] if run['created_at'] >= created),
+                          key=lambda run: run['created_at'], reverse=True)
+            next_url = None
+            if page * per_page < len(runs):
+                next_url = base + '?' + urlencode({'created': params.get('created', '>='),
+                                                   'per_page': per_page, 'page': page + 1})
+            return StubResponse({'workflow_runs': runs[(page - 1) * per_page:page * per_page]}, next_url)
+        if url.endswith('/jobs'):
+            run_id = int(url.split('/actions/runs/')[1].split('/')[0])
+            if run_id in self.broken_jobs:
+                raise ConnectionError('jobs endpoint failed')
+            steps = [{'name': 'Run tests', 'conclusion': 'failure'}]
+            return StubResponse({'jobs': [{'id': run_id * 10, 'name': 'test', 'conclusion': 'failure', 'steps': steps}]})
+        raise AssertionError(f'unexpected request {url}')
+
+def make_run(run_id: int, name: str, created_at: str, updated_at: str, conclusion: str = 'success') -> dict:
+    return {
+        'id': run_id,
+        'name': name,
+        'status': 'completed',
+        'conclusion': conclusion,
+        'created_at': created_at,
+        'updated_at': updated_at,
+        'head_branch': 'main',
+        'head_sha': f'sha{run_id}'
+    }
+
+def make_collector(github: StubGitHub) -> GitHubCollector:
+    return GitHubCollector('token', 'owner', 'repo', max_workers=1, http_client=github)
+
+def stored_conclusion(db: DatabaseManager, run_id: int) -> str:
+    return db.get_stored_conclusions([run_id]).get(str(run_id))
+
+def test_rerun_of_a_run_older_than_the_cursor_is_collected(tmp_path):
+    db = DatabaseManager(str(tmp_path / 'ci.db'))
+    github = StubGitHub()
+    github.runs[1] = [
+        make_run(1, 'CI', '2026-10-05T02:00:00Z', '2026-10-05T02:10:00Z', 'failure'),
+        make_run(2, 'CI', '2026-10-05T10:00:00Z', '2026-10-05T10:10:00Z')
+    ]
+    collector = make_collector(github)
+    assert len(collector.sync_workflow_runs(db)) == 2
+    assert db.get_sync_cursor('owner/repo', 'CI')['last_updated_at'] == '2026-10-05T10:10:00Z'
+
+    # Run 1 is re-run and now passes; it was created before the cursor
+    github.runs[1][0] = make_run(1, 'CI', '2026-10-05T02:00:00Z', '2026-10-06T09:00:00Z', 'success')
+    synced = collector.sync_workflow_runs(db)
+
+    assert [run['run_id'] for run in synced] == [1]
+    assert stored_conclusion(db, 1) == 'success'
+    assert github.run_queries[1] == '2026-10-04T10:10:00Z'
+    assert db.get_sync_cursor('owner/repo', 'CI')['last_updated_at'] == '2026-10-06T09:00:00Z'
+    db.close()
+
+def test_a_failing_run_does_not_abort_the_sync(tmp_path):
+    db = DatabaseManager(str(tmp_path / 'ci.db'))
+    github = StubGitHub()
+    github.runs[1] = [
+        make_run(1, 'CI', '2026-10-01T10:00:00Z', '2026-10-01T10:10:00Z', 'failure'),
+        make_run(2, 'CI', '2026-10-02T10:00:00Z', '2026-10-02T10:10:00Z', 'failure')
+    ]
+    github.runs[2] = [make_run(3, 'Deploy', '2026-10-03T10:00:00Z', '2026-10-03T10:10:00Z')]
+    github.broken_jobs = {1}
+    collector = make_collector(github)
+
+    synced = collector.sync_workflow_runs(db)
+
+    assert sorted(run['run_id'] for run in synced) == [2, 3]
+    assert stored_conclusion(db, 1) is None
+    # The cursor stays at the run that still has to be processed
+    assert db.get_sync_cursor('owner/repo', 'CI')['last_updated_at'] == '2026-10-01T10:10:00Z'
+    assert db.get_sync_cursor('owner/repo', 'Deploy')['last_updated_at'] == '2026-10-03T10:10:00Z'
+
+    github.broken_jobs = set()
+    synced = collector.sync_workflow_runs(db)
+
+    assert [run['run_id'] for run in synced] == [1]
+    assert stored_conclusion(db, 1) == 'failure'
+    assert db.get_sync_cursor('owner/repo', 'CI')['last_updated_at'] == '2026-10-02T10:10:00Z'
+    db.close()
+
+def test_a_poll_with_no_changes_costs_one_request_per_workflow(tmp_path):
+    db = DatabaseManager(str(tmp_path / 'ci.db'))
+    github = StubGitHub()
+    for workflow_id, name in ((1, 'CI'), (2, 'Deploy')):
+        github.runs[workflow_id] = [
+            make_run(workflow_id * 1000 + minute, name, f'2026-10-05T{minute // 60:02d}:{minute % 60:02d}:00Z',
+                     f'2026-10-05T{minute // 60:02d}:{minute % 60:02d}:30Z')
+            for minute in range(250)
+        ]
+    collector = make_collector(github)
+    assert len(collector.sync_workflow_runs(db)) == 500
+
+    github.requests = 0
+    assert collector.sync_workflow_runs(db) == []
+    # The workflow list plus the first page of each workflow's runs
+    assert github.requests == 3
+
+    # A new run only needs the first page too
+    github.runs[1].append(make_run(1999, 'CI', '2026-10-05T05:00:00Z', '2026-10-05T05:05:00Z'))
+    github.requests = 0
+    assert [run['run_id'] for run in collector.sync_workflow_runs(db)] == [1999]
+    assert github.requests == 3
+    db.close()
@@ -0,0 +1,111 @@
+# tests/test_gpt_batching.py
+
+import json
+import os
+import re
+import sys
+from types import SimpleNamespace
+
+# Add the project root to Python path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.analyzers.gpt_analyzer import GPTAnalyzer
+
+class StubChatClient:
+    """Chat client that answers batched prompts through answer_batch(ids) and logs every call."""
+
+    def __init__(self, answer_batch):
+        self.answer_batch = answer_batch
+        self.batches = []
+        self.singles = []
+        self.chat = SimpleNamespace(completions=self)
+
+    def create(self, **request):
+        prompt = request['messages'][-1]['content']
+        ids = re.findall(r'"failure_id":"([^"]+)"', prompt)
+        if ids:
+            self.batches.append(ids)
+            content = self.answer_batch(ids)
+        else:
+            run_id = re.search(r'Failure Reason: reason (\S+)', prompt).group(1)
+            self.singles.append(run_id)
+            content = f"single analysis of {run_id}"
+        return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content=content))])
+
+def make_failures(count: int, reason_size: int = 0):
+    return [
+        {
+            'run_id': run_id,
+            'workflow_name': f'wf{run_id}',
+            'failure_reason': f'reason {run_id}' + ' x' * reason_size,
+            'duration': 10,
+            'branch': 'main'
+        }
+        for run_id in range(1, count + 1)
+    ]
+
+def full_answer(ids):
+    return json.dumps([{'failure_id': failure_id, 'analysis': f'batched analysis of {failure_id}'} for failure_id in ids])
+
+def test_truncated_answer_is_retried_in_halves():
+    def answer(ids):
+        if len(ids) == 4:
+            # Cut off at max_tokens in the middle of the array
+            return full_answer(ids)[:60]
+        return full_answer(ids)
+
+    client = StubChatClient(answer)
+    analyzer = GPTAnalyzer(client=client, cache=None)
+
+    results = analyzer.analyze_failures_batched(make_failures(4))
+
+    assert client.batches == [['1', '2', '3', '4'], ['1', '2'], ['3', '4']]
+    assert client.singles == []
+    assert [result['failure_id'] for result in results] == [1, 2, 3, 4]
+    assert [result['analysis'] for result in results] == [f'batched analysis of {i}' for i in '1234']
+
+def test_missing_items_fall_back_to_single_requests():
+    client = StubChatClient(lambda ids: full_answer([failure_id for failure_id in ids if failure_id != '2']))
+    analyzer = GPTAnalyzer(client=client, cache=None)
+
+    results = analyzer.analyze_failures_batched(make_failures(3))
+
+    assert client.batches == [['1', '2', '3']]
+    assert client.singles == ['2']
+    assert [result['analysis'] for result in results] == [
+        'batched analysis of 1', 'single analysis of 2', 'batched analysis of 3'
+    ]
+
+def test_non_json_answer_falls_back_without_splitting():
+    client = StubChatClient(lambda ids: "Sorry, I can only analyze one failure at a time.")
+    analyzer = GPTAnalyzer(client=client, cache=None)
+
+    results = analyzer.analyze_failures_batched(make_failures(4))
+
+    assert client.batches == [['1', '2', '3', '4']]
+    assert client.singles == ['1', '2', '3', '4']
+    assert [result['analysis'] for result in results] == [f'single analysis of {i}' for i in '1234']
+
+def test_pack_batches_respects_size_and_context_window():
+    analyzer = GPTAnalyzer(client=object(), cache=None)
+
+    assert [len(batch) for batch in analyzer._pack_batches(make_failures(45), 20)] == [20, 20, 5]
+
+    # About 2,000 prompt tokens plus the answer budget per failure
+    large = make_failures(12, reason_size=4000)
+    batches = analyzer._pack_batches(large, 20)
+    assert [failure for batch in batches for failure in batch] == large
+    assert len(batches) > 1
+    for batch in batches:
+        prompt = analyzer._batch_prompt([analyzer._compact_failure(failure) for failure in batch])
+        assert analyzer._estimate_tokens(prompt) + analyzer.BATCH_ANSWER_TOKENS * len(batch) <= analyzer.CONTEXT_TOKENS
+
+def test_parse_batch_answer():
+    analyzer = GPTAnalyzer(client=object(), cache=None)
+
+    fenced = '```json\n[{"failure_id": 7, "analysis": ["Root cause", "Fix"]}, {"failure_id": "8"}]\n```'
+    assert analyzer._parse_batch_answer(fenced) == {'7': '- Root cause\n- Fix'}
+    assert analyzer._parse_batch_answer('[{"failure_id": "1", "analysis": "a"}, {"failure_id": "2", "anal') is None
+    assert analyzer._parse_batch_answer('{"failure_id": "1", "analysis": "a"}') is None
+    assert analyzer._parse_batch_answer('no json here') is None
+    assert analyzer._parse_batch_answer(None) is None
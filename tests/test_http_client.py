@@ -0,0 +1,103 @@
+# tests/test_http_client.py
+
+import os
+import sys
+import time
+
+import pytest
+import requests
+
+# Add the project root to Python path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.collectors.http_client import GitHubHttpClient
+from src.collectors.rate_limiter import RateLimitScheduler
+from src.collectors.response_cache import ResponseCache
+
+def make_response(status_code: int, headers: dict) -> requests.Response:
+    response = requests.Response()
+    response.status_code = status_code
+    response.headers.update(headers)
+    response._content = b'{"message": "API rate limit exceeded"}'
+    response.url = 'https://api.github.com/repos/o/r/actions/runs'
+    return response
+
+class StubSession:
+    """Answers every request with the next queued response, repeating the last one."""
+
+    def __init__(self, responses):
+        self.responses = list(responses)
+        self.sent = []
+
+    def request(self, method, url, **kwargs):
+        self.sent.append(time.monotonic())
+        return self.responses.pop(0) if len(self.responses) > 1 else self.responses[0]
+
+def client_with(responses, max_retries: int = 2, min_pause: float = 0.05) -> GitHubHttpClient:
+    client = GitHubHttpClient('token', max_retries=max_retries, scheduler=RateLimitScheduler(min_pause=min_pause))
+    client.session = StubSession(responses)
+    return client
+
+def test_rate_limit_without_reset_pauses_and_gives_up():
+    exhausted = make_response(403, {'X-RateLimit-Remaining': '0'})
+    client = client_with([exhausted])
+
+    with pytest.raises(requests.HTTPError):
+        client.get('https://api.github.com/repos/o/r/actions/runs')
+
+    sent = client.session.sent
+    assert len(sent) == 3
+    assert all(later - earlier >= 0.04 for earlier, later in zip(sent, sent[1:]))
+
+def test_rate_limit_with_stale_reset_still_pauses():
+    stale = str(int(time.time()) - 120)
+    exhausted = make_response(429, {'X-RateLimit-Remaining': '0', 'X-RateLimit-Reset': stale})
+    ok = make_response(200, {'X-RateLimit-Remaining': '4999'})
+    client = client_with([exhausted, ok])
+
+    response = client.get('https://api.github.com/repos/o/r/actions/runs')
+
+    assert response.status_code == 200
+    first, second = client.session.sent
+    assert second - first >= 0.04
+
+def test_retry_after_sets_the_pause():
+    scheduler = RateLimitScheduler(min_pause=60.0)
+    scheduler.update(429, {'X-RateLimit-Remaining': '0', 'Retry-After': '2'})
+    with scheduler._cond:
+        delay = scheduler._delay()
+    assert 1.0 < delay <= 2.0
+
+def test_cache_counts_misses_only_for_stored_responses(tmp_path):
+    url = 'https://api.github.com/repos/o/r/actions/runs'
+    cache = ResponseCache(str(tmp_path / 'http.db'))
+    client = GitHubHttpClient('token', max_retries=0, cache=cache)
+    client.session = StubSession([
+        make_response(404, {}),
+        make_response(500, {}),
+        make_response(200, {'ETag': '"v1"'}),
+        make_response(304, {})
+    ])
+
+    statuses = [client.get(url).status_code for _ in range(4)]
+
+    assert statuses == [404, 500, 200, 200]
+    stats = cache.get_stats()
+    assert (stats['hits'], stats['misses']) == (1, 1)
+    assert stats['hit_rate'] == 0.5
+
+def test_cache_entries_are_not_shared_between_tokens(tmp_path):
+    url = 'https://api.github.com/repos/o/r/actions/runs'
+    cache = ResponseCache(str(tmp_path / 'http.db'))
+    first = GitHubHttpClient('first-token', max_retries=0, cache=cache)
+    first.session = StubSession([make_response(200, {'ETag': '"v1"'})])
+    first.get(url)
+
+    second = GitHubHttpClient('second-token', max_retries=0, cache=cache)
+    second.session = StubSession([make_response(304, {})])
+    response = second.get(url)
+
+    # The second token has no entry, so it sends no validator and gets no cached body
+    assert response.status_code == 304
+    assert not getattr(response, 'from_cache', False)
+    assert cache.get_stats()['hits'] == 0
@@ -0,0 +1,66 @@
+# tests/test_llm_cache.py
+
+import os
+import sys
+from itertools import count
+
+# Add the project root to Python path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.analyzers import llm_cache
+from src.analyzers.gpt_analyzer import GPTAnalyzer
+from src.analyzers.llm_cache import LLMResponseCache
+from src.analyzers.pipeline_analyzer import PipelineAnalyzer
+from src.utils.paths import PROJECT_ROOT
+
+def test_memory_hits_keep_entries_from_being_evicted(tmp_path, monkeypatch):
+    clock = count(1000)
+    monkeypatch.setattr(llm_cache.time, 'time', lambda: float(next(clock)))
+    cache = LLMResponseCache(str(tmp_path / 'llm.db'), max_bytes=20)
+
+    cache.store('often', 'model', 'a' * 8)
+    cache.store('once', 'model', 'b' * 8)
+    for _ in range(5):
+        assert cache.get('often') == 'a' * 8
+
+    # Going over max_bytes evicts the least recently used entry
+    cache.store('new', 'model', 'c' * 8)
+
+    keys = {row[0] for row in cache._conn.execute('SELECT cache_key FROM llm_cache')}
+    assert keys == {'often', 'new'}
+
+def test_memory_hit_access_times_are_written_in_batches(tmp_path):
+    cache = LLMResponseCache(str(tmp_path / 'llm.db'), access_batch=3)
+    cache.store('key', 'model', 'answer')
+    stored = cache._conn.execute("SELECT last_access FROM llm_cache WHERE cache_key = 'key'").fetchone()[0]
+
+    cache.get('key')
+    cache.get('key')
+    assert cache._conn.execute("SELECT last_access FROM llm_cache WHERE cache_key = 'key'").fetchone()[0] == stored
+
+    cache.get('key')
+    assert cache._conn.execute("SELECT last_access FROM llm_cache WHERE cache_key = 'key'").fetchone()[0] > stored
+
+def test_no_cache_by_default(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    assert GPTAnalyzer(client=object()).cache is None
+    assert PipelineAnalyzer(client=object()).cache is None
+    assert not os.path.exists(tmp_path / 'llm_cache.db')
+
+def test_default_cache_path_is_resolved_against_the_project_root(tmp_path, monkeypatch):
+    opened = []
+    monkeypatch.setattr(llm_cache, 'get_shared_cache', lambda db_path: opened.append(db_path))
+    monkeypatch.chdir(tmp_path)
+
+    monkeypatch.delenv('LLM_CACHE_PATH', raising=False)
+    llm_cache.get_default_cache()
+    monkeypatch.setenv('LLM_CACHE_PATH', os.path.join('cache', 'llm.db'))
+    llm_cache.get_default_cache()
+    monkeypatch.setenv('LLM_CACHE_PATH', str(tmp_path / 'llm.db'))
+    llm_cache.get_default_cache()
+
+    assert opened == [
+        os.path.join(PROJECT_ROOT, 'llm_cache.db'),
+        os.path.join(PROJECT_ROOT, 'cache', 'llm.db'),
+        str(tmp_path / 'llm.db')
+    ]
@@ -0,0 +1,82 @@
+# tests/test_llm_executor.py
+
+import os
+import sys
+import threading
+import time
+from types import SimpleNamespace
+
+# Add the project root to Python path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.analyzers.llm_executor import LLMExecutor, TokenRateLimiter
+
+class SlowChatClient:
+    """Takes delay seconds per completion and tracks how many run at once."""
+
+    def __init__(self, delay: float = 0.05):
+        self.delay = delay
+        self.in_flight = 0
+        self.peak = 0
+        self._lock = threading.Lock()
+        self.chat = SimpleNamespace(completions=self)
+
+    def create(self, **request):
+        with self._lock:
+            self.in_flight += 1
+            self.peak = max(self.peak, self.in_flight)
+        time.sleep(self.delay)
+        with self._lock:
+            self.in_flight -= 1
+        return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content='ok'))], usage=None)
+
+def ask(client):
+    return lambda item: client.chat.completions.create(model='m', messages=[{'role': 'user', 'content': str(item)}])
+
+def test_in_flight_requests_never_exceed_max_workers():
+    executor = LLMExecutor(max_workers=3)
+    stub = SlowChatClient()
+    client = executor.wrap(stub)
+
+    # Two map() calls at once, like the per-failure and pattern analyses
+    background = threading.Thread(target=executor.map, args=(ask(client), range(12)))
+    background.start()
+    results = executor.map(ask(client), range(12))
+    background.join()
+
+    assert len(results) == 12
+    assert stub.peak == 3
+
+def test_requests_per_minute_budget_waits():
+    limiter = TokenRateLimiter(requests_per_minute=2, tokens_per_minute=10000)
+    limiter.WINDOW = 0.2
+
+    started = time.monotonic()
+    for _ in range(3):
+        limiter.acquire(10)
+
+    assert time.monotonic() - started >= 0.15
+    assert limiter.stats['waits'] == 1
+
+def test_tokens_per_minute_budget_waits():
+    limiter = TokenRateLimiter(requests_per_minute=100, tokens_per_minute=100)
+    limiter.WINDOW = 0.2
+
+    started = time.monotonic()
+    limiter.acquire(60)
+    limiter.acquire(60)
+
+    assert time.monotonic() - started >= 0.15
+    assert limiter.stats['waits'] == 1
+
+def test_actual_usage_frees_token_budget():
+    limiter = TokenRateLimiter(requests_per_minute=100, tokens_per_minute=100)
+    limiter.WINDOW = 5.0
+
+    entry = limiter.acquire(90)
+    limiter.adjust(entry, 20)
+    started = time.monotonic()
+    limiter.acquire(60)
+
+    assert time.monotonic() - started < 0.1
+    assert limiter.stats['waits'] == 0
@@ -0,0 +1,43 @@
+# tests/test_rollups.py
+
+import os
+import sys
+
+# Add the project root to Python path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.database import rollups
+from src.database.rollups import bucket_start
+
+def test_bucket_start_parses_before_formatting():
+    assert bucket_start('2026-10-05T07:42:13Z', 'hour') == '2026-10-05T07:00:00'
+    assert bucket_start('2026-10-05T07:42:13Z', 'day') == '2026-10-05'
+    assert bucket_start('2026-10-05 07:42:13', 'hour') == '2026-10-05T07:00:00'
+    # Offsets are bucketed in UTC
+    assert bucket_start('2026-10-05T01:30:00+02:00', 'hour') == '2026-10-04T23:00:00'
+    assert bucket_start('2026-10-05T01:30:00+02:00', 'day') == '2026-10-04'
+
+def test_parse_time_accepts_github_timestamps():
+    parsed = rollups._parse_time('2026-10-05T07:42:13Z')
+    assert (parsed.year, parsed.hour, parsed.minute, parsed.tzinfo) == (2026, 7, 42, None)
+    assert rollups._parse_time(None) is None
+    assert rollups._parse_time('not a time') is None
+
+def test_recovery_from_github_timestamps_is_counted(tmp_path):
+    from src.database.db_manager import DatabaseManager
+
+    db = DatabaseManager(str(tmp_path / 'ci.db'))
+    db.store_pipeline_runs([
+        {'run_id': run_id, 'workflow_name': 'CI', 'status': 'completed', 'conclusion': conclusion,
+         'started_at': f'2026-10-05T{hour:02d}:00:00Z', 'completed_at': f'2026-10-05T{hour:02d}:10:00Z',
+         'duration': 600, 'repository': 'owner/repo', 'branch': 'main', 'commit_sha': f'sha{run_id}'}
+        for run_id, hour, conclusion in ((1, 8, 'failure'), (2, 9, 'failure'), (3, 11, 'success'))
+    ])
+
+    rows = db.get_rollups('hour')
+    assert sorted(row['bucket_start'] for row in rows) == [
+        '2026-10-05T08:00:00', '2026-10-05T09:00:00', '2026-10-05T11:00:00'
+    ]
+    summary, = db.get_rollup_summary('day')
+    assert summary['mttr_seconds'] == 3 * 3600
+    db.close()